@@ -0,0 +1,99 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Per-card cost of `processing.get_entry_fields()`, which selects all fields of
+a result card in a single pass, against the per-field `fields.get_*`
+selections it replaced.
+
+Run from the repository root:
+
+    python benchmarks/bench_entry_fields.py [--repeat N] [--fixture PATH]
+"""
+
+from bs4 import BeautifulSoup
+
+from timeit import repeat
+import argparse, os, sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from geoid.constants import Keys, Objects, Selectors
+from geoid.query.processing import fields, processing
+
+
+FIXTURE = os.path.join(ROOT, 'tests', 'fixtures', 'html', 'results.html')
+
+
+def get_entry_fields_per_field(entry, query_lang='id') -> dict:
+  #: get_entry_fields() before the single-pass extractor
+  result_entry = Objects.BASE_PLACE_OBJECT.copy()
+  result_entry.update({
+    Keys.LOCATION_NAME : fields.get_location_name(entry),
+    Keys.LOCATION_TYPE : fields.get_location_type(entry),
+    Keys.LATITUDE      : fields.get_latitude(entry) ,
+    Keys.LONGITUDE     : fields.get_longitude(entry),
+    Keys.RATING        : fields.get_rating(entry),
+    Keys.REVIEWS       : fields.get_reviews(entry),
+    Keys.DESCRIPTION   : fields.get_description(entry),
+    Keys.LOCATION_LINK : fields.get_location_link(entry, query_lang)
+  })
+  return result_entry
+
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--repeat', type=int, default=5)
+  parser.add_argument('--number', type=int, default=200)
+  parser.add_argument('--fixture', default=FIXTURE)
+  args = parser.parse_args()
+
+  with open(args.fixture, encoding='utf-8') as file:
+    cards = BeautifulSoup(file.read(), 'lxml').select(Selectors.RESULT)
+  if len(cards) <= 0:
+    sys.exit(f'No result cards in {args.fixture}')
+
+  #: Both must give the same places before comparing their cost
+  for card in cards:
+    assert processing.get_entry_fields(card) == \
+      get_entry_fields_per_field(card), card.get_text()[:60]
+
+  print(f'{len(cards)} card(s), best of {args.repeat} x {args.number} runs')
+  timings = {}
+  for name, function in (
+    ('per-field', get_entry_fields_per_field),
+    ('single-pass', processing.get_entry_fields),
+  ):
+    seconds = min(repeat(
+      lambda: [function(card) for card in cards],
+      repeat=args.repeat, number=args.number
+    ))
+    timings[name] = seconds / (args.number * len(cards))
+    print(f'{name:>12}: {timings[name] * 1e6:8.1f} us/card')
+
+  print(
+    f'{"speedup":>12}: '
+    f'{timings["per-field"] / timings["single-pass"]:8.1f}x'
+  )
+
+
+if __name__ == '__main__':
+  main()
@@ -18,4 +18,5 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .bigquery import BigQuery
\ No newline at end of file
+from .bigquery import BigQuery
+from .asyncbigquery import AsyncBigQuery
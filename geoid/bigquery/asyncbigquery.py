@@ -0,0 +1,223 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, logging
+
+from geoid.constants import Status
+from geoid.query import scraping
+from . import query
+from .bigquery import BigQuery
+from .worker import Worker
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBigQuery(BigQuery):
+  """
+  Counterpart of `BigQuery` for asyncio, iterated with `async for` over query
+  objects as they are completed.
+
+  Blocking web client calls run in a thread pool of one thread per worker,
+  while municipality data is pulled under the event loop; see
+  `MunicipalityResolver.get_async()`. At most
+  `config.query.pipeline_queue_size` scraped queries wait for municipality
+  data at once, and at most `config.municipality.concurrency` lookups are in
+  flight across all queries.
+
+  Example:
+      querier = AsyncBigQuery(config)
+      querier.import_data(source_filename)
+      querier.initialize_workers(webdrivers)
+      async for index, query_object, query_status in querier:
+        ...
+      await querier.close_async()
+  """
+
+  async def __aiter__(self):
+    """
+    Run all remaining queries, yielding each query object as it is completed.
+
+    Queries are completed out of order. Closing the iterator early, such as
+    with `contextlib.aclosing()`, stops the workers after their current query.
+
+    Yields:
+        Tuple of the index, the new query object and its query status.
+    """
+
+    if len(self.workers) <= 0:
+      raise RuntimeError(
+        'BigQuery must be initialized with initialize() to begin querying'
+      )
+    if self.config.query.tabs > 1:
+      raise ValueError(
+        'Querying with multiple tabs is not supported with AsyncBigQuery'
+      )
+    
+    queue_size = max(1, self.config.query.pipeline_queue_size)
+    completed  = asyncio.Queue(queue_size)
+    in_flight  = asyncio.Semaphore(queue_size)
+    lookups    = asyncio.Semaphore(max(1, self.config.municipality.concurrency))
+    enrichers  = set()
+    
+    executor = ThreadPoolExecutor(
+      max_workers=len(self.workers), thread_name_prefix='geoid-worker'
+    )
+    workers  = [
+      asyncio.create_task(self._work_async(
+        worker, executor, completed, in_flight, lookups, enrichers
+      ))
+      for worker in self.workers
+    ]
+
+    #: Set once the iterator is closed, as nobody is left to read the end
+    #: marker. Workers may stop on their own, such as once the CAPTCHA breaker
+    #: opens; the end marker is put then
+    closed = False
+
+    async def finish():
+      try:
+        await asyncio.gather(*workers)
+        while len(enrichers) > 0:
+          await asyncio.gather(*enrichers)
+      finally:
+        if not closed:
+          await completed.put(None)
+    
+    finisher = asyncio.create_task(finish())
+
+    try:
+      while True:
+        item = await completed.get()
+        if item is None:
+          break
+        yield item
+      
+      #: Raise errors of the workers, if any
+      await finisher
+    finally:
+      closed = True
+      self._stopping = True
+      for task in [finisher, *workers, *enrichers]:
+        task.cancel()
+      executor.shutdown(wait=False)
+
+    self._log_end()
+
+
+  async def close_async(self):
+    if self.resolver is not None:
+      await self.resolver.close_async()
+      self.resolver = None
+
+
+  async def _work_async(
+    self,
+    worker: Worker,
+    executor: ThreadPoolExecutor,
+    completed: asyncio.Queue,
+    in_flight: asyncio.Semaphore,
+    lookups: asyncio.Semaphore,
+    enrichers: set
+  ):
+    loop = asyncio.get_running_loop()
+    while not self._stopping:
+      item = await loop.run_in_executor(executor, self._scrape_next, worker)
+      if item is None:
+        break
+
+      index, new_query_object, query_status = item
+      if query_status != Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+        await self._complete_async(
+          index, new_query_object, query_status, completed
+        )
+        continue
+
+      #: Wait for room before scraping the next query
+      await in_flight.acquire()
+      task = asyncio.create_task(self._enrich_async(
+        index, new_query_object, completed, lookups
+      ))
+      enrichers.add(task)
+      task.add_done_callback(enrichers.discard)
+      task.add_done_callback(lambda _: in_flight.release())
+
+
+  def _scrape_next(self, worker: Worker):
+    while not (self._stopping or worker.stopped):
+      #: Take no query while the web client cannot be started
+      if not worker.ensure_running():
+        continue
+      item = self._next_item()
+      if item is None:
+        return None
+
+      index, data_object = item
+      self._log_progress(worker, index)
+      try:
+        new_query_object, query_status = worker.scrape(data_object)
+      except scraping.CaptchaError:
+        self._on_captcha(worker, [item])
+        continue
+      except Exception as e:
+        logger.error(str(e))
+        continue
+
+      try:
+        worker.maintain()
+      except Exception as e:
+        logger.error(f'Could not restart web client: {str(e)}')
+      return index, new_query_object, query_status
+    
+    return None
+
+
+  async def _enrich_async(
+    self,
+    index: int,
+    scraped_object: dict,
+    completed: asyncio.Queue,
+    lookups: asyncio.Semaphore
+  ):
+    try:
+      new_query_object, query_status = await query.enrich_one_async(
+        scraped_object, self.config, resolver=self.resolver, limit=lookups
+      )
+    except Exception as e:
+      logger.error(str(e))
+      new_query_object = scraped_object
+      query_status = Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+    
+    await self._complete_async(index, new_query_object, query_status, completed)
+
+
+  async def _complete_async(
+    self,
+    index: int,
+    new_query_object: dict,
+    query_status,
+    completed: asyncio.Queue
+  ):
+    #: Autosaves write files; keep them off the event loop
+    await asyncio.to_thread(
+      self._update_one, index, new_query_object, query_status
+    )
+    await completed.put((index, new_query_object, query_status))
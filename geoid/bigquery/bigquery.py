@@ -20,13 +20,22 @@
 
 from selenium.webdriver.remote.webdriver import WebDriver
 
-from copy import deepcopy
-import logging
-
-from geoid.common import io
+from collections import deque
+from functools import partial
+from queue import Queue
+from time import perf_counter, sleep
+import logging, threading
+
+from geoid.common import io, ratelimit
+from geoid.common.metrics import StageMeter
 from geoid.config import Config
-from geoid.constants import Status
+from geoid.constants import Keys, Objects, Status
+from geoid.query import fetching, scraping
+from geoid.query.processing import MunicipalityResolver
 from . import postprocessing, query
+from .breaker import CaptchaBreaker
+from .tabs import TabScheduler
+from .worker import Worker
 
 
 logger = logging.getLogger(__name__)
@@ -49,27 +58,63 @@ class BigQuery:
     self.target_filename   = None
     self.autosave_filename = None
 
-    self.data    = None
-    self.querier = None
+    self.data     = None
+    self.workers  = []
+    self.resolver = None
+    self.breaker  = None
 
+    self._source        = None
+    self._source_done   = False
     self._progress      = 0
     self._count         = 0
-    self._status_counts = self.BASE_STATUS_COUNTS
+    self._status_counts = self.BASE_STATUS_COUNTS.copy()
+    self._pending       = deque()
+    self._retries       = deque()
+    self._stopping      = False
+    self._lock          = threading.Lock()
+    self._journal_open  = False
+
+    self._enrich_queue  = None
+    self._scrape_meter  = None
+    self._enrich_meter  = None
 
 
   def import_data(
     self,
-    source_filename: str
+    source_filename: str,
+    *,
+    lazy: bool=False
   ):
-    data = io.import_data(source_filename)
+    """
+    Import a queries data JSON or NDJSON file to query.
+
+    With `lazy` set, query objects are read from the file only as they are
+    handed out for querying, and completed query objects are not kept in
+    `data`; use `iter_all()` to consume them. The number of query objects is
+    then only known once the file is fully read.
+    """
 
     self.source_filename = source_filename
-    self.data            = data
-    self.querier         = None
+    self.workers         = []
     
     self._progress       = 0
-    self._count          = len(data)
-    self._status_counts  = self.BASE_STATUS_COUNTS
+    self._status_counts  = self.BASE_STATUS_COUNTS.copy()
+    self._source_done    = False
+
+    if lazy:
+      self.data    = None
+      self._source = enumerate(io.iter_data(source_filename))
+      self._count  = 0
+
+      logger.info(
+        f'Opened save data JSON from "{source_filename}" for lazy import'
+      )
+      return
+
+    data = io.import_data(source_filename)
+    self.data    = data
+    self._source = None
+    self._count  = len(data)
 
     logger.info(
       f'Imported save data JSON from "{source_filename}"'
@@ -90,10 +135,50 @@ class BigQuery:
     indent=None,
     **json_kwargs
   ):
-    if self.data is None:
-      return
+    self.export(
+      target_filename,
+      output_format='json',
+      filter_by_city=filter_by_city,
+      flatten=flatten,
+      convert_ascii=convert_ascii,
+      replace_newline=replace_newline,
+      indent=indent,
+      **json_kwargs
+    )
+
+
+  def export(
+    self,
+    target_filename=None,
+    *,
+    objects=None,
+    output_format=None,
+    filter_by_city=None,
+    flatten=None,
+    convert_ascii=None,
+    replace_newline=None,
+    indent=None,
+    **json_kwargs
+  ):
+    """
+    Export postprocessed queries data as a JSON array, NDJSON or CSV file.
+
+    Query objects are postprocessed and written one at a time, without
+    copying the whole queries data. Query objects may instead be given by
+    `objects`, for example by a generator over `iter_all()`, so that they are
+    written as they are completed. CSV output is always flattened.
+
+    Returns:
+        Number of records exported.
+    """
+
+    if objects is None:
+      objects = self.data
+    if objects is None:
+      return 0
     
     if target_filename is None : target_filename = self.target_filename
+    if output_format is None   : output_format   = self.config.fileio.output_format
     if filter_by_city is None  : filter_by_city  = self.config.postproc.filter
     if flatten is None         : flatten         = self.config.postproc.flatten
     if convert_ascii is None   : convert_ascii   = self.config.postproc.convert_ascii
@@ -114,29 +199,55 @@ class BigQuery:
         f'Invalid filename of "{target_filename}"'
       )
 
-    export_data = deepcopy(self.data)
-
-    if filter_by_city  : export_data = postprocessing.filter_by_city(export_data)
-    if flatten         : export_data = postprocessing.convert_flat(export_data)
-    if convert_ascii   : export_data = postprocessing.convert_ascii(export_data)
-    if replace_newline : export_data = postprocessing.replace_newline(export_data)
-
-    io.export_json(
-      target_filename, export_data, indent=indent, **json_kwargs
+    fieldnames = None
+    if output_format.lower().strip() == 'csv':
+      flatten    = True
+      fieldnames = list(postprocessing.FLAT_HEAD_KEYS) + \
+        list(Objects.BASE_PLACE_OBJECT.keys())
+
+    records = postprocessing.iter_postprocess(
+      objects,
+      filter_by_city=filter_by_city,
+      flatten=flatten,
+      convert_ascii=convert_ascii,
+      replace_newline=replace_newline
+    )
+    count = io.export_records(
+      target_filename, records, output_format,
+      indent=indent, fieldnames=fieldnames, **json_kwargs
     )
     
     logger.info(
-      f'Exported queries data JSON to "{target_filename}"'
+      f'Exported queries data {output_format.upper()} to "{target_filename}"'
     )
+    return count
+
 
+  def autosave(self, index: int=None):
+    """
+    Autosave the queries data to `autosave_filename`.
+
+    With `config.fileio.autosave_mode` set to `'journal'`, only the query
+    object at `index` is appended to the autosave as one JSON line. Otherwise,
+    the whole queries data is written.
+    """
 
-  def autosave(self):
     autosave_filename = self.autosave_filename
     if len(autosave_filename) <= 0:
       raise ValueError(
         f'Unspecified autosave filename of "{autosave_filename}"'
       )
     
+    if self._is_journal() and index is not None:
+      self._append_journal(index, self.data[index])
+      return
+
+    if self.data is None:
+      logger.warning(
+        'Lazily imported queries data can only be autosaved as a journal'
+      )
+      return
+
     io.export_json(
       autosave_filename, self.data, self.config.fileio.output_indent
     )
@@ -146,6 +257,91 @@ class BigQuery:
     )
 
 
+  def _append_journal(self, index: int, data_object: dict):
+    #: The first append of a run replaces any journal left from before,
+    #: unless it was replayed with resume_autosave()
+    io.append_journal(
+      self.autosave_filename, index, data_object,
+      truncate=not self._journal_open
+    )
+    self._journal_open = True
+    logger.info(
+      f'Journaled query object {str(index+1)} to "{self.autosave_filename}"'
+    )
+
+
+  def resume_autosave(self):
+    """
+    Restore query objects from an existing autosave of the same queries data.
+
+    Journal autosaves are replayed record by record; full autosaves are merged
+    by index. Only query objects whose query keyword matches are restored, and
+    restored objects marked complete are skipped when querying. The journal is
+    compacted to the last record of each query object, then appended to, and
+    never emptied, once resumed.
+
+    Lazily imported queries data is restored as it is read, so that the number
+    of query objects restored is not known in advance.
+
+    Returns:
+        Number of query objects restored, or of journal records to restore
+        from if lazily imported.
+    """
+
+    autosave_filename = self.autosave_filename
+    if autosave_filename is None:
+      return 0
+    if self._is_journal():
+      self._journal_open = True
+    
+    try:
+      if self._source is not None:
+        journal  = io.compact_journal(autosave_filename)
+        restored = len(journal)
+        self._source = _iter_resumed(self._source, journal)
+      elif self.data is None:
+        return 0
+      elif self._is_journal():
+        #: Records superseded by later runs are dropped before appending more
+        io.compact_journal(autosave_filename)
+        restored = io.replay_journal(autosave_filename, self.data)
+      else:
+        restored = self._merge_autosave(io.import_json(autosave_filename))
+    except FileNotFoundError:
+      logger.info(
+        f'No autosave to resume from "{autosave_filename}"'
+      )
+      return 0
+    
+    logger.info(
+      f'Resumed {str(restored)} query object(s) from "{autosave_filename}"'
+    )
+    return restored
+
+
+  def _merge_autosave(self, autosave_data: list[dict]):
+    restored = 0
+    for index, data_object in enumerate(autosave_data[:self._count]):
+      if io._is_keyword_missing(data_object):
+        continue
+      if (
+        data_object[Keys.QUERY_KEYWORD] !=
+        self.data[index].get(Keys.QUERY_KEYWORD)
+      ):
+        continue
+      self.data[index] = data_object
+      restored += 1
+    return restored
+
+
+  def _is_journal(self):
+    #: Lazily imported queries data is not kept whole, so it is always
+    #: autosaved as a journal
+    if self._source is not None:
+      return True
+    return self.config.fileio.autosave_mode.lower().strip() == 'journal'
+
+
   def remove_autosave_if_set(self):
     autosave_filename = self.autosave_filename
     autosave_enabled = \
@@ -153,6 +349,14 @@ class BigQuery:
       (not self.config.fileio.keep_autosave)
 
     if autosave_filename is not None and autosave_enabled:
+      if (
+        (self.breaker is not None and self.breaker.is_open) or
+        not self.is_finished
+      ):
+        logger.warning(
+          f'Kept autosave "{autosave_filename}" of the stopped query'
+        )
+        return
       self._remove_autosave()
 
 
@@ -170,36 +374,398 @@ class BigQuery:
 
 
   def initialize(self, webdriver: WebDriver):
-    self.webdriver      = webdriver
-    self.querier        = query.get_iterator(self.data, webdriver, self.config)
+    self.webdriver = webdriver
+    self.initialize_workers([webdriver])
+
+
+  def initialize_workers(
+    self,
+    webdrivers: list[WebDriver],
+    *,
+    webclient_factory=None
+  ):
+    """
+    Bind one query worker to each web client in `webdrivers`.
+
+    Queries are handed out to the workers in order of their index in the
+    queries data, and their results are stored back by the same index.
+
+    Args:
+        webdrivers (list[WebDriver]): Selenium web clients, one per worker.
+        webclient_factory (Callable): Function of the worker index returning a
+        new web client, used to restart web clients of workers. Called with
+        `fresh_profile=True` to restart without the browser profile in use,
+        such as after a CAPTCHA. If not set, web clients are never restarted.
+    """
+
+    if len(webdrivers) <= 0:
+      raise ValueError(
+        'BigQuery requires at least one web client to begin querying'
+      )
+
+    if self.resolver is None:
+      self.resolver = MunicipalityResolver(self.config)
+    self.breaker = CaptchaBreaker(self.config)
+
+    self.webdriver      = webdrivers[0]
+    self.workers        = [
+      Worker(
+        webdriver, self.config,
+        name=f'worker-{str(index+1)}', resolver=self.resolver,
+        webclient_factory=\
+          partial(webclient_factory, index) if webclient_factory else None
+      )
+      for index, webdriver in enumerate(webdrivers)
+    ]
     self._progress      = 0
-    self._status_counts = self.BASE_STATUS_COUNTS
+    self._status_counts = self.BASE_STATUS_COUNTS.copy()
+    self._pending       = deque(range(self._count))
+    self._retries       = deque()
+    self._stopping      = False
 
 
   def get_one(self):
-    if (self.webdriver is None) or (self.querier is None):
+    if len(self.workers) <= 0:
       raise RuntimeError(
         'BigQuery must be initialized with initialize() to begin querying'
       )
-    if self._progress >= self._count:
+    
+    worker = self.workers[0]
+    item = None
+    while not (self._stopping or worker.stopped):
+      if worker.ensure_running():
+        item = self._next_item()
+        break
+    if item is None:
+      self._log_end()
       self.report_log()
       raise StopIteration('Reached end of query')
     
-    new_query_object, index, query_status = next(self.querier)
-    self.data[index] = new_query_object
-    self._progress += 1
-    self._status_counts[query_status] += 1
-
-    status_completed = \
-      (query_status == Status.QUERY_COMPLETE) or \
-      (query_status == Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING)
-    do_autosave      = \
-      (self.autosave_filename is not None) and \
-      (self._progress % self.config.fileio.autosave_every == 0)
-    if status_completed and do_autosave:
-      self.autosave()
+    result = self._get_item(worker, *item)
+    if result is None:
+      #: Put back to be queried again
+      return Status.QUERY_INCOMPLETE
+    return result[1]
+
+
+  def iter_all(self):
+    """
+    Run all remaining queries in order, yielding each query object as it is
+    completed.
+
+    This is the way to consume query objects imported with `lazy` set, which
+    are not kept in `data`.
+
+    Yields:
+        Tuple of the index, the new query object and its query status.
+    """
+
+    if len(self.workers) <= 0:
+      raise RuntimeError(
+        'BigQuery must be initialized with initialize() to begin querying'
+      )
+
+    worker = self.workers[0]
+    while not (self._stopping or worker.stopped):
+      if not worker.ensure_running():
+        continue
+      item = self._next_item()
+      if item is None:
+        break
+      
+      index = item[0]
+      try:
+        result = self._get_item(worker, *item)
+      except Exception as e:
+        logger.error(str(e))
+        continue
+      if result is None:
+        continue
+      yield index, *result
+    
+    self._log_end()
+
+
+  def get_all_workers(self):
+    """
+    Run all remaining queries in parallel, one thread per worker.
+
+    Blocks until every query object has been processed. Status counts and
+    autosaves are updated as each worker completes a query.
+
+    With `config.query.pipeline` set, workers only scrape, and hand scraped
+    queries to `config.query.enrich_workers` threads pulling municipality data
+    through a queue of `config.query.pipeline_queue_size` queries. Workers
+    wait when the queue is full.
+    """
+
+    if len(self.workers) <= 0:
+      raise RuntimeError(
+        'BigQuery must be initialized with initialize_workers() to begin '
+        'querying'
+      )
+
+    pipeline = self.config.query.pipeline and self.config.query.tabs <= 1
+    enrichers = []
+    if pipeline:
+      self._enrich_queue = Queue(max(1, self.config.query.pipeline_queue_size))
+      self._scrape_meter = StageMeter('scrape stage')
+      self._enrich_meter = StageMeter('enrich stage')
+      for index in range(max(1, self.config.query.enrich_workers)):
+        thread = threading.Thread(
+          target=self._work_enrich, name=f'enricher-{str(index+1)}',
+          daemon=True
+        )
+        thread.start()
+        enrichers.append(thread)
+
+    threads = []
+    for worker in self.workers:
+      thread = threading.Thread(
+        target=self._work_scrape if pipeline else self._work,
+        args=(worker,), name=worker.name, daemon=True
+      )
+      thread.start()
+      threads.append(thread)
+
+    try:
+      for thread in threads:
+        #: Join with a timeout so that KeyboardInterrupt is not blocked
+        while thread.is_alive():
+          thread.join(0.5)
+      
+      #: One end marker per enricher, after the last scraped query
+      for _ in enrichers:
+        self._enrich_queue.put(None)
+      for thread in enrichers:
+        while thread.is_alive():
+          thread.join(0.5)
+    except KeyboardInterrupt:
+      logger.warning(
+        'Interrupted, waiting for workers to finish their current query'
+      )
+      self._stopping = True
+      raise
+
+    self._log_end()
+  
+
+  def _work(self, worker: Worker):
+    if self.config.query.tabs > 1:
+      return self._work_tabs(worker)
+
+    while not (self._stopping or worker.stopped):
+      #: Take no query while the web client cannot be started
+      if not worker.ensure_running():
+        continue
+      item = self._next_item()
+      if item is None:
+        break
+
+      try:
+        self._get_item(worker, *item)
+      except Exception as e:
+        logger.error(str(e))
+        continue
+
+
+  def _work_scrape(self, worker: Worker):
+    while not (self._stopping or worker.stopped):
+      #: Take no query while the web client cannot be started
+      if not worker.ensure_running():
+        continue
+      item = self._next_item()
+      if item is None:
+        break
+
+      index, data_object = item
+      self._log_progress(worker, index)
+      try:
+        with self._scrape_meter.measure('busy'):
+          new_query_object, query_status = worker.scrape(data_object)
+      except scraping.CaptchaError:
+        self._on_captcha(worker, [item])
+        continue
+      except Exception as e:
+        logger.error(str(e))
+        continue
+      
+      if query_status == Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+        with self._scrape_meter.measure('blocked'):
+          self._enrich_queue.put((index, new_query_object))
+      else:
+        self._update_one(index, new_query_object, query_status)
+
+      try:
+        worker.maintain()
+      except Exception as e:
+        logger.error(f'Could not restart web client: {str(e)}')
+
+
+  def _work_enrich(self):
+    while True:
+      with self._enrich_meter.measure('idle'):
+        item = self._enrich_queue.get()
+      if item is None:
+        break
+
+      index, scraped_object = item
+      with self._enrich_meter.measure('busy'):
+        try:
+          new_query_object, query_status = query.enrich_one(
+            scraped_object, self.config, resolver=self.resolver
+          )
+        except Exception as e:
+          logger.error(str(e))
+          new_query_object = scraped_object
+          query_status = Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+        self._update_one(index, new_query_object, query_status)
+
+
+  def _work_tabs(self, worker: Worker):
+    #: Web clients are not restarted while tabs are running
+    scheduler = TabScheduler(worker, self.config, tabs=self.config.query.tabs)
+    scheduler.run(
+      lambda: None if self._stopping else self._next_item(),
+      self._update_one,
+      on_start=lambda index: self._log_progress(worker, index),
+      on_captcha=lambda items: self._on_captcha(worker, items)
+    )
+
+
+  def _log_progress(self, worker: Worker, index: int):
+    breaker = ''
+    if self.breaker is not None and self.breaker.captchas > 0:
+      if self.breaker.state != CaptchaBreaker.CLOSED:
+        breaker = f' [{self.breaker.summary()}]'
+
+    if self._source is None:
+      logger.info(
+        f'Query progress: ({index+1}/{self._count}) [{worker.name}]{breaker}'
+      )
+    else:
+      logger.info(
+        f'Query progress: ({index+1}) [{worker.name}]{breaker}'
+      )
+
+
+  def _get_item(self, worker: Worker, index: int, data_object: dict):
+    self._log_progress(worker, index)
+    try:
+      new_query_object, query_status = worker.get(data_object)
+    except scraping.CaptchaError:
+      self._on_captcha(worker, [(index, data_object)])
+      return None
+    self._update_one(index, new_query_object, query_status)
+
+    #: The result is stored; restarting the web client loses no progress
+    try:
+      worker.maintain()
+    except Exception as e:
+      logger.error(f'Could not restart web client: {str(e)}')
+    return new_query_object, query_status
+
+
+  def _on_captcha(self, worker: Worker, items: list[tuple]):
+    """
+    Put back the `(index, data_object)` queries of `items` served a CAPTCHA,
+    then cool down and restart the web client of `worker` with a fresh
+    profile. Stops all workers once the breaker opens.
+    """
+
+    with self._lock:
+      self._retries.extend(items)
+    
+    cooldown_seconds = self.breaker.trip()
+    if self.breaker.is_open:
+      logger.error(
+        f'Stopping query ({self.breaker.summary()}); '
+        f'resume later from the autosave'
+      )
+      self._stopping = True
+      return
     
-    return query_status
+    logger.warning(
+      f'Served a CAPTCHA; cooling down for {cooldown_seconds:.0f} second(s) '
+      f'[{worker.name}] [{self.breaker.summary()}]'
+    )
+    time_end = perf_counter() + cooldown_seconds
+    while not self._stopping and perf_counter() < time_end:
+      sleep(min(0.5, time_end - perf_counter()))
+    
+    if worker.webclient_factory is None:
+      return
+    try:
+      worker.restart('CAPTCHA', fresh_profile=True)
+    except Exception as e:
+      logger.error(f'Could not restart web client: {str(e)}')
+
+
+  def _next_item(self):
+    with self._lock:
+      if len(self._retries) > 0:
+        return self._retries.popleft()
+
+      if len(self._pending) > 0:
+        index = self._pending.popleft()
+        return index, self.data[index]
+      
+      if self._source is not None:
+        try:
+          index, data_object = next(self._source)
+        except StopIteration:
+          self._source_done = True
+          return None
+        self._count = index + 1
+        return index, data_object
+      
+      return None
+
+
+  def _log_end(self):
+    if self.is_finished:
+      logger.info(
+        'Reached end of query'
+      )
+      return
+    
+    rest = '' if self._source is None or self._source_done else \
+      ', and the rest of the queries data,'
+    logger.warning(
+      f'Query stopped with {str(self.unprocessed)} query object(s){rest} not '
+      f'run'
+    )
+    if any(worker.stopped for worker in self.workers):
+      logger.warning(
+        f'Workers stopped: ' +
+        ', '.join(worker.name for worker in self.workers if worker.stopped)
+      )
+
+
+  def _update_one(self, index: int, new_query_object: dict, query_status):
+    with self._lock:
+      if self.data is not None:
+        self.data[index] = new_query_object
+      self._progress += 1
+      self._status_counts[query_status] += 1
+
+      status_completed = \
+        (query_status == Status.QUERY_COMPLETE) or \
+        (query_status == Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING)
+      do_autosave      = \
+        (self.autosave_filename is not None) and \
+        (self.config.fileio.autosave_every > 0) and \
+        (
+          self._is_journal() or
+          self._progress % self.config.fileio.autosave_every == 0
+        )
+      if status_completed and self.breaker is not None:
+        self.breaker.reset()
+      if status_completed and do_autosave:
+        if self._is_journal():
+          self._append_journal(index, new_query_object)
+        else:
+          self.autosave()
   
 
   def report_log(self):
@@ -218,12 +784,109 @@ class BigQuery:
       f'({str(queries_complete_municips_missing)} with missing municips), '
       f'{str(queries_missing)} missing, {str(queries_errored)} error(s)'
     )
+
+    if self.resolver is not None and self.resolver.cache is not None:
+      logger.info(
+        f'Municipality cache: {str(self.resolver.cache.hits)} hit(s), '
+        f'{str(self.resolver.cache.misses)} miss(es)'
+      )
+    if self.resolver is not None and self.resolver.session is not None:
+      logger.info(
+        f'Municipality requests: {str(self.resolver.session.request_count)} '
+        f'request(s) over {str(self.resolver.session.connection_count)} '
+        f'connection(s)'
+      )
+
+    if self.breaker is not None and self.breaker.captchas > 0:
+      logger.warning(
+        f'Served {str(self.breaker.captchas)} CAPTCHA(s); '
+        f'{self.breaker.summary()}'
+      )
+
+    timeouts    = sum(worker.timeouts for worker in self.workers)
+    if timeouts > 0:
+      logger.warning(
+        f'{str(timeouts)} query(s) exceeded their deadline'
+      )
+
+    restarts    = sum(worker.restarts for worker in self.workers)
+    rss_samples = sum(worker.rss_samples for worker in self.workers)
+    if restarts > 0 or rss_samples > 0:
+      rss_peak = max(worker.rss_peak for worker in self.workers)
+      rss_mean = sum(
+        worker.rss_mean * worker.rss_samples for worker in self.workers
+      ) / max(1, rss_samples)
+      logger.info(
+        f'Web clients: {str(restarts)} restart(s); memory peak '
+        f'{rss_peak / 2**20:.0f} MB, mean {rss_mean / 2**20:.0f} MB over '
+        f'{str(rss_samples)} sample(s)'
+      )
+
+    for meter in (self._scrape_meter, self._enrich_meter):
+      if meter is not None and meter.total > 0:
+        logger.info(
+          f'Occupancy of {meter.summary()}'
+        )
+
+    for bucket in ratelimit.iter_buckets():
+      if bucket.waits > 0:
+        logger.info(
+          f'Rate limit of {bucket.summary()}'
+        )
+
+    for histogram in (
+      scraping.PAGE_LATENCY, scraping.WARM_PAGE_LATENCY,
+      scraping.SCROLL_LATENCY, fetching.PAGE_LATENCY
+    ):
+      if histogram.count > 0:
+        logger.info(
+          f'Latency of {histogram.summary()}'
+        )
+
+
+  def close(self):
+    if self.resolver is not None:
+      self.resolver.close()
+      self.resolver = None
   
 
   @property
   def count(self):
     return self._count
   
+  @property
+  def unprocessed(self):
+    """
+    Number of query objects left to be handed out to workers, such as when
+    all workers have stopped. Lazily imported query objects not yet read are
+    not counted.
+    """
+
+    with self._lock:
+      return len(self._pending) + len(self._retries)
+
+  @property
+  def is_finished(self):
+    """
+    Whether every query object has been run.
+    """
+
+    if self.unprocessed > 0:
+      return False
+    return self._source is None or self._source_done
+
   @property
   def progress(self):
-    return self._progress
\ No newline at end of file
+    return self._progress
+
+
+def _iter_resumed(source, journal: dict):
+  #: Replay the journal onto lazily imported query objects as they are read
+  for index, data_object in source:
+    record = journal.get(index)
+    if (
+      record is not None and
+      record[0] == data_object.get(Keys.QUERY_KEYWORD)
+    ):
+      data_object = record[1]
+    yield index, data_object
@@ -0,0 +1,111 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging, threading
+
+from geoid.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+class CaptchaBreaker:
+  """
+  Circuit breaker of CAPTCHAs, shared by all workers of a `BigQuery`.
+
+  The breaker is closed until a CAPTCHA is served. It is then half-open: the
+  worker served the CAPTCHA cools down, doubling from
+  `config.query.captcha_cooldown_seconds` with each CAPTCHA in a row up to
+  `config.query.captcha_cooldown_max_seconds`, and the next completed query
+  closes the breaker again. After `config.query.captcha_open_after` CAPTCHAs
+  in a row, the breaker opens and querying stops.
+  """
+
+  CLOSED    = 'closed'
+  HALF_OPEN = 'half-open'
+  OPEN      = 'open'
+
+  def __init__(self, use_config: Config=None):
+    self.config = use_config if use_config else Config()
+
+    self._state       = self.CLOSED
+    self._consecutive = 0
+    self._captchas    = 0
+    self._lock        = threading.Lock()
+
+
+  def trip(self) -> float:
+    """
+    Record a CAPTCHA, and return the number of seconds to cool down for.
+    """
+
+    with self._lock:
+      self._captchas    += 1
+      self._consecutive += 1
+      
+      if self._consecutive >= max(1, self.config.query.captcha_open_after):
+        self._state = self.OPEN
+        return 0.0
+      
+      self._state = self.HALF_OPEN
+      return min(
+        self.config.query.captcha_cooldown_seconds *
+        2 ** (self._consecutive - 1),
+        self.config.query.captcha_cooldown_max_seconds
+      )
+
+
+  def reset(self):
+    """
+    Record a completed query, closing the breaker unless it is open.
+    """
+
+    with self._lock:
+      if self._state == self.HALF_OPEN:
+        logger.info(
+          'CAPTCHA breaker closed'
+        )
+        self._state = self.CLOSED
+      if self._state == self.CLOSED:
+        self._consecutive = 0
+
+
+  def summary(self) -> str:
+    """
+    Return a one-line summary of the breaker for logging, e.g.
+    `CAPTCHA breaker half-open, 2 in a row`.
+    """
+
+    return (
+      f'CAPTCHA breaker {self._state}, {str(self._consecutive)} in a row'
+    )
+
+
+  @property
+  def state(self):
+    return self._state
+
+  @property
+  def is_open(self):
+    return self._state == self.OPEN
+
+  @property
+  def captchas(self):
+    return self._captchas
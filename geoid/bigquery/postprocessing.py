@@ -25,29 +25,79 @@ from geoid.constants import Keys
 
 logger = logging.getLogger(__name__)
 
+#: Query keys kept in each entry of flattened queries data
+FLAT_HEAD_KEYS = (
+  Keys.QUERY_TERM, Keys.QUERY_LOCATION, Keys.QUERY_KEYWORD,
+  Keys.QUERY_LANG, Keys.QUERY_TIMESTAMP
+)
+
+
+def iter_postprocess(
+  data,
+  *,
+  filter_by_city=False,
+  flatten=False,
+  convert_ascii=False,
+  replace_newline=False
+):
+  """
+  Postprocess queries data one query object at a time.
+
+  Each query object is copied before it is postprocessed, leaving `data`
+  unchanged, so that only one query object is copied at any time.
+
+  Args:
+      data: Iterable of query objects, which may be a generator.
+  
+  Yields:
+      Postprocessed query objects, or flattened entries if `flatten` is set.
+  """
+
+  filtered_count  = 0
+  flattened_count = 0
+
+  for data_object in data:
+    data_object = _copy_one(data_object)
+
+    if filter_by_city:
+      filtered_count += filter_by_city_one(data_object)
+    if convert_ascii:
+      lambda_values_one(data_object, _to_ascii)
+    if replace_newline:
+      lambda_values_one(data_object, lambda s: _replace(s, '\n', '; '))
+
+    if flatten:
+      for flattened_object in convert_flat_one(data_object):
+        flattened_count += 1
+        yield flattened_object
+    else:
+      yield data_object
+  
+  if filter_by_city:
+    logger.info(
+      f'Removed {str(filtered_count)} result(s) '
+      f'with mismatched or missing location'
+    )
+  if flatten:
+    logger.info(
+      f'Flattened query results to {str(flattened_count)} entry(s)'
+    )
+  if convert_ascii:
+    logger.info(
+      f'Converted all string fields to ASCII characters'
+    )
+  if replace_newline:
+    logger.info(
+      f'Converted all character instances of "\n" to "; "'
+    )
+
 
 def filter_by_city(data: list[dict]) -> list[dict]:
   filtered_data = data
   filtered_count = 0
 
   for data_object in filtered_data:
-    try:
-      target_city   = data_object[Keys.CITY_NAME]
-      query_results = data_object[Keys.QUERY_RESULTS]
-    except KeyError:
-      #: Ignore missing-data objects
-      continue
-    
-    filtered_query_results = []
-    for query_result in query_results:
-      query_city = query_result[Keys.CITY_NAME]
-      if target_city.strip().lower() == query_city.strip().lower():
-        filtered_query_results.append(query_result.copy())
-      else:
-        filtered_count = filtered_count + 1
-      
-    data_object[Keys.QUERY_RESULTS] = filtered_query_results
-    data_object[Keys.QUERY_RESULTS_COUNT] = len(filtered_query_results)
+    filtered_count += filter_by_city_one(data_object)
 
   logger.info(
     f'Removed {str(filtered_count)} result(s) '
@@ -56,28 +106,40 @@ def filter_by_city(data: list[dict]) -> list[dict]:
   return filtered_data
 
 
+def filter_by_city_one(data_object: dict) -> int:
+  """
+  Filter the query results of one query object in place.
+
+  Returns:
+      Number of results removed.
+  """
+
+  try:
+    target_city   = data_object[Keys.CITY_NAME]
+    query_results = data_object[Keys.QUERY_RESULTS]
+  except KeyError:
+    #: Ignore missing-data objects
+    return 0
+  
+  filtered_count = 0
+  filtered_query_results = []
+  for query_result in query_results:
+    query_city = query_result[Keys.CITY_NAME]
+    if target_city.strip().lower() == query_city.strip().lower():
+      filtered_query_results.append(query_result.copy())
+    else:
+      filtered_count = filtered_count + 1
+    
+  data_object[Keys.QUERY_RESULTS] = filtered_query_results
+  data_object[Keys.QUERY_RESULTS_COUNT] = len(filtered_query_results)
+  return filtered_count
+
+
 def convert_flat(data: list[dict]) -> list[dict]:
   flattened_data = []
 
   for query_object in data:
-    try:
-      query_results = query_object[Keys.QUERY_RESULTS]
-    except KeyError:
-      continue
-    
-    head_object = dict()
-    for key in query_object.keys():
-      #: Include only some query keys
-      if key in (
-        Keys.QUERY_TERM, Keys.QUERY_LOCATION, Keys.QUERY_KEYWORD, \
-        Keys.QUERY_LANG, Keys.QUERY_TIMESTAMP
-      ):
-        head_object[key] = query_object[key]
-
-    for query_result in query_results:
-      flattened_object = head_object.copy()
-      flattened_object.update(query_result)
-      flattened_data.append(flattened_object)
+    flattened_data.extend(convert_flat_one(query_object))
   
   flattened_data_count = len(flattened_data)
   logger.info(
@@ -86,20 +148,29 @@ def convert_flat(data: list[dict]) -> list[dict]:
   return flattened_data
 
 
+def convert_flat_one(query_object: dict) -> list[dict]:
+  try:
+    query_results = query_object[Keys.QUERY_RESULTS]
+  except KeyError:
+    return []
+  
+  head_object = dict()
+  for key in query_object.keys():
+    #: Include only some query keys
+    if key in FLAT_HEAD_KEYS:
+      head_object[key] = query_object[key]
+
+  flattened_data = []
+  for query_result in query_results:
+    flattened_object = head_object.copy()
+    flattened_object.update(query_result)
+    flattened_data.append(flattened_object)
+  return flattened_data
+
+
 def convert_ascii(data: list[dict]) -> list[dict]:
   ascii_data = data
-  
-  def fun(s):
-    if isinstance(s, str):
-      #: Looks a circular mess (encode -> decode), but it works.
-      return str(
-        unicodedata.normalize('NFKD', s)
-                   .encode('ascii', 'replace')
-                   .decode('utf-8', 'ignore')
-      )
-    else:
-      return s
-  ascii_data = lambda_values(ascii_data, fun)
+  ascii_data = lambda_values(ascii_data, _to_ascii)
   
   logger.info(
     f'Converted all string fields to ASCII characters'
@@ -117,13 +188,9 @@ def replace_characters(
   char_to: str
 ) -> list[dict]:  
   replaced_data = data
-
-  def fun(s):
-    if isinstance(s, str):
-      return s.replace(char_from, char_to)
-    else:
-      return s
-  replaced_data = lambda_values(replaced_data, fun)
+  replaced_data = lambda_values(
+    replaced_data, lambda s: _replace(s, char_from, char_to)
+  )
 
   logger.info(
     f'Converted all character instances of "{char_from}" to "{char_to}"'
@@ -138,12 +205,48 @@ def lambda_values(
   target_data = data
 
   for single_data in target_data:
-    for key in single_data.keys():
-      if isinstance(single_data[key], list):
-        target_data = lambda_values(single_data[key], value_function)
-      elif isinstance(single_data[key], dict):
-        pass
-      else:
-        single_data[key] = value_function(single_data[key])
+    lambda_values_one(single_data, value_function)
   
-  return target_data
\ No newline at end of file
+  return target_data
+
+
+def lambda_values_one(single_data: dict, value_function):
+  for key in single_data.keys():
+    if isinstance(single_data[key], list):
+      lambda_values(single_data[key], value_function)
+    elif isinstance(single_data[key], dict):
+      pass
+    else:
+      single_data[key] = value_function(single_data[key])
+
+
+def _to_ascii(s):
+  if isinstance(s, str):
+    #: Looks a circular mess (encode -> decode), but it works.
+    return str(
+      unicodedata.normalize('NFKD', s)
+                 .encode('ascii', 'replace')
+                 .decode('utf-8', 'ignore')
+    )
+  else:
+    return s
+
+
+def _replace(s, char_from: str, char_to: str):
+  if isinstance(s, str):
+    return s.replace(char_from, char_to)
+  else:
+    return s
+
+
+def _copy_one(data_object: dict) -> dict:
+  #: Copy of a query object deep enough for postprocessing in place, which
+  #: only replaces values of the object and of its results
+  new_object = data_object.copy()
+  query_results = new_object.get(Keys.QUERY_RESULTS)
+  if isinstance(query_results, list):
+    new_object[Keys.QUERY_RESULTS] = [
+      result.copy() if isinstance(result, dict) else result
+      for result in query_results
+    ]
+  return new_object
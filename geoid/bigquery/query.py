@@ -20,11 +20,11 @@
 
 from selenium.webdriver.remote.webdriver import WebDriver
 
-import logging
+import asyncio, logging
 
 from geoid.config import Config
 from geoid.constants import Keys, Status
-from geoid.query import query
+from geoid.query import query, scraping
 from geoid.common import io
 
 
@@ -34,16 +34,24 @@ logger = logging.getLogger(__name__)
 def get_iterator(
   queries_data: list[dict],
   webdriver: WebDriver,
-  config: Config
+  config: Config,
+  *,
+  resolver=None
 ):
   queries_count = len(queries_data)
   for index, data_object in enumerate(queries_data):
     logger.info(
       f'Query progress: ({index+1}/{queries_count})'
     )
-    new_object, query_status = get_one(
-      data_object, webdriver, config
-    )
+    try:
+      new_object, query_status = get_one(
+        data_object, webdriver, config, resolver=resolver
+      )
+    except scraping.CaptchaError as e:
+      logger.error(str(e))
+      new_object = data_object.copy()
+      new_object[Keys.QUERY_STATUS] = Status.QUERY_ERRORED
+      query_status = Status.QUERY_ERRORED
     
     yield new_object, index, query_status
   
@@ -55,8 +63,35 @@ def get_iterator(
 def get_one(
   data_object: dict,
   webdriver: WebDriver,
-  config: Config
+  config: Config,
+  *,
+  resolver=None
+):
+  """
+  Run a query object: scrape it with `scrape_one()`, then complete it with
+  municipality data with `enrich_one()`.
+  """
+
+  new_object, query_status = scrape_one(
+    data_object, webdriver, config, resolver=resolver
+  )
+  if query_status != Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+    return new_object, query_status
+  return enrich_one(new_object, config, resolver=resolver)
+
+
+def scrape_one(
+  data_object: dict,
+  webdriver: WebDriver,
+  config: Config,
+  *,
+  resolver=None
 ):
+  """
+  Scraping stage of `get_one()`. Query objects returned with status
+  `QUERY_COMPLETE_MUNICIPALITIES_MISSING` are completed by `enrich_one()`.
+  """
+
   #: 1
   if io._is_keyword_missing(data_object):
     logger.warning(
@@ -69,21 +104,64 @@ def get_one(
 
   if Keys.QUERY_STATUS not in new_object:
     new_object[Keys.QUERY_STATUS] = Status.QUERY_INCOMPLETE
-    
-  query_status = new_object[Keys.QUERY_STATUS]
 
   #: 2
-  if query_status == Status.QUERY_COMPLETE:
+  if new_object[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE:
     logger.info(
       f'Query already marked as complete: "{query_keyword}"'
     )
     return new_object, Status.QUERY_COMPLETE
   
   #: 3
-  new_object.update(query.get(new_object, webdriver, use_config=config))
+  new_object.update(scraping.run_steps(query.iter_scrape(
+    new_object, webdriver, config, resolver=resolver
+  )))
 
-  #: 4
   query_status = new_object[Keys.QUERY_STATUS]
+  if query_status != Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+    _log_status(query_keyword, query_status)
+  return new_object, query_status
+
+
+def enrich_one(
+  scraped_object: dict,
+  config: Config,
+  *,
+  resolver=None
+):
+  """
+  Complete a query object scraped by `query.iter_scrape()` with municipality
+  data, as the last stage of `get_one()`.
+  """
+
+  new_object = query.enrich(scraped_object, config, resolver=resolver)
+
+  query_status = new_object[Keys.QUERY_STATUS]
+  _log_status(new_object.get(Keys.QUERY_KEYWORD), query_status)
+  return new_object, query_status
+
+
+async def enrich_one_async(
+  scraped_object: dict,
+  config: Config,
+  *,
+  resolver=None,
+  limit: asyncio.Semaphore=None
+):
+  """
+  Same as `enrich_one()`, for use under an asyncio event loop.
+  """
+
+  new_object = await query.enrich_async(
+    scraped_object, config, resolver=resolver, limit=limit
+  )
+
+  query_status = new_object[Keys.QUERY_STATUS]
+  _log_status(new_object.get(Keys.QUERY_KEYWORD), query_status)
+  return new_object, query_status
+
+
+def _log_status(query_keyword: str, query_status):
   if query_status == Status.QUERY_MISSING:
     logger.warning(
       f'Query skipped due to missing keyword'
@@ -103,5 +181,3 @@ def get_one(
     logger.warning(
       f'Query contains missing municipality data: "{query_keyword}"'
     )
-  
-  return new_object, query_status
\ No newline at end of file
@@ -0,0 +1,202 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+import logging
+
+from geoid.common import io, webclient
+from geoid.config import Config
+from geoid.constants import Keys, Status
+from geoid.query import query as query_, scraping
+from . import query
+from .worker import Worker
+
+
+logger = logging.getLogger(__name__)
+
+
+class TabScheduler:
+  """
+  Run several queries at once on the web client of one worker, one query per
+  browser tab.
+
+  Each query is run by `query.iter_scrape()`, which yields whenever it waits
+  for the page. The scheduler resumes whichever tab is due first, switching
+  the web client to its window, so that tabs load and scroll while others
+  wait. Municipality data of scraped queries is pulled in the background,
+  leaving the tab free for the next query.
+
+  Not supported with the http engine and the network parser, whose requests
+  cannot be told apart by tab.
+  """
+
+  def __init__(self, worker: Worker, config: Config, *, tabs: int=2):
+    if config.query.engine == 'http' or config.query.parser == 'network':
+      raise ValueError(
+        'Tabs are not supported with the http engine or network parser'
+      )
+    
+    self.worker = worker
+    self.config = config
+    self.tabs   = max(1, tabs)
+
+
+  def run(self, next_item, on_done, on_start=None, on_captcha=None):
+    """
+    Run queries until `next_item()` returns None.
+
+    Args:
+        next_item (Callable): Returns the next `(index, data_object)` to query,
+        or None if there are none left.
+        on_done (Callable): Called with the index, new query object and query
+        status of each completed query, from any thread.
+        on_start (Callable): Called with the index of each query as it starts.
+        on_captcha (Callable): Called with the `(index, data_object)` of every
+        running query once a tab is served a CAPTCHA, from the scheduler
+        thread. The queries are dropped, and the tabs are opened again on the
+        web client of the worker, which may have been restarted. If not set,
+        only the query served the CAPTCHA is marked as errored.
+    """
+
+    webdriver = self.worker.webdriver
+    handles = self._open_tabs(webdriver)
+    current = webdriver.current_window_handle
+
+    #: handle -> [ready time, index, data object, steps]
+    running = {}
+    idle = list(handles)
+    exhausted = False
+
+    with ThreadPoolExecutor(
+      max_workers=self.tabs, thread_name_prefix=f'{self.worker.name}-enrich'
+    ) as executor:
+      while True:
+        #: Hand out queries to idle tabs
+        while len(idle) > 0 and not exhausted:
+          item = next_item()
+          if item is None:
+            exhausted = True
+            break
+          index, data_object = item
+          if on_start is not None:
+            on_start(index)
+          if not self._is_due(data_object):
+            #: Nothing to scrape; complete as query.get_one() would
+            executor.submit(self._enrich, index, data_object, on_done)
+            continue
+          if Keys.QUERY_STATUS not in data_object:
+            data_object = {
+              **data_object, Keys.QUERY_STATUS: Status.QUERY_INCOMPLETE
+            }
+          steps = query_.iter_scrape(
+            data_object, webdriver, self.config,
+            resolver=self.worker.resolver, interleaved=True
+          )
+          running[idle.pop()] = [perf_counter(), index, data_object, steps]
+        
+        if len(running) <= 0:
+          break
+
+        #: Resume the tab due first
+        handle = min(running, key=lambda key: running[key][0])
+        task = running[handle]
+        wait_seconds = task[0] - perf_counter()
+        if wait_seconds > 0:
+          sleep(wait_seconds)
+
+        try:
+          if handle != current:
+            webdriver.switch_to.window(handle)
+            current = handle
+          task[0] = perf_counter() + next(task[3])
+          continue
+        except StopIteration as stop:
+          new_object = stop.value
+        except scraping.CaptchaError as e:
+          if on_captcha is None:
+            logger.error(str(e))
+            new_object = task[2].copy()
+            new_object[Keys.QUERY_STATUS] = Status.QUERY_ERRORED
+          else:
+            #: The other tabs share the blocked session
+            items = [(task[1], task[2]) for task in running.values()]
+            for task in running.values():
+              task[3].close()
+            running.clear()
+            on_captcha(items)
+
+            webdriver = self.worker.webdriver
+            if webdriver is None:
+              break
+            handles = self._open_tabs(webdriver)
+            current = webdriver.current_window_handle
+            idle = list(handles)
+            continue
+        except Exception as e:
+          logger.error(str(e))
+          new_object = task[2].copy()
+          new_object[Keys.QUERY_STATUS] = Status.QUERY_ERRORED
+        
+        del running[handle]
+        idle.append(handle)
+        executor.submit(self._enrich, task[1], new_object, on_done)
+  
+
+  def _is_due(self, data_object: dict):
+    return (
+      not io._is_keyword_missing(data_object) and
+      data_object.get(Keys.QUERY_STATUS) not in (
+        Status.QUERY_COMPLETE, Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+      )
+    )
+  
+
+  def _enrich(self, index: int, new_object: dict, on_done):
+    try:
+      if io._is_keyword_missing(new_object):
+        logger.warning(
+          f'Query skipped due to missing keyword'
+        )
+        query_status = Status.QUERY_MISSING
+      else:
+        new_object, query_status = query.enrich_one(
+          new_object, self.config, resolver=self.worker.resolver
+        )
+    except Exception as e:
+      logger.error(str(e))
+      new_object = new_object.copy()
+      new_object[Keys.QUERY_STATUS] = Status.QUERY_ERRORED
+      query_status = Status.QUERY_ERRORED
+    on_done(index, new_object, query_status)
+  
+
+  def _open_tabs(self, webdriver):
+    handles = list(webdriver.window_handles)
+    if len(handles) < self.tabs:
+      original = webdriver.current_window_handle
+      for _ in range(self.tabs - len(handles)):
+        webdriver.switch_to.new_window('tab')
+        if self.config.webclient.lean:
+          #: URL blocking of the first tab does not carry over to new tabs
+          webclient.block_lean_urls(webdriver)
+      webdriver.switch_to.window(original)
+      handles = list(webdriver.window_handles)
+    return handles[:self.tabs]
@@ -0,0 +1,298 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from time import sleep
+import logging, threading
+
+from geoid.common import memory
+from geoid.config import Config
+from geoid.constants import Keys, Status
+from . import query
+
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+  """
+  A query worker bound to one Selenium web client.
+
+  Workers are handed query objects by `BigQuery` and run them one at a time on
+  their own web client, so that several workers may run in parallel.
+
+  With `webclient_factory` set, the web client is restarted by `maintain()`
+  after `config.webclient.recycle_queries` queries, or once the memory of its
+  process tree exceeds `config.webclient.recycle_rss_mb`. A web client which
+  could not be started is started again by `ensure_running()` before the next
+  query; the worker stops after `config.webclient.restart_attempts` failed
+  starts in a row.
+
+  With `config.query.deadline_seconds` set, a query still scraping past its
+  deadline and `config.query.watchdog_grace_seconds` is taken as hung: it is
+  marked as errored, and its web client is killed and restarted. Without
+  `webclient_factory`, the worker is stopped instead. The deadline does not
+  cover municipality lookups, which run once scraping is done.
+  """
+
+  def __init__(
+    self,
+    webdriver: WebDriver,
+    config: Config,
+    *,
+    name: str='worker-1',
+    resolver=None,
+    webclient_factory=None
+  ):
+    self.webdriver         = webdriver
+    self.config            = config
+    self.name              = name
+    self.resolver          = resolver
+    self.webclient_factory = webclient_factory
+
+    self._queries          = 0
+    self._client_queries   = 0
+    self._restarts         = 0
+    self._restart_failures = 0
+    self._timeouts         = 0
+    self._rss_samples      = 0
+    self._rss_total        = 0
+    self._rss_peak         = 0
+
+
+  def get(self, data_object: dict):
+    """
+    Scrape a query, then complete it with municipality data; see
+    `query.get_one()`.
+    """
+
+    new_object, query_status = self.scrape(data_object)
+    if query_status != Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+      return new_object, query_status
+    
+    #: Outside of the watchdog; slow lookups do not hang the web client
+    return query.enrich_one(new_object, self.config, resolver=self.resolver)
+
+
+  def scrape(self, data_object: dict):
+    """
+    Scraping stage of `get()`; see `query.scrape_one()`.
+    """
+
+    return self._run(query.scrape_one, data_object)
+
+
+  def _run(self, get_function, data_object: dict):
+    if self.config.query.deadline_seconds > 0:
+      new_object, query_status = self._run_watched(get_function, data_object)
+    else:
+      new_object, query_status = get_function(
+        data_object, self.webdriver, self.config, resolver=self.resolver
+      )
+    self._queries += 1
+    self._client_queries += 1
+    return new_object, query_status
+
+
+  def _run_watched(self, get_function, data_object: dict):
+    #: Run the query in its own thread, as a hung webdriver call cannot be
+    #: interrupted from the thread making it
+    outcome = {}
+    webdriver = self.webdriver
+
+    def run():
+      try:
+        outcome['result'] = get_function(
+          data_object, webdriver, self.config, resolver=self.resolver
+        )
+      except BaseException as e:
+        outcome['error'] = e
+    
+    thread = threading.Thread(
+      target=run, name=f'{self.name}-query', daemon=True
+    )
+    thread.start()
+    thread.join(
+      self.config.query.deadline_seconds +
+      self.config.query.watchdog_grace_seconds
+    )
+
+    if not thread.is_alive():
+      if 'error' in outcome:
+        raise outcome['error']
+      return outcome['result']
+    
+    #: Hung; kill the web client so that the stuck call fails, and leave the
+    #: thread to end on its own
+    self._timeouts += 1
+    logger.error(
+      f'Query exceeded its deadline, killing web client: '
+      f'"{data_object.get(Keys.QUERY_KEYWORD)}" [{self.name}]'
+    )
+    pid = memory.webdriver_pid(webdriver)
+    if pid is not None:
+      memory.kill_process_tree(pid)
+    
+    #: Restarted by the next maintain(); with no factory to restart from, the
+    #: worker stops
+    self.webdriver = None
+    if self.webclient_factory is None:
+      logger.error(
+        f'Stopping worker, its web client cannot be restarted [{self.name}]'
+      )
+    
+    new_object = data_object.copy()
+    new_object[Keys.QUERY_STATUS] = Status.QUERY_ERRORED
+    return new_object, Status.QUERY_ERRORED
+
+
+  def maintain(self):
+    """
+    Sample the memory of the web client and restart it if it is due. Call
+    between queries, once the result of the last query is stored.
+    """
+
+    rss = memory.webdriver_rss(self.webdriver)
+    if rss is not None:
+      self._rss_samples += 1
+      self._rss_total   += rss
+      self._rss_peak     = max(self._rss_peak, rss)
+      logger.debug(
+        f'Web client memory: {rss / 2**20:.0f} MB [{self.name}]'
+      )
+
+    if self.webclient_factory is None:
+      return
+    
+    recycle_queries = self.config.webclient.recycle_queries
+    recycle_rss_mb  = self.config.webclient.recycle_rss_mb
+    if self.webdriver is None:
+      reason = 'web client is not running'
+    elif recycle_queries > 0 and self._client_queries >= recycle_queries:
+      reason = f'{str(self._client_queries)} queries'
+    elif recycle_rss_mb > 0 and rss is not None and rss > recycle_rss_mb * 2**20:
+      reason = f'{rss / 2**20:.0f} MB memory'
+    else:
+      return
+    
+    self.restart(reason)
+
+
+  def restart(self, reason: str='requested', *, fresh_profile: bool=False):
+    """
+    Quit the web client and start a new one from `webclient_factory`, with a
+    fresh browser profile if `fresh_profile` is set.
+    """
+
+    logger.info(
+      f'Restarting web client ({reason}) [{self.name}]'
+    )
+    if self.webdriver is not None:
+      try:
+        self.webdriver.quit()
+      except Exception as e:
+        logger.warning(f'Could not quit web client: {str(e)}')
+    
+    #: If starting fails, ensure_running() tries again
+    self.webdriver       = None
+    try:
+      if fresh_profile:
+        self.webdriver   = self.webclient_factory(fresh_profile=True)
+      else:
+        self.webdriver   = self.webclient_factory()
+    except Exception:
+      self._restart_failures += 1
+      raise
+    self._restart_failures = 0
+    self._client_queries = 0
+    self._restarts      += 1
+
+
+  def ensure_running(self) -> bool:
+    """
+    Start the web client again if it is not running, such as after a failed
+    restart. Call before taking the next query, and take none if this returns
+    False.
+    """
+
+    if self.webdriver is not None:
+      return True
+    if self.stopped:
+      return False
+    
+    if self._restart_failures > 0:
+      #: Back off between failed starts
+      sleep(min(2 ** (self._restart_failures - 1), 30))
+    try:
+      self.restart('web client is not running')
+    except Exception as e:
+      logger.error(
+        f'Could not restart web client '
+        f'({str(self._restart_failures)}/{str(self._restart_attempts)}): '
+        f'{str(e)} [{self.name}]'
+      )
+      if self.stopped:
+        logger.error(
+          f'Stopping worker, its web client could not be restarted '
+          f'[{self.name}]'
+        )
+      return False
+    return True
+
+
+  @property
+  def stopped(self):
+    """
+    Whether the worker has no web client and cannot start one.
+    """
+
+    return self.webdriver is None and (
+      self.webclient_factory is None or
+      self._restart_failures >= self._restart_attempts
+    )
+
+  @property
+  def _restart_attempts(self):
+    return max(1, self.config.webclient.restart_attempts)
+
+  @property
+  def queries(self):
+    return self._queries
+
+  @property
+  def restarts(self):
+    return self._restarts
+
+  @property
+  def timeouts(self):
+    return self._timeouts
+
+  @property
+  def rss_samples(self):
+    return self._rss_samples
+
+  @property
+  def rss_peak(self):
+    return self._rss_peak
+
+  @property
+  def rss_mean(self):
+    return self._rss_total / self._rss_samples if self._rss_samples > 0 else 0
@@ -134,6 +134,199 @@ def build():
     default='chrome',
     dest='browser'
   )
+  query_options_args.add_argument(
+    '-w', '--workers', type=int,
+    help='number of browser clients to query with in parallel (default: 1)',
+    action='store',
+    default=1,
+    metavar='<number>',
+    dest='workers'
+  )
+  query_options_args.add_argument(
+    '-T', '--tabs', type=int,
+    help='number of tabs each browser client queries with at once; not '
+      'supported with streaming, the http engine or network parser '
+      '(default: 1)',
+    action='store',
+    default=1,
+    metavar='<number>',
+    dest='tabs'
+  )
+  query_options_args.add_argument(
+    '-P', '--pipeline',
+    help='pull municipality data in the background while browser clients '
+      'move on to the next query',
+    action='store_true',
+    dest='pipeline'
+  )
+  query_options_args.add_argument(
+    '-p', '--parser', type=str,
+    choices=['bs4', 'lxml', 'script', 'network'],
+    help='parser backend for search results; lxml is faster, script extracts '
+      'results in the browser, network decodes search responses captured '
+      'from chrome (default: bs4)',
+    action='store',
+    default='bs4',
+    dest='parser'
+  )
+  query_options_args.add_argument(
+    '-e', '--engine', type=str,
+    choices=['browser', 'http'],
+    help='query with a browser client, or over plain HTTP without a browser '
+      '(default: browser)',
+    action='store',
+    default='browser',
+    dest='engine'
+  )
+  query_options_args.add_argument(
+    '-eu', '--engine-url', type=str,
+    help='base URL of search requests with the http engine '
+      '(default: https://www.google.com)',
+    action='store',
+    default=None,
+    metavar='<url>',
+    dest='engine_url'
+  )
+  query_options_args.add_argument(
+    '-sm', '--scroll-mode', type=str,
+    choices=['webdriver', 'script'],
+    help='scroll with webdriver calls, or with one in-page script call per '
+      'scroll (default: webdriver)',
+    action='store',
+    default='webdriver',
+    dest='scroll_mode'
+  )
+  query_options_args.add_argument(
+    '-dl', '--deadline', type=float,
+    help='time budget of each query in seconds; scrolling stops at the '
+      'deadline, and a query hung past it restarts its browser client; set 0 '
+      'for no deadline (default: 0)',
+    action='store',
+    default=0.0,
+    metavar='<seconds>',
+    dest='deadline'
+  )
+  query_options_args.add_argument(
+    '-wn', '--warm-navigation',
+    help='submit each query in the loaded page instead of reloading it; '
+      'reloads the page on failure',
+    action='store_true',
+    dest='warm_navigation'
+  )
+  query_options_args.add_argument(
+    '-I', '--incremental',
+    help='parse results and get their municipality data while scrolling; '
+      'keeps results found before a scrolling error; not supported with '
+      '-e http',
+    action='store_true',
+    dest='incremental'
+  )
+  query_options_args.add_argument(
+    '-cc', '--captcha-cooldown', type=float,
+    help='seconds a browser client waits after a CAPTCHA before restarting '
+      'with a fresh profile, doubling with each CAPTCHA in a row '
+      '(default: 30)',
+    action='store',
+    default=30.0,
+    metavar='<seconds>',
+    dest='captcha_cooldown'
+  )
+  query_options_args.add_argument(
+    '-co', '--captcha-open-after', type=int,
+    help='stop querying after a number of CAPTCHAs in a row, keeping the '
+      'autosave to resume from (default: 5)',
+    action='store',
+    default=5,
+    metavar='<number>',
+    dest='captcha_open_after'
+  )
+  query_options_args.add_argument(
+    '-L', '--lean',
+    help='block images, fonts and map tiles, and use memory-saving browser '
+      'flags',
+    action='store_true',
+    dest='lean'
+  )
+  query_options_args.add_argument(
+    '-pl', '--page-load', type=str,
+    choices=['normal', 'eager', 'none'],
+    help='browser page load strategy; eager and none return before '
+      'subresources finish loading (default: normal)',
+    action='store',
+    default=None,
+    dest='page_load'
+  )
+  query_options_args.add_argument(
+    '-ud', '--user-data-dir', type=str,
+    help='keep browser profiles, including cached static assets, in a '
+      'directory between runs',
+    action='store',
+    default=None,
+    metavar='<dir>',
+    dest='user_data_dir'
+  )
+  query_options_args.add_argument(
+    '-rq', '--recycle-queries', type=int,
+    help='restart each browser client after a number of queries; set 0 to '
+      'never restart (default: 0)',
+    action='store',
+    default=0,
+    metavar='<number>',
+    dest='recycle_queries'
+  )
+  query_options_args.add_argument(
+    '-rm', '--recycle-memory', type=int,
+    help='restart a browser client once its processes use more than a number '
+      'of MB of memory; set 0 to never restart (default: 0)',
+    action='store',
+    default=0,
+    metavar='<MB>',
+    dest='recycle_memory'
+  )
+  query_options_args.add_argument(
+    '-ra', '--restart-attempts', type=int,
+    help='stop a worker after a number of failed browser client restarts in a '
+      'row (default: 3)',
+    action='store',
+    default=3,
+    metavar='<number>',
+    dest='restart_attempts'
+  )
+  query_options_args.add_argument(
+    '-pr', '--page-rate', type=float,
+    help='most page loads per second across all browser clients; set 0 for '
+      'no limit (default: 0)',
+    action='store',
+    default=0.0,
+    metavar='<float>',
+    dest='page_rate'
+  )
+  query_options_args.add_argument(
+    '-sr', '--scroll-rate', type=float,
+    help='most scrolls per second across all browser clients; set 0 for no '
+      'limit (default: 0)',
+    action='store',
+    default=0.0,
+    metavar='<float>',
+    dest='scroll_rate'
+  )
+  query_options_args.add_argument(
+    '-mr', '--municipality-rate', type=float,
+    help='most municipality data requests per second; set 0 for no limit '
+      '(default: 0)',
+    action='store',
+    default=0.0,
+    metavar='<float>',
+    dest='municipality_rate'
+  )
+  query_options_args.add_argument(
+    '-rf', '--rate-limit-file', type=str,
+    help='share rate limits with other runs using the same SQLite file',
+    action='store',
+    default=None,
+    metavar='<filename>',
+    dest='rate_limit_file'
+  )
   query_options_args.add_argument(
     '-s', '--show',
     help='display browser client',
@@ -152,6 +345,32 @@ def build():
     action='store_true',
     dest='keep_autosave'
   )
+  query_options_args.add_argument(
+    '-of', '--output-format', type=str,
+    choices=['json', 'ndjson', 'csv'],
+    help='output file format; csv output is always flattened (default: json)',
+    action='store',
+    default='json',
+    dest='output_format'
+  )
+  query_options_args.add_argument(
+    '-st', '--stream',
+    help='read queries and write results one at a time to bound memory use; uses one browser client',
+    action='store_true',
+    dest='stream'
+  )
+  query_options_args.add_argument(
+    '-j', '--journal',
+    help='autosave by appending each completed query as a JSON line instead of rewriting the whole file',
+    action='store_true',
+    dest='journal'
+  )
+  query_options_args.add_argument(
+    '-r', '--resume',
+    help='resume from an existing autosave of the same source file, skipping completed queries',
+    action='store_true',
+    dest='resume'
+  )
   query_options_args.add_argument(
     '-in', '--indent', type=int,
     help='set output file indent by number of spaces (default: 2)',
@@ -162,12 +381,28 @@ def build():
   )
   query_options_args.add_argument(
     '-ip', '--init-pause', type=float,
-    help='pause for a set number of seconds after access (default: 0.0)',
+    help='wait up to a set number of seconds after access for results to appear (default: 0.0)',
     action='store',
     default=0.0,
     metavar='<float>',
     dest='init_pause'
   )
+  query_options_args.add_argument(
+    '-mc', '--municipality-cache', type=str,
+    help='cache municipality data in a persistent SQLite file for reuse in later runs',
+    action='store',
+    default=None,
+    metavar='<filename>',
+    dest='municipality_cache'
+  )
+  query_options_args.add_argument(
+    '-md', '--municipality-dataset', type=str,
+    help='resolve municipality data offline from a local villages CSV dataset',
+    action='store',
+    default=None,
+    metavar='<filename>',
+    dest='municipality_dataset'
+  )
   query_options_args.add_argument(
     '-fi', '--filter',
     help='filter query results with mismatched cities',
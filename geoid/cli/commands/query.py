@@ -23,8 +23,9 @@ from selenium.common.exceptions import *
 from geoid.bigquery import BigQuery
 from geoid.common import webclient
 from geoid.config import Config
+from geoid.query.fetching import HttpSearch
 from geoid.logging import log_start
-import logging, logging.config, time
+import logging, logging.config, os, shutil, time
 
 
 logger = logging.getLogger(__name__)
@@ -46,17 +47,55 @@ def start_query(args):
   
   config = Config()
   config.query.depth                 = args.depth
+  config.query.workers               = args.workers
+  config.query.tabs                  = args.tabs
+  config.query.pipeline              = args.pipeline
+  config.query.captcha_cooldown_seconds = args.captcha_cooldown
+  config.query.captcha_open_after       = args.captcha_open_after
+  config.query.parser                = args.parser
+  config.query.incremental           = args.incremental
+  config.query.scroll_mode           = args.scroll_mode
+  config.query.warm_navigation       = args.warm_navigation
+  config.query.deadline_seconds      = args.deadline
+  config.query.engine                = args.engine
+  if args.engine_url:
+    config.query.http_base_url       = args.engine_url
   config.fileio.output_indent        = args.indent
   config.webclient.webclient         = args.browser
   config.query.initial_pause_seconds = args.init_pause
   config.webclient.show              = args.show
+  config.webclient.lean              = args.lean
+  config.webclient.page_load_strategy = args.page_load
+  config.webclient.user_data_dir     = args.user_data_dir
+  config.webclient.recycle_queries   = args.recycle_queries
+  config.webclient.recycle_rss_mb    = args.recycle_memory
+  config.webclient.restart_attempts  = args.restart_attempts
+  config.ratelimit.page_loads_per_second = args.page_rate
+  config.ratelimit.scrolls_per_second    = args.scroll_rate
+  config.ratelimit.municipality_requests_per_second = args.municipality_rate
+  config.ratelimit.shared_filename       = args.rate_limit_file
   config.fileio.use_timestamp_name   = args.timestamp
   config.fileio.keep_autosave        = args.keep_autosave
+  config.fileio.autosave_mode        = 'journal' if args.journal else 'full'
+  config.fileio.resume_autosave      = args.resume
+  config.fileio.output_format        = args.output_format
+  config.fileio.stream               = args.stream
+  config.municipality.cache_filename = args.municipality_cache
+  if args.municipality_dataset:
+    config.municipality.backend          = 'offline'
+    config.municipality.dataset_filename = args.municipality_dataset
   config.postproc.filter             = args.filter
   config.postproc.flatten            = args.flatten
   config.postproc.convert_ascii      = args.convert_ascii
   config.postproc.replace_newline    = args.replace_newline
 
+  if config.query.incremental and config.query.engine == 'http':
+    print(
+      'The incremental option cannot be used with the http engine, which '
+      'does not scroll'
+    )
+    return
+
   print(
     f'Launching query, source file: {args.sourcefile}.'
   )
@@ -105,53 +144,110 @@ def run_batch(
   querier.target_filename   = output_file
   querier.autosave_filename = output_file + '.autosave'
 
-  querier.import_data(source_file)
+  if config.fileio.stream:
+    querier.import_data(source_file, lazy=True)
+  else:
+    querier.import_data(source_file)
+  if config.fileio.resume_autosave:
+    querier.resume_autosave()
 
   _run(querier, config)
 
 
 def _run(querier: BigQuery, config: Config):
-  if querier.count <= 0:
+  stream = config.fileio.stream
+  if querier.count <= 0 and not stream:
     return
 
-  #: Initialize web client
-  logger.info('Initializing web client')
+  #: Initialize web clients, one per worker. Streamed queries are written in
+  #: order of completion, and so are run by one worker.
+  if stream:
+    workers = 1
+  else:
+    workers = max(1, min(config.query.workers, querier.count))
+  drivers = []
+  logger.info(f'Initializing web client(s): {str(workers)}')
   try:
-    driver = _init_webclient(config)
-    querier.initialize(driver)
+    for index in range(workers):
+      drivers.append(_init_webclient(config, index))
+    querier.initialize_workers(
+      drivers,
+      webclient_factory=lambda index, **kwargs: \
+        _init_webclient(config, index, **kwargs)
+    )
   except Exception as e:
     logger.exception(e)
+    _quit_webclients(drivers)
     return
   else:
-    logger.info('Initialized web client')
+    logger.info('Initialized web client(s)')
 
   #: Query
   try:
-    querier = _get_all(querier)
+    if stream:
+      #: Export each query object as soon as it is completed
+      querier.export(
+        querier.target_filename,
+        objects=(
+          query_object for _, query_object, _ in querier.iter_all()
+        )
+      )
+    elif workers > 1 or config.query.tabs > 1 or config.query.pipeline:
+      querier.get_all_workers()
+    else:
+      querier = _get_all(querier)
   finally:
-    logger.info('Terminating web client')
-    driver.quit()
-    logger.info('Terminated web client')
-
-  querier.report_log()
+    #: Workers may have restarted their web clients
+    _quit_webclients([
+      worker.webdriver for worker in querier.workers
+      if worker.webdriver is not None
+    ])
+    #: Close the municipality cache and session, even when interrupted; the
+    #: report reads their counts first
+    try:
+      querier.report_log()
+    finally:
+      querier.close()
 
   #: Export
-  if querier.count > 0:
-    querier.export_json(querier.target_filename)
+  if stream:
+    pass
+  elif querier.count > 0:
+    querier.export(querier.target_filename)
   else:
     logger.info('No entries to export')
   querier.remove_autosave_if_set()
 
 
-def _init_webclient(config: Config):
+def _quit_webclients(drivers: list):
+  logger.info('Terminating web client(s)')
+  for driver in drivers:
+    try:
+      driver.quit()
+    except Exception as e:
+      logger.exception(e)
+  logger.info('Terminated web client(s)')
+
+
+def _init_webclient(
+  config: Config,
+  index: int=0,
+  *,
+  fresh_profile: bool=False
+):
   """
   Initialize a Selenium web client.
 
   Receive input from config value `config.webclient.webclient`, then initialize
-  a Selenium webdriver controlling the web client.
+  a Selenium webdriver controlling the web client. With `config.query.engine`
+  set to `'http'`, initialize an HTTP search client instead.
 
   Args:
       config: Config object containing advanced query settings.
+      index: Index of the worker of the web client. Each worker is given its
+      own user data directory under `config.webclient.user_data_dir`.
+      fresh_profile: Clear the user data directory of the worker first, such
+      as after the web client was served a CAPTCHA.
   
   Returns:
       Selenium webdriver controlling the web client.
@@ -163,12 +259,39 @@ def _init_webclient(config: Config):
       web client closed itself to update.
   """
 
+  if config.query.engine == 'http':
+    return HttpSearch(config)
+
   use_client  = config.webclient.webclient.lower().strip()
   show_client = config.webclient.show
+  capture     = config.query.parser == 'network'
+  options     = {
+    'lean'               : config.webclient.lean,
+    'page_load_strategy' : config.webclient.page_load_strategy,
+    'user_data_dir'      : None
+  }
+  if config.webclient.user_data_dir:
+    #: Browsers lock their user data directory; one per worker
+    options['user_data_dir'] = os.path.join(
+      config.webclient.user_data_dir, f'worker-{str(index + 1)}'
+    )
+    if fresh_profile and os.path.isdir(options['user_data_dir']):
+      shutil.rmtree(options['user_data_dir'], ignore_errors=True)
+
   if use_client == 'firefox':
-    driver = webclient.init_firefox(show_client=show_client)
+    if capture:
+      raise ValueError(
+        'Network parser is only supported by the chrome webclient'
+      )
+    driver = webclient.init_firefox(
+      show_client=show_client, background_tabs=config.query.tabs > 1,
+      **options
+    )
   elif use_client == 'chrome':
-    driver = webclient.init_chrome(show_client=show_client)
+    driver = webclient.init_chrome(
+      show_client=show_client, capture_network=capture,
+      background_tabs=config.query.tabs > 1, **options
+    )
   else:
     raise ValueError(
       f'Webclient "{use_client}" does not exist or is unsupported'
@@ -19,7 +19,8 @@
 # SOFTWARE.
 
 from geoid.constants import Keys, Objects
-import os, json, logging
+from abc import ABC, abstractmethod
+import os, csv, json, logging
 
 
 logger = logging.getLogger(__name__)
@@ -40,16 +41,33 @@ def import_data(filename: str):
       of objects)
   """
   
-  data = import_json(filename)
+  return list(iter_data(filename))
+
+
+def iter_data(filename: str):
+  """
+  Lazily import a queries data JSON or NDJSON file.
+
+  Query objects are read from the file and yielded one at a time, so that the
+  whole queries data is never held in memory. Missing required fields are
+  counted in the same pass, and reported once the file is fully read.
+
+  Args:
+      filename (str): Filename of queries data JSON array or NDJSON file
+  
+  Yields:
+      Query objects (dicts), in order of the file
+  """
 
   locations = 0
   missings  = 0
 
-  for data_object in data:
+  for data_object in iter_json(filename):
     if _is_keyword_missing(data_object):
       missings += 1
     else:
       locations += 1
+    yield data_object
 
   if missings > 0:
     logger.warning(
@@ -65,8 +83,6 @@ def import_data(filename: str):
     logger.info(
       f'Locations to query: {locations}'
     )
-
-  return data
   
 
 def generate_data(term: str, cities: list[str]):
@@ -145,6 +161,92 @@ def import_json(filename: str):
   return data
 
 
+def iter_json(filename: str, *, chunk_size: int=65536):
+  """
+  Lazily parse the values of a JSON array file or an NDJSON file.
+
+  The file is read in chunks of `chunk_size` characters, decoding one value of
+  the top-level array (or one line of NDJSON) at a time.
+
+  Raises:
+      ValueError: File is not a JSON array or a sequence of JSON values.
+  """
+
+  decoder = json.JSONDecoder()
+  count   = 0
+
+  with open(filename, 'r', encoding='UTF-8') as json_file:
+    buffer = ''
+    pos    = 0
+    eof    = False
+
+    def fill(size=chunk_size):
+      nonlocal buffer, pos, eof
+      chunk = json_file.read(size)
+      if len(chunk) <= 0:
+        eof = True
+      buffer = buffer[pos:] + chunk
+      pos    = 0
+
+    def skip_whitespace():
+      nonlocal pos
+      while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+          pos += 1
+        if pos < len(buffer) or eof:
+          return
+        fill()
+
+    fill()
+    skip_whitespace()
+    is_array = buffer[pos:pos+1] == '['
+    if is_array:
+      pos += 1
+
+    read_size = chunk_size
+    while True:
+      skip_whitespace()
+      if pos >= len(buffer):
+        if is_array:
+          raise ValueError(f'Unterminated JSON array in "{filename}"')
+        break
+      if is_array and buffer[pos] == ']':
+        break
+
+      try:
+        value, end = decoder.raw_decode(buffer, pos)
+        #: Numbers ending at the buffer end may continue in the next chunk
+        incomplete = end >= len(buffer) and not eof
+      except json.JSONDecodeError:
+        if eof:
+          raise
+        incomplete = True
+
+      if incomplete:
+        #: Value spans beyond the buffer; read more, in growing chunks
+        fill(read_size)
+        read_size = read_size * 2
+        continue
+
+      read_size = chunk_size
+      pos = end
+      count += 1
+      yield value
+
+      if is_array:
+        skip_whitespace()
+        if buffer[pos:pos+1] == ',':
+          pos += 1
+        elif buffer[pos:pos+1] != ']':
+          raise ValueError(
+            f'Expected "," or "]" after array value {count} in "{filename}"'
+          )
+  
+  logger.info(
+    f'Imported data from JSON file "{filename}"'
+  )
+
+
 def export_json(filename: str, data: list[dict], indent=1, **json_kwargs):
   with open(filename, 'w', encoding='UTF-8') as json_file:
     json.dump(data, json_file, indent=indent, **json_kwargs)
@@ -154,6 +256,325 @@ def export_json(filename: str, data: list[dict], indent=1, **json_kwargs):
   )
 
 
+def export_records(
+  filename: str,
+  records,
+  output_format: str='json',
+  *,
+  indent=1,
+  fieldnames: list[str]=None,
+  **json_kwargs
+):
+  """
+  Export records one at a time, as a JSON array, NDJSON or CSV file.
+
+  Records may be given by a generator, so that only one record is held in
+  memory at any time. JSON array output is the same as that of
+  `export_json()`.
+
+  Args:
+      filename (str): Filename of the output file.
+      records: Iterable of records (dicts).
+      output_format (str): One of `'json'`, `'ndjson'` or `'csv'`.
+      indent: Indent of JSON array output.
+      fieldnames (list[str]): Columns of CSV output. Keys of records not in
+      `fieldnames` are left out.
+  
+  Returns:
+      Number of records exported.
+  """
+
+  with open_writer(
+    filename, output_format,
+    indent=indent, fieldnames=fieldnames, **json_kwargs
+  ) as writer:
+    for record in records:
+      writer.write(record)
+  
+  logger.info(
+    f'Exported {str(writer.count)} record(s) to {output_format.upper()} '
+    f'file "{filename}"'
+  )
+  return writer.count
+
+
+def open_writer(
+  filename: str,
+  output_format: str='json',
+  *,
+  indent=1,
+  fieldnames: list[str]=None,
+  **json_kwargs
+):
+  """
+  Open a record writer for `export_records()` or for writing records as they
+  are produced. Use as a context manager to close the file.
+  """
+
+  output_format = output_format.lower().strip()
+  if output_format == 'json':
+    return JsonWriter(filename, indent=indent, **json_kwargs)
+  elif output_format == 'ndjson':
+    return NdjsonWriter(filename, **json_kwargs)
+  elif output_format == 'csv':
+    return CsvWriter(filename, fieldnames)
+  else:
+    raise ValueError(
+      f'Output format "{output_format}" does not exist or is unsupported'
+    )
+
+
+class RecordWriter(ABC):
+  def __init__(self, filename: str):
+    self.filename = filename
+    self.count    = 0
+    self._file    = open(filename, 'w', encoding='UTF-8', newline='')
+
+  def write(self, record: dict):
+    self._write(record)
+    self.count += 1
+
+  def close(self):
+    if not self._file.closed:
+      self._close()
+      self._file.close()
+
+  @abstractmethod
+  def _write(self, record: dict):
+    pass
+
+  def _close(self):
+    pass
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+
+class JsonWriter(RecordWriter):
+  def __init__(self, filename: str, *, indent=1, **json_kwargs):
+    super().__init__(filename)
+    self.indent      = indent
+    self.json_kwargs = json_kwargs
+
+  def _write(self, record: dict):
+    #: Matches json.dump() of the whole list: each record is indented by one
+    #: more level. JSON strings never contain raw newlines.
+    text = json.dumps(record, indent=self.indent, **self.json_kwargs)
+    if self.indent is None:
+      self._file.write(('[' if self.count == 0 else ', ') + text)
+      return
+    
+    prefix = ' ' * self.indent if isinstance(self.indent, int) else self.indent
+    text = '\n'.join(prefix + line for line in text.split('\n'))
+    self._file.write(('[\n' if self.count == 0 else ',\n') + text)
+
+  def _close(self):
+    if self.count == 0:
+      self._file.write('[]')
+    elif self.indent is None:
+      self._file.write(']')
+    else:
+      self._file.write('\n]')
+
+
+class NdjsonWriter(RecordWriter):
+  def __init__(self, filename: str, **json_kwargs):
+    super().__init__(filename)
+    self.json_kwargs = json_kwargs
+
+  def _write(self, record: dict):
+    self._file.write(json.dumps(record, **self.json_kwargs) + '\n')
+
+
+class CsvWriter(RecordWriter):
+  def __init__(self, filename: str, fieldnames: list[str]=None):
+    super().__init__(filename)
+    self.fieldnames = fieldnames
+    self._writer    = None
+
+  def _write(self, record: dict):
+    if self._writer is None:
+      fieldnames = self.fieldnames if self.fieldnames else list(record.keys())
+      self._writer = csv.DictWriter(
+        self._file, fieldnames=fieldnames, extrasaction='ignore'
+      )
+      self._writer.writeheader()
+
+    #: Nested values are written as JSON
+    self._writer.writerow({
+      key : json.dumps(value) if isinstance(value, (list, dict)) else value
+      for key, value in record.items()
+    })
+
+
+def append_journal(
+  filename: str,
+  index: int,
+  data_object: dict,
+  *,
+  truncate: bool=False
+):
+  """
+  Append a query object as one JSON line to the journal file `filename`.
+
+  Each line records the index of the query object in the queries data along
+  with its query keyword, so that the journal can be replayed onto the same
+  queries data with `replay_journal()`.
+
+  Args:
+      filename (str): Filename of the journal file.
+      index (int): Index of the query object in the queries data.
+      data_object (dict): Query object to append.
+      truncate (bool): Empty the journal file before appending.
+  """
+
+  record = {
+    'index'            : index,
+    Keys.QUERY_KEYWORD : data_object.get(Keys.QUERY_KEYWORD),
+    'object'           : data_object
+  }
+  line = json.dumps(record) + '\n'
+  if not truncate and not _ends_with_newline(filename):
+    #: Terminate a truncated line left by an interrupted write
+    line = '\n' + line
+
+  mode = 'w' if truncate else 'a'
+  with open(filename, mode, encoding='UTF-8') as journal_file:
+    journal_file.write(line)
+
+
+def replay_journal(filename: str, data: list[dict]):
+  """
+  Replay the journal file `filename` onto queries data `data` in place.
+
+  Records are applied in order, so that the last record of a query object
+  wins. Records whose index or query keyword does not match `data` are
+  skipped, as is a truncated last line left by an interrupted write.
+
+  Args:
+      filename (str): Filename of the journal file.
+      data (list[dict]): Queries data the journal was recorded from.
+  
+  Returns:
+      Number of records replayed.
+  """
+
+  replayed = 0
+  skipped  = 0
+  for index, query_keyword, data_object in iter_journal(filename):
+    if (
+      index is None or index >= len(data) or
+      data[index].get(Keys.QUERY_KEYWORD) != query_keyword
+    ):
+      skipped += 1
+      continue
+
+    data[index] = data_object
+    replayed += 1
+  
+  if skipped > 0:
+    logger.warning(
+      f'Skipped {skipped} invalid or mismatched journal record(s)'
+    )
+  logger.info(
+    f'Replayed {replayed} journal record(s) from "{filename}"'
+  )
+  return replayed
+
+
+def read_journal(filename: str) -> dict:
+  """
+  Read the journal file `filename` into a dict of the index of each journaled
+  query object to its last record, as a tuple of its query keyword and query
+  object. Invalid records are skipped.
+  """
+
+  records = {}
+  for index, query_keyword, data_object in iter_journal(filename):
+    if index is not None:
+      records[index] = (query_keyword, data_object)
+  return records
+
+
+def iter_journal(filename: str):
+  """
+  Iterate over the records of the journal file `filename` in order, as tuples
+  of the index, query keyword and query object. The index of an invalid record
+  is None.
+  """
+
+  with open(filename, 'r', encoding='UTF-8') as journal_file:
+    for line in journal_file:
+      if len(line.strip()) <= 0:
+        continue
+
+      try:
+        record = json.loads(line)
+        index  = record['index']
+        data_object = record['object']
+      except (ValueError, KeyError, TypeError):
+        yield None, None, None
+        continue
+
+      if not isinstance(index, int) or index < 0:
+        yield None, None, None
+        continue
+      yield index, record.get(Keys.QUERY_KEYWORD), data_object
+
+
+def compact_journal(filename: str) -> dict:
+  """
+  Rewrite the journal file `filename` in place with only the last record of
+  each query object, dropping superseded and invalid records. The journal is
+  left as is if there is nothing to drop.
+
+  Returns:
+      The records kept, as given by `read_journal()`.
+  """
+
+  records = {}
+  dropped = 0
+  for index, query_keyword, data_object in iter_journal(filename):
+    if index is None or index in records:
+      dropped += 1
+    if index is not None:
+      records[index] = (query_keyword, data_object)
+  
+  if dropped <= 0:
+    return records
+
+  #: Written aside and swapped in, so that an interrupted compaction leaves
+  #: the journal whole
+  temp_filename = filename + '.tmp'
+  with open(temp_filename, 'w', encoding='UTF-8') as journal_file:
+    for index in sorted(records):
+      query_keyword, data_object = records[index]
+      journal_file.write(json.dumps({
+        'index'            : index,
+        Keys.QUERY_KEYWORD : query_keyword,
+        'object'           : data_object
+      }) + '\n')
+  os.replace(temp_filename, filename)
+
+  logger.info(
+    f'Compacted journal "{filename}": dropped {str(dropped)} record(s)'
+  )
+  return records
+
+
+def _ends_with_newline(filename: str):
+  try:
+    with open(filename, 'rb') as binary_file:
+      binary_file.seek(-1, os.SEEK_END)
+      return binary_file.read(1) == b'\n'
+  except OSError:
+    #: Missing or empty file
+    return True
+
+
 def remove_file(filename: str):
   try:
     os.remove(filename)
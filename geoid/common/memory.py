@@ -0,0 +1,162 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging, os, signal
+
+try:
+  import psutil
+except ImportError:
+  psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+PROC_DIR  = '/proc'
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+#: SIGKILL is not available on Windows
+KILL_SIGNAL = getattr(signal, 'SIGKILL', signal.SIGTERM)
+
+
+def process_tree(pid: int) -> list[int]:
+  """
+  Get the IDs of process `pid` and all of its descendants, or an empty list
+  if the process has exited or processes cannot be listed on this system.
+  """
+
+  if psutil is not None:
+    try:
+      process = psutil.Process(pid)
+      return [pid, *(child.pid for child in process.children(recursive=True))]
+    except psutil.Error:
+      return []
+  if os.path.isdir(PROC_DIR):
+    return _process_tree_proc(pid)
+  return []
+
+
+def process_tree_rss(pid: int):
+  """
+  Get the total resident memory in bytes of process `pid` and all of its
+  descendants, such as a webdriver service and the browser it started.
+
+  Uses `psutil` if it is installed, or reads `/proc` otherwise. Returns None
+  if memory cannot be read on this system or the process has exited.
+  """
+
+  if psutil is not None:
+    return _process_tree_rss_psutil(pid)
+  if os.path.isdir(PROC_DIR):
+    return _process_tree_rss_proc(pid)
+  return None
+
+
+def kill_process_tree(pid: int):
+  """
+  Kill process `pid` and all of its descendants, children first.
+  """
+
+  for current in reversed(process_tree(pid) or [pid]):
+    try:
+      os.kill(current, KILL_SIGNAL)
+    except OSError:
+      continue
+
+
+def webdriver_pid(webdriver):
+  """
+  Get the process ID of the local service of a Selenium webdriver, or None if
+  it has none.
+  """
+
+  try:
+    return webdriver.service.process.pid
+  except AttributeError:
+    return None
+
+
+def webdriver_rss(webdriver):
+  """
+  Get the process tree memory of a Selenium webdriver, or None if it has no
+  local service process.
+  """
+
+  pid = webdriver_pid(webdriver)
+  if pid is None:
+    return None
+  return process_tree_rss(pid)
+
+
+def _process_tree_rss_psutil(pid: int):
+  try:
+    process = psutil.Process(pid)
+    processes = [process, *process.children(recursive=True)]
+  except psutil.Error:
+    return None
+
+  rss = 0
+  for process in processes:
+    try:
+      rss += process.memory_info().rss
+    except psutil.Error:
+      continue
+  return rss
+
+
+def _process_tree_proc(pid: int) -> list[int]:
+  #: Map each process to its children from /proc/<pid>/stat
+  children = {}
+  for name in os.listdir(PROC_DIR):
+    if not name.isdigit():
+      continue
+    try:
+      with open(os.path.join(PROC_DIR, name, 'stat'), 'r') as stat_file:
+        stat = stat_file.read()
+    except OSError:
+      continue
+    #: The process name in parentheses may contain spaces
+    ppid = int(stat.rsplit(')', 1)[1].split()[1])
+    children.setdefault(ppid, []).append(int(name))
+
+  if not os.path.isdir(os.path.join(PROC_DIR, str(pid))):
+    return []
+
+  tree = []
+  stack = [pid]
+  while len(stack) > 0:
+    current = stack.pop()
+    tree.append(current)
+    stack.extend(children.get(current, []))
+  return tree
+
+
+def _process_tree_rss_proc(pid: int):
+  tree = _process_tree_proc(pid)
+  if len(tree) <= 0:
+    return None
+
+  rss = 0
+  for current in tree:
+    try:
+      with open(os.path.join(PROC_DIR, str(current), 'statm'), 'r') as statm:
+        rss += int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+      continue
+  return rss
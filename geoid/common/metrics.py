@@ -0,0 +1,147 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+import threading
+
+
+class Histogram:
+  """
+  Histogram of durations in seconds, safe to share between threads.
+
+  Samples are counted into buckets of upper bounds `bounds`, with one last
+  bucket for samples above the largest bound.
+  """
+
+  BOUNDS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+  def __init__(self, name: str, bounds: tuple=None):
+    self.name   = name
+    self.bounds = tuple(sorted(bounds if bounds else self.BOUNDS))
+
+    self._lock  = threading.Lock()
+    self.reset()
+
+
+  def observe(self, seconds: float):
+    with self._lock:
+      self._buckets[bisect_left(self.bounds, seconds)] += 1
+      self._count += 1
+      self._total += seconds
+      self._max    = max(self._max, seconds)
+
+
+  def reset(self):
+    with self._lock:
+      self._buckets = [0] * (len(self.bounds) + 1)
+      self._count   = 0
+      self._total   = 0.0
+      self._max     = 0.0
+
+
+  def summary(self) -> str:
+    """
+    Return a one-line summary of the histogram for logging, e.g.
+    `scroll: 12 sample(s), mean 0.41s, max 2.50s [<=0.5s: 10, <=2.5s: 2]`.
+    """
+
+    with self._lock:
+      buckets = self._buckets.copy()
+      count, total, max_ = self._count, self._total, self._max
+
+    if count <= 0:
+      return f'{self.name}: no samples'
+
+    labels = [f'<={bound:g}s' for bound in self.bounds]
+    labels.append(f'>{self.bounds[-1]:g}s')
+    counts = ', '.join(
+      f'{label}: {str(bucket)}'
+      for label, bucket in zip(labels, buckets) if bucket > 0
+    )
+    return (
+      f'{self.name}: {str(count)} sample(s), mean {total / count:.2f}s, '
+      f'max {max_:.2f}s [{counts}]'
+    )
+
+
+  @property
+  def count(self):
+    return self._count
+
+  @property
+  def mean(self):
+    return self._total / self._count if self._count > 0 else 0.0
+
+
+class StageMeter:
+  """
+  Occupancy of a pipeline stage run by one or more threads, safe to share
+  between them.
+
+  Time of each thread is counted as busy (working), blocked (waiting for room
+  in the queue to the next stage) or idle (waiting for input). The stage with
+  the highest busy share is the bottleneck.
+  """
+
+  STATES = ('busy', 'blocked', 'idle')
+
+  def __init__(self, name: str):
+    self.name    = name
+    self._lock   = threading.Lock()
+    self._totals = {state: 0.0 for state in self.STATES}
+
+
+  @contextmanager
+  def measure(self, state: str):
+    """
+    Count the time spent in the `with` block as `state`.
+    """
+
+    time_start = perf_counter()
+    try:
+      yield
+    finally:
+      self.add(state, perf_counter() - time_start)
+
+
+  def add(self, state: str, seconds: float):
+    with self._lock:
+      self._totals[state] += seconds
+
+
+  def summary(self) -> str:
+    with self._lock:
+      totals = self._totals.copy()
+    
+    total = sum(totals.values())
+    if total <= 0:
+      return f'{self.name}: no samples'
+    
+    shares = ', '.join(
+      f'{totals[state] / total:.0%} {state}' for state in self.STATES
+    )
+    return f'{self.name}: {shares}'
+
+
+  @property
+  def total(self):
+    return sum(self._totals.values())
@@ -0,0 +1,244 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from time import perf_counter, sleep, time
+import logging, sqlite3, threading
+
+from geoid.config import Config
+
+
+logger = logging.getLogger(__name__)
+
+#: Rate-limited targets; each has its own rate and burst in RateLimitConfig
+PAGE_LOADS            = 'page_loads'
+SCROLLS               = 'scrolls'
+MUNICIPALITY_REQUESTS = 'municipality_requests'
+
+_buckets = {}
+_lock    = threading.Lock()
+
+
+class TokenBucket:
+  """
+  Token bucket refilled at `rate` tokens per second, holding up to `burst`
+  tokens.
+
+  The bucket may be shared between threads. Tokens are taken up front, so that
+  waiting callers are served in order.
+  """
+
+  def __init__(self, name: str, rate: float, *, burst: float=1.0):
+    self.name  = name
+    self.rate  = rate
+    self.burst = max(1.0, burst)
+
+    self._tokens  = self.burst
+    self._updated = perf_counter()
+    self._waits   = 0
+    self._waited  = 0.0
+    self._lock    = threading.Lock()
+
+
+  def reserve(self, tokens: float=1.0) -> float:
+    """
+    Take `tokens` from the bucket, and return the number of seconds to wait
+    before using them.
+    """
+
+    with self._lock:
+      now = perf_counter()
+      self._tokens = _refill(
+        self._tokens, now - self._updated, self.rate, self.burst
+      ) - tokens
+      self._updated = now
+      return self._wait(self._tokens)
+
+
+  def acquire(self, tokens: float=1.0) -> float:
+    """
+    Take `tokens` from the bucket, waiting until they are available. Returns
+    the number of seconds waited.
+    """
+
+    wait_seconds = self.reserve(tokens)
+    if wait_seconds > 0:
+      sleep(wait_seconds)
+    return wait_seconds
+
+
+  def summary(self) -> str:
+    """
+    Return a one-line summary of waits for logging, e.g.
+    `page_loads at 0.5/s: 12 wait(s), 20.4 s total`.
+    """
+
+    return (
+      f'{self.name} at {self.rate:g}/s: {str(self._waits)} wait(s), '
+      f'{self._waited:.1f} s total'
+    )
+
+
+  def _wait(self, tokens: float) -> float:
+    if tokens >= 0:
+      return 0.0
+    
+    wait_seconds = -tokens / self.rate
+    self._waits  += 1
+    self._waited += wait_seconds
+    return wait_seconds
+
+
+  @property
+  def waits(self):
+    return self._waits
+
+
+class SharedTokenBucket(TokenBucket):
+  """
+  Token bucket shared between processes through a SQLite file, such as
+  several GeoID runs querying at once.
+
+  Buckets of the same name in the same file share their tokens. The
+  wall-clock time of each process is used to refill the bucket.
+  """
+
+  def __init__(
+    self,
+    name: str,
+    rate: float,
+    filename: str,
+    *,
+    burst: float=1.0
+  ):
+    super().__init__(name, rate, burst=burst)
+    self.filename = filename
+
+    #: Transactions are started by hand to lock the file while taking tokens
+    self._connection = sqlite3.connect(
+      filename, timeout=30.0, check_same_thread=False, isolation_level=None
+    )
+    with self._lock:
+      self._connection.execute('PRAGMA journal_mode=WAL')
+      self._connection.execute(
+        'CREATE TABLE IF NOT EXISTS buckets ('
+        '  name    TEXT PRIMARY KEY,'
+        '  tokens  REAL NOT NULL,'
+        '  updated REAL NOT NULL'
+        ')'
+      )
+    
+    logger.info(
+      f'Opened shared rate limit "{name}" in "{filename}"'
+    )
+
+
+  def reserve(self, tokens: float=1.0) -> float:
+    with self._lock:
+      self._connection.execute('BEGIN IMMEDIATE')
+      try:
+        row = self._connection.execute(
+          'SELECT tokens, updated FROM buckets WHERE name = ?',
+          (self.name,)
+        ).fetchone()
+
+        now = time()
+        if row is None:
+          new_tokens = self.burst - tokens
+        else:
+          new_tokens = _refill(
+            row[0], max(0.0, now - row[1]), self.rate, self.burst
+          ) - tokens
+
+        self._connection.execute(
+          'INSERT OR REPLACE INTO buckets (name, tokens, updated) '
+          'VALUES (?, ?, ?)',
+          (self.name, new_tokens, now)
+        )
+        self._connection.execute('COMMIT')
+      except Exception:
+        self._connection.execute('ROLLBACK')
+        raise
+      
+      return self._wait(new_tokens)
+
+
+  def close(self):
+    with self._lock:
+      self._connection.close()
+
+
+def get_bucket(target: str, config: Config):
+  """
+  Get the token bucket of `target`, one of `PAGE_LOADS`, `SCROLLS` or
+  `MUNICIPALITY_REQUESTS`, shared by all workers of the process.
+
+  Returns None if `target` is not rate-limited. With
+  `config.ratelimit.shared_filename` set, the bucket is also shared with other
+  processes using the same file.
+  """
+
+  rate  = getattr(config.ratelimit, f'{target}_per_second')
+  burst = getattr(config.ratelimit, f'{target}_burst')
+  if rate <= 0:
+    return None
+  
+  filename = config.ratelimit.shared_filename
+  key = (target, rate, burst, filename)
+  with _lock:
+    bucket = _buckets.get(key)
+    if bucket is None:
+      if filename:
+        bucket = SharedTokenBucket(target, rate, filename, burst=burst)
+      else:
+        bucket = TokenBucket(target, rate, burst=burst)
+      _buckets[key] = bucket
+  return bucket
+
+
+def reserve(target: str, config: Config) -> float:
+  """
+  Take a token of `target` and return the number of seconds to wait before
+  using it; see `get_bucket()`.
+  """
+
+  bucket = get_bucket(target, config)
+  if bucket is None:
+    return 0.0
+  return bucket.reserve()
+
+
+def acquire(target: str, config: Config) -> float:
+  """
+  Take a token of `target`, waiting until it is available; see `get_bucket()`.
+  """
+
+  bucket = get_bucket(target, config)
+  if bucket is None:
+    return 0.0
+  return bucket.acquire()
+
+
+def iter_buckets():
+  with _lock:
+    return list(_buckets.values())
+
+
+def _refill(tokens: float, elapsed: float, rate: float, burst: float):
+  return min(burst, tokens + elapsed * rate)
@@ -0,0 +1,247 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from requests.adapters import HTTPAdapter
+import asyncio, logging, threading, requests
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpSession:
+  """
+  Pooled keep-alive HTTP session, safe to share between threads.
+
+  Connections are kept open and reused between requests, up to `pool_size`
+  connections per host. With `http2` set, requests are made with `httpx` over
+  HTTP/2 if it is installed (`pip install httpx[http2]`), falling back to
+  HTTP/1.1 keep-alive otherwise.
+
+  Errors are raised as `requests.exceptions.RequestException` regardless of the
+  client used.
+  """
+
+  def __init__(
+    self,
+    *,
+    pool_size: int=10,
+    http2: bool=False,
+    timeout: tuple=(2.5, 4.0)
+  ):
+    self.pool_size = pool_size
+    self.timeout   = timeout
+
+    self._requests    = 0
+    self._connections = 0
+    self._lock        = threading.Lock()
+
+    self._session = None
+    self._client  = None
+    if http2:
+      self._client = self._init_httpx()
+    if self._client is None:
+      self._session = self._init_requests()
+
+
+  def get_json(self, url: str):
+    if self._client is not None:
+      return self._get_httpx(url).json()
+    return self._get(url).json()
+
+
+  def get_text(self, url: str) -> str:
+    if self._client is not None:
+      return self._get_httpx(url).text
+    return self._get(url).text
+
+
+  def _get(self, url: str):
+    response = self._session.get(url, timeout=self.timeout)
+    with self._lock:
+      self._requests += 1
+    response.raise_for_status()
+    return response
+
+
+  def close(self):
+    if self._client is not None:
+      self._client.close()
+    if self._session is not None:
+      self._session.close()
+
+
+  def _init_requests(self):
+    session = requests.Session()
+    adapter = HTTPAdapter(
+      pool_connections=self.pool_size,
+      pool_maxsize=self.pool_size,
+      pool_block=True
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+  def _init_httpx(self):
+    try:
+      import httpx
+      import h2
+    except ImportError:
+      logger.warning(
+        'HTTP/2 requires httpx[http2], which is not installed; '
+        'using HTTP/1.1 keep-alive instead'
+      )
+      return None
+    
+    connect_timeout, read_timeout = self.timeout
+    return httpx.Client(
+      http2=True,
+      limits=httpx.Limits(
+        max_connections=self.pool_size,
+        max_keepalive_connections=self.pool_size
+      ),
+      timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+    )
+
+
+  def _get_httpx(self, url: str):
+    import httpx
+
+    try:
+      response = self._client.get(
+        url, extensions={'trace': self._trace_httpx}
+      )
+      with self._lock:
+        self._requests += 1
+      response.raise_for_status()
+      return response
+    except httpx.HTTPError as e:
+      raise requests.exceptions.RequestException(str(e)) from e
+
+
+  def _trace_httpx(self, event_name: str, info: dict):
+    if event_name == 'connection.connect_tcp.complete':
+      with self._lock:
+        self._connections += 1
+
+
+  @property
+  def request_count(self):
+    return self._requests
+
+  @property
+  def connection_count(self):
+    """
+    Number of connections opened by the session so far.
+    """
+    
+    if self._session is None:
+      return self._connections
+    
+    connections = 0
+    #: The same adapter is mounted for both http:// and https://
+    adapters = {
+      id(adapter): adapter for adapter in self._session.adapters.values()
+    }
+    for adapter in adapters.values():
+      pools = adapter.poolmanager.pools
+      for key in pools.keys():
+        pool = pools.get(key)
+        if pool is not None:
+          connections += pool.num_connections
+    return connections
+
+
+class AsyncHttpSession:
+  """
+  Pooled keep-alive HTTP session for asyncio.
+
+  Requests are made with `httpx.AsyncClient` if httpx is installed (`pip
+  install httpx`), keeping up to `pool_size` connections open. Otherwise each
+  request runs in a thread through an `HttpSession`.
+
+  Errors are raised as `requests.exceptions.RequestException` regardless of the
+  client used.
+  """
+
+  def __init__(
+    self,
+    *,
+    pool_size: int=10,
+    timeout: tuple=(2.5, 4.0)
+  ):
+    self.pool_size = pool_size
+    self.timeout   = timeout
+
+    self._requests = 0
+
+    self._session = None
+    self._client  = self._init_httpx()
+    if self._client is None:
+      self._session = HttpSession(pool_size=pool_size, timeout=timeout)
+
+
+  async def get_json(self, url: str):
+    if self._client is None:
+      return await asyncio.to_thread(self._session.get_json, url)
+    
+    import httpx
+
+    try:
+      response = await self._client.get(url)
+      self._requests += 1
+      response.raise_for_status()
+      return response.json()
+    except httpx.HTTPError as e:
+      raise requests.exceptions.RequestException(str(e)) from e
+
+
+  async def close(self):
+    if self._client is not None:
+      await self._client.aclose()
+    if self._session is not None:
+      self._session.close()
+
+
+  def _init_httpx(self):
+    try:
+      import httpx
+    except ImportError:
+      logger.warning(
+        'Async HTTP requires httpx, which is not installed; '
+        'running requests in threads instead'
+      )
+      return None
+    
+    connect_timeout, read_timeout = self.timeout
+    return httpx.AsyncClient(
+      limits=httpx.Limits(
+        max_connections=self.pool_size,
+        max_keepalive_connections=self.pool_size
+      ),
+      timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+    )
+
+
+  @property
+  def request_count(self):
+    if self._session is not None:
+      return self._session.request_count
+    return self._requests
@@ -21,25 +21,123 @@
 from selenium import webdriver
 from selenium_stealth import stealth
 
+import os
 
-def init_firefox(*, show_client=False, use_options=None):
+
+#: URLs not needed to read results, blocked in lean mode: images and place
+#: thumbnails, fonts, and map tiles. Blocking applies to one tab only; see
+#: `block_lean_urls()`
+LEAN_BLOCKED_URLS = [
+  '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+  '*.woff', '*.woff2', '*.ttf', '*.otf',
+  '*googleusercontent.com/*',
+  '*google.com/maps/vt*', '*google.com/kh/*', '*khms*.google.com/*',
+  '*streetviewpixels-pa.googleapis.com/*'
+]
+
+#: Chrome flags of lean mode, to lower memory use
+LEAN_CHROME_ARGUMENTS = [
+  '--blink-settings=imagesEnabled=false',
+  '--disable-background-networking',
+  '--disable-component-update',
+  '--disable-default-apps',
+  '--disable-dev-shm-usage',
+  '--disable-extensions',
+  '--disable-features=Translate,MediaRouter,OptimizationHints',
+  '--disable-gpu',
+  '--disable-renderer-backgrounding',
+  '--disable-sync',
+  '--mute-audio',
+  '--no-first-run',
+  '--renderer-process-limit=2'
+]
+
+#: Firefox preferences of lean mode. URL patterns cannot be blocked in
+#: Firefox without an extension; images and fonts are disabled instead
+LEAN_FIREFOX_PREFERENCES = {
+  'permissions.default.image'                : 2,
+  'gfx.downloadable_fonts.enabled'           : False,
+  'browser.display.use_document_fonts'       : 0,
+  'media.autoplay.default'                   : 5,
+  'browser.sessionhistory.max_entries'       : 2,
+  'browser.sessionhistory.max_total_viewers' : 0,
+  'browser.cache.memory.capacity'            : 65536,
+  'dom.ipc.processCount'                     : 2
+}
+
+
+def init_firefox(
+  *,
+  show_client=False,
+  use_options=None,
+  background_tabs=False,
+  lean=False,
+  page_load_strategy=None,
+  user_data_dir=None
+):
   options = use_options if use_options else webdriver.FirefoxOptions()
   if not show_client:
     options.add_argument('-headless')
+  if page_load_strategy:
+    options.page_load_strategy = page_load_strategy
+  if user_data_dir:
+    #: Profile directory, to keep the disk cache of static assets between runs
+    os.makedirs(user_data_dir, exist_ok=True)
+    options.add_argument('-profile')
+    options.add_argument(user_data_dir)
+  if background_tabs:
+    #: Keep timers of background tabs running at full rate
+    options.set_preference('dom.min_background_timeout_value', 4)
+    options.set_preference('dom.timeout.enable_budget_timer_throttling', False)
+  if lean:
+    for key, value in LEAN_FIREFOX_PREFERENCES.items():
+      options.set_preference(key, value)
   driver = webdriver.Firefox(options=options)
 
   return driver
 
 
-def init_chrome(*, show_client=False, use_options=None):
+def init_chrome(
+  *,
+  show_client=False,
+  use_options=None,
+  capture_network=False,
+  background_tabs=False,
+  lean=False,
+  page_load_strategy=None,
+  user_data_dir=None
+):
   options = use_options if use_options else webdriver.ChromeOptions()
   options.add_experimental_option('excludeSwitches', ['enable-automation'])
   options.add_experimental_option('useAutomationExtension', False)
   if not show_client:
     options.add_argument('--headless=new')
+  if capture_network:
+    #: Network events for query.capture.NetworkCapture
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+  if background_tabs:
+    #: Keep background tabs loading and scrolling at full rate
+    options.add_argument('--disable-background-timer-throttling')
+    options.add_argument('--disable-backgrounding-occluded-windows')
+    options.add_argument('--disable-renderer-backgrounding')
+  if page_load_strategy:
+    options.page_load_strategy = page_load_strategy
+  if user_data_dir:
+    #: Profile directory, to keep the disk cache of static assets between runs
+    options.add_argument(f'--user-data-dir={os.path.abspath(user_data_dir)}')
+  if lean:
+    for argument in LEAN_CHROME_ARGUMENTS:
+      options.add_argument(argument)
+    options.add_experimental_option('prefs', {
+      'profile.managed_default_content_settings.images' : 2,
+      'profile.default_content_setting_values.notifications' : 2
+    })
     
   driver = webdriver.Chrome(options=options)
 
+  if lean:
+    block_lean_urls(driver)
+
   #: Will raise an exception, but this is fine
   #: Prior steps of stealth() are functional
   try:
@@ -47,4 +145,22 @@ def init_chrome(*, show_client=False, use_options=None):
   except Exception:
     pass
 
-  return driver
\ No newline at end of file
+  return driver
+
+
+def block_lean_urls(driver):
+  """
+  Block `LEAN_BLOCKED_URLS` in the current tab of a Chrome web client.
+
+  DevTools commands only apply to the tab they are sent to, so that each tab
+  opened after starting the web client must be blocked in turn. Does nothing
+  for web clients without DevTools commands, such as Firefox.
+  """
+
+  if not hasattr(driver, 'execute_cdp_cmd'):
+    return
+  #: Block requests by URL, which is not possible with options alone
+  driver.execute_cdp_cmd('Network.enable', {})
+  driver.execute_cdp_cmd(
+    'Network.setBlockedURLs', {'urls': LEAN_BLOCKED_URLS}
+  )
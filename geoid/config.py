@@ -26,9 +26,50 @@ class QueryConfig:
     self.initial_pause_seconds   = 0.0
     self.loading_timeout_seconds = 15.0
     self.scroll_wait_seconds     = 2.5
+    self.scroll_poll_seconds     = 0.1
+    self.scroll_mode             = 'webdriver'
+    self.warm_navigation         = False
+    self.deadline_seconds        = 0.0
+    self.watchdog_grace_seconds  = 30.0
     self.scroll_retries          = 5
     self.depth                   = 3
     self.lang                    = 'id'
+    self.parser                  = 'bs4'
+    self.incremental             = False
+    self.engine                  = 'browser'
+    self.http_base_url           = 'https://www.google.com'
+    self.http_page_size          = 20
+    self.workers                 = 1
+    self.tabs                    = 1
+    self.pipeline                = False
+    self.pipeline_queue_size     = 4
+    self.enrich_workers          = 2
+    self.captcha_cooldown_seconds     = 30.0
+    self.captcha_cooldown_max_seconds = 600.0
+    self.captcha_open_after           = 5
+
+class MunicipalityConfig:
+  def __init__(self):
+    self.backend                 = 'kodeposku'
+    self.concurrency             = 8
+    self.pool_size               = 8
+    self.http2                   = False
+    self.cache_filename          = None
+    self.cache_precision         = 4
+    self.cache_ttl_seconds       = 30 * 24 * 60 * 60.0
+    self.dataset_filename        = None
+    self.max_distance_km         = 10.0
+
+class RateLimitConfig:
+  def __init__(self):
+    #: Rates of 0 are not limited
+    self.page_loads_per_second            = 0.0
+    self.page_loads_burst                 = 1.0
+    self.scrolls_per_second               = 0.0
+    self.scrolls_burst                    = 1.0
+    self.municipality_requests_per_second = 0.0
+    self.municipality_requests_burst      = 1.0
+    self.shared_filename                  = None
 
 class PostprocConfig:
   def __init__(self):
@@ -41,18 +82,30 @@ class FileIOConfig:
   def __init__(self):
     self.autosave_filename  = '.autosave'
     self.autosave_every     = 1
+    self.autosave_mode      = 'full'
+    self.resume_autosave    = False
     self.keep_autosave      = False
     self.output_indent      = 2
+    self.output_format      = 'json'
+    self.stream             = False
     self.use_timestamp_name = False
   
 class WebClientConfig:
   def __init__(self) -> None:
     self.webclient          = 'chrome'
     self.show               = False
+    self.lean               = False
+    self.page_load_strategy = None
+    self.user_data_dir      = None
+    self.recycle_queries    = 0
+    self.recycle_rss_mb     = 0
+    self.restart_attempts   = 3
 
 class Config:
   def __init__(self):
     self.query      = QueryConfig()
+    self.municipality = MunicipalityConfig()
+    self.ratelimit  = RateLimitConfig()
     self.postproc   = PostprocConfig()
     self.fileio     = FileIOConfig()
     self.webclient  = WebClientConfig()
\ No newline at end of file
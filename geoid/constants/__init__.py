@@ -22,4 +22,5 @@ from .cselectors import Selectors
 from .keys import Keys
 from .links import Links
 from .status import Status
-from .objects import Objects
\ No newline at end of file
+from .objects import Objects
+from .scripts import Scripts
\ No newline at end of file
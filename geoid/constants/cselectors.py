@@ -29,6 +29,7 @@ class Selectors:
   RESULTS_BOTTOM      = '.lXJj5c'
   RESULTS_END         = '.eKbjU'
   SEARCHBOX           = '#searchbox'
+  SEARCHBOX_INPUT     = '#searchboxinput'
 
   #: Field CSS selectors
   LOCATION_NAME_FIELD = '.qBF1Pd'
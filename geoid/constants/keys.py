@@ -36,6 +36,8 @@ class Keys:
   RATING        = 'rating'
   REVIEWS       = 'reviews'
   DESCRIPTION   = 'description'
+  #: Only given by the network parser
+  ADDRESS       = 'address'
   LOCATION_LINK = 'location_link'
   IMAGE_LINK    = 'image_link'
 
@@ -20,4 +20,5 @@
 
 class Links:
   GMAPS_QUERY_TARGET           = 'https://www.google.com/maps?q={query}&hl={query_lang}'
+  GMAPS_SEARCH_TARGET          = '{base_url}/search?tbm=map&authuser=0&hl={query_lang}&q={query}&pb=!7i{count}!8i{offset}'
   MUNICIPALITY_QUERY_TARGET    = 'https://kodeposku.com/api/nearest?lat={latitude}&lon={longitude}'
\ No newline at end of file
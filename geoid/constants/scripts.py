@@ -0,0 +1,173 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+#: Scripts run in the page by WebDriver.execute_script(). Arguments are given
+#: by the caller, usually selectors from Selectors.
+
+class Scripts:
+  #: Arguments: RESULTS_BOX, RESULT, LOCATION_NAME_FIELD, LOCATION_TYPE_FIELD,
+  #: LOCATION_LINK_FIELD, RATING_FIELD, REVIEWS_FIELD, DESCRIPTION_FIELD, and
+  #: optionally the index of the first result to extract
+  #:
+  #: Returns an array of [name, type, href, rating, reviews, description] per
+  #: result, or null if there is no results box, with the same raw values as
+  #: read by processing.get_entry_fields: strings emulate BeautifulSoup
+  #: .string, and description is an array of raw text node strings per
+  #: description element, stripped by the caller.
+  #: Missing rating and reviews fields are given as false, to tell them apart
+  #: from fields with no single string (null).
+  EXTRACT_RESULTS = '''
+    const [
+      boxSelector, resultSelector, nameSelector, typeSelector,
+      linkSelector, ratingSelector, reviewsSelector, descriptionSelector,
+      start
+    ] = arguments;
+
+    function stringOf(node) {
+      if (node === null) return null;
+      const children = node.childNodes;
+      if (children.length !== 1) return null;
+      const child = children[0];
+      if (child.nodeType === Node.ELEMENT_NODE) return stringOf(child);
+      return child.nodeValue;
+    }
+
+    function stringsOf(node) {
+      const strings = [];
+      const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+      while (walker.nextNode()) {
+        const text = walker.currentNode;
+        if (text.parentElement && text.parentElement.closest('script, style, template')) {
+          continue;
+        }
+        strings.push(text.nodeValue);
+      }
+      return strings;
+    }
+
+    const box = document.querySelector(boxSelector);
+    if (box === null) return null;
+
+    const results = Array.from(box.querySelectorAll(resultSelector));
+    return results.slice(start || 0).map((result) => {
+      const name    = result.querySelector(nameSelector);
+      const type    = result.querySelector(typeSelector);
+      const link    = result.querySelector(linkSelector);
+      const rating  = result.querySelector(ratingSelector);
+      const reviews = result.querySelector(reviewsSelector);
+      return [
+        name    === null ? '' : stringOf(name),
+        type    === null ? '' : stringOf(type),
+        link    === null ? null : link.getAttribute('href'),
+        rating  === null ? false : stringOf(rating),
+        reviews === null ? false : stringOf(reviews),
+        Array.from(result.querySelectorAll(descriptionSelector), stringsOf)
+      ];
+    });
+  '''
+
+  #: Arguments: RESULTS_BOX, RESULT, index of the first result to grab
+  #:
+  #: Returns an array of the outer HTML of each result, or null if there is no
+  #: results box
+  GRAB_RESULTS = '''
+    const [boxSelector, resultSelector, start] = arguments;
+    const box = document.querySelector(boxSelector);
+    if (box === null) return null;
+
+    const results = Array.from(box.querySelectorAll(resultSelector));
+    return results.slice(start || 0).map((result) => result.outerHTML);
+  '''
+
+  #: Run by WebDriver.execute_async_script().
+  #:
+  #: Arguments: RESULTS_BOX, GENERAL_RESULT, RESULTS_BOTTOM, scroll wait and
+  #: poll interval in milliseconds
+  #:
+  #: Scrolls the last result into view, then waits until more results load,
+  #: the loading spinner at RESULTS_BOTTOM is removed at the end of the list,
+  #: or the scroll wait runs out. Returns {before, after, end_reached,
+  #: bottom_found}, or null if there is no results box or no result to scroll
+  #: to.
+  SCROLL_STEP = '''
+    const [
+      boxSelector, resultSelector, bottomSelector, timeout, poll
+    ] = arguments;
+    const done = arguments[arguments.length - 1];
+
+    const count = () => document.querySelectorAll(resultSelector).length;
+    const ended = () => document.querySelector(bottomSelector) === null;
+
+    const box = document.querySelector(boxSelector);
+    const results = document.querySelectorAll(resultSelector);
+    if (box === null || results.length === 0) return done(null);
+
+    const before = results.length;
+    if (document.querySelector(bottomSelector) === null) {
+      return done({
+        before: before, after: before, end_reached: true,
+        bottom_found: false
+      });
+    }
+
+    results[results.length - 1].scrollIntoView(true);
+
+    const started = performance.now();
+    (function check() {
+      const after = count();
+      const endReached = ended();
+      if (
+        after > before || endReached ||
+        performance.now() - started >= timeout
+      ) {
+        return done({
+          before: before, after: after, end_reached: endReached,
+          bottom_found: true
+        });
+      }
+      setTimeout(check, poll);
+    })();
+  '''
+
+  #: Arguments: URL
+  #:
+  #: Navigates to the URL without waiting for the page to load. The previous
+  #: document is marked, so that it can be told apart by PAGE_STATE until the
+  #: new document replaces it.
+  NAVIGATE = '''
+    window.geoidNavigating = true;
+    window.location.assign(arguments[0]);
+  '''
+
+  #: Arguments: RESULTS_BOX, RECAPTCHA, SEARCHBOX
+  #:
+  #: Returns the state of the page: 'navigating' (previous document),
+  #: 'captcha', 'results', 'loaded' (no results box) or 'loading'.
+  PAGE_STATE = '''
+    const [boxSelector, captchaSelector, searchboxSelector] = arguments;
+    if (window.geoidNavigating === true) return 'navigating';
+    if (document.querySelector(captchaSelector) !== null) return 'captcha';
+    if (document.querySelector(boxSelector) !== null) return 'results';
+    if (
+      document.readyState === 'complete' &&
+      document.querySelector(searchboxSelector) !== null
+    ) return 'loaded';
+    return 'loading';
+  '''
@@ -0,0 +1,153 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from time import perf_counter, sleep
+import json, logging
+
+
+logger = logging.getLogger(__name__)
+
+#: Requests of GMaps search results, loaded on scrolling, are of the form
+#: /search?tbm=map&...
+SEARCH_URL_PATH  = '/search?'
+SEARCH_URL_PARAM = 'tbm=map'
+
+#: The first page of results is embedded in the page instead of loaded by a
+#: request; read it from the initialization state
+INITIAL_STATE_SCRIPT = '''
+  const state = window.APP_INITIALIZATION_STATE;
+  if (!Array.isArray(state)) return [];
+  const payloads = [];
+  (function collect(value, depth) {
+    if (depth > 4) return;
+    if (typeof value === 'string' && value.startsWith(")]}'")) {
+      payloads.push(value);
+    } else if (Array.isArray(value)) {
+      value.forEach((item) => collect(item, depth + 1));
+    }
+  })(state, 0);
+  return payloads;
+'''
+
+
+class NetworkCapture:
+  """
+  Capture GMaps search payloads loaded by a Chrome web client.
+
+  Requires a web client initialized with performance logging, see
+  `webclient.init_chrome(capture_network=True)`. Call `reset()` before
+  loading a query, then `collect()` after loading or scrolling to get the
+  payloads loaded since the last call; decode them with
+  `parsing.parse_payloads()`.
+
+  Bodies are only read once their request has finished loading. Requests
+  still loading are kept, and read by a later `collect()`.
+  """
+
+  def __init__(self, webdriver: WebDriver):
+    self.webdriver = webdriver
+    self._initial  = False
+
+    #: Search requests seen, in order, and those of them finished loading
+    self._received = {}
+    self._finished = set()
+
+
+  def reset(self):
+    """
+    Discard payloads loaded before, such as those of the previous query.
+    """
+
+    self._drain()
+    self._received.clear()
+    self._finished.clear()
+    self._initial = False
+
+
+  def collect(self, timeout: float=0.0, poll: float=0.1) -> list[str]:
+    """
+    Get the payloads loaded since the last call. With `timeout` set, wait up
+    to `timeout` seconds for search requests still loading to finish.
+    """
+
+    payloads = []
+
+    if not self._initial:
+      self._initial = True
+      payloads.extend(self.webdriver.execute_script(INITIAL_STATE_SCRIPT))
+
+    self._drain()
+    time_end = perf_counter() + timeout
+    while (
+      len(self._received) > len(self._finished) and
+      perf_counter() < time_end
+    ):
+      sleep(poll)
+      self._drain()
+
+    for request_id in list(self._received):
+      if request_id not in self._finished:
+        continue
+      del self._received[request_id]
+      self._finished.discard(request_id)
+
+      try:
+        body = self.webdriver.execute_cdp_cmd(
+          'Network.getResponseBody', {'requestId': request_id}
+        )
+      except WebDriverException as e:
+        #: Finished bodies are only missing once evicted from the buffer
+        logger.warning(f'Could not get search response body: {str(e)}')
+        continue
+      payloads.append(body.get('body', ''))
+
+    if len(self._received) > 0:
+      logger.debug(
+        f'{str(len(self._received))} search request(s) still loading'
+      )
+    logger.debug(
+      f'Captured {str(len(payloads))} search payload(s)'
+    )
+    return payloads
+
+
+  def _drain(self):
+    #: Performance log entries are removed from the web client once read
+    for entry in self.webdriver.get_log('performance'):
+      try:
+        message = json.loads(entry['message'])['message']
+        method  = message.get('method')
+        params  = message.get('params', {})
+      except (KeyError, ValueError, AttributeError):
+        continue
+
+      if method == 'Network.responseReceived':
+        url = params.get('response', {}).get('url', '')
+        if SEARCH_URL_PATH in url and SEARCH_URL_PARAM in url:
+          self._received[params.get('requestId')] = True
+      elif method == 'Network.loadingFinished':
+        if params.get('requestId') in self._received:
+          self._finished.add(params.get('requestId'))
+      elif method == 'Network.loadingFailed':
+        if params.get('requestId') in self._received:
+          del self._received[params.get('requestId')]
@@ -0,0 +1,165 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from urllib.parse import quote_plus
+from time import perf_counter
+import logging
+
+from . import parsing
+from .processing import payload
+from .scraping import CaptchaError
+from geoid.common import ratelimit
+from geoid.common.metrics import Histogram
+from geoid.common.session import HttpSession
+from geoid.config import Config
+from geoid.constants import Keys, Links
+
+
+logger = logging.getLogger(__name__)
+
+INFINITE_DEPTH = 0
+
+#: Latency of search page requests, reported by BigQuery
+PAGE_LATENCY = Histogram('search page')
+
+#: Text found in pages served instead of search results when blocked
+BLOCKED_PAGE_MARKERS = ('/sorry/', 'recaptcha', 'unusual traffic')
+
+
+class HttpSearch:
+  """
+  Search GMaps over plain HTTP, without a web client.
+
+  Results are fetched from the search endpoint the GMaps page itself uses to
+  load results, page by page, and decoded into the same places as the other
+  parsers. Each page stands for one scroll: `config.query.depth` pages are
+  fetched, or all pages with a depth of 0.
+
+  Used in place of a webdriver when `config.query.engine` is `'http'`; one
+  search client per worker. The endpoint host is set by
+  `config.query.http_base_url`, for example to a local server replaying
+  recorded responses.
+
+  A page that is not a search payload, such as a consent or CAPTCHA page, is
+  never taken as the end of results: CAPTCHA pages raise `CaptchaError`, and
+  other pages raise `ValueError` if they are the first page. Later pages end
+  the search early, keeping the results fetched so far.
+  """
+
+  def __init__(self, use_config: Config=None):
+    self.config  = use_config if use_config else Config()
+    self.session = HttpSession(
+      pool_size=1,
+      timeout=(
+        self.config.query.loading_timeout_seconds,
+        self.config.query.loading_timeout_seconds
+      )
+    )
+
+
+  def search(
+    self,
+    query: str,
+    query_lang: str,
+    *,
+    deadline: float=None
+  ) -> list[dict]:
+    """
+    Fetch and parse the results of `query`. If set, no more pages are fetched
+    once `time.perf_counter()` reaches `deadline`.
+    """
+
+    logger.info(
+      f'Starting query: "{query}"'
+    )
+    page_size = self.config.query.http_page_size
+    depth     = self.config.query.depth
+    results   = []
+    links     = set()
+
+    page = 0
+    while depth == INFINITE_DEPTH or page < depth:
+      if deadline is not None and page > 0 and perf_counter() >= deadline:
+        logger.warning('Search stopped (query deadline reached)')
+        break
+
+      url = Links.GMAPS_SEARCH_TARGET.format(
+        base_url=self.config.query.http_base_url.rstrip('/'),
+        query=quote_plus(query),
+        query_lang=quote_plus(query_lang),
+        count=page_size,
+        offset=page * page_size
+      )
+
+      #: Each page after the first stands for one scroll
+      ratelimit.acquire(
+        ratelimit.PAGE_LOADS if page == 0 else ratelimit.SCROLLS, self.config
+      )
+
+      time_start = perf_counter()
+      payload_text = self.session.get_text(url)
+      PAGE_LATENCY.observe(perf_counter() - time_start)
+
+      try:
+        data = payload.decode(payload_text)
+      except ValueError as e:
+        if _is_blocked_page(payload_text):
+          logger.error(
+            'Failed to load page (CAPTCHA)'
+          )
+          raise CaptchaError('Failed to load page: CAPTCHA') from e
+        if page == 0:
+          logger.error(
+            'Failed to load page (not a search payload)'
+          )
+          raise ValueError(
+            f'Search page is not a search payload: {str(e)}'
+          ) from e
+        logger.warning(
+          f'Search stopped (page {str(page + 1)} is not a search payload); '
+          f'keeping {str(len(results))} result(s)'
+        )
+        break
+
+      new_results = 0
+      for result in parsing.parse_payload(data, query_lang):
+        if result[Keys.LOCATION_LINK] in links:
+          continue
+        links.add(result[Keys.LOCATION_LINK])
+        results.append(result)
+        new_results = new_results + 1
+
+      logger.debug(
+        f'Fetched page {str(page + 1)}: {str(new_results)} new result(s)'
+      )
+      if new_results <= 0:
+        break
+      page = page + 1
+
+    return results
+
+
+  def quit(self):
+    self.session.close()
+
+
+def _is_blocked_page(text: str):
+  text = text[:65536].lower()
+  return any(marker in text for marker in BLOCKED_PAGE_MARKERS)
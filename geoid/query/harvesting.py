@@ -0,0 +1,214 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+import logging
+
+from . import scraping, parsing
+from .capture import NetworkCapture
+from geoid.config import Config
+from geoid.constants import Keys
+
+
+logger = logging.getLogger(__name__)
+
+
+class Harvester:
+  """
+  Harvest results of a query incrementally while it is being scrolled.
+
+  Each call to `harvest()` grabs only the results appended to the results box
+  since the previous call, parses them, and starts their municipality lookups
+  in the background. Results are deduplicated by location link.
+
+  Pass `harvest` as the `on_scroll` callback of `scraping.scroll()`, then call
+  `finish()` to collect the results in page order.
+  """
+
+  def __init__(
+    self,
+    query_lang: str,
+    use_config: Config=None,
+    *,
+    resolver=None
+  ):
+    self.query_lang = query_lang
+    self.config     = use_config if use_config else Config()
+    self.resolver   = resolver
+
+    self._grabbed   = 0
+    self._capture   = None
+    self._links     = set()
+    self._results   = []
+    self._lookups   = []
+    self._executor  = None
+    self._threaded  = resolver is None or not resolver.is_local
+
+    if self._threaded:
+      self._executor = ThreadPoolExecutor(
+        max_workers=max(1, self.config.municipality.concurrency)
+      )
+
+
+  def start(self, webdriver: WebDriver):
+    """
+    Prepare harvesting from `webdriver`; call before loading the query.
+    """
+
+    if self.config.query.parser == 'network':
+      self._capture = NetworkCapture(webdriver)
+      self._capture.reset()
+
+
+  def harvest(self, webdriver: WebDriver):
+    """
+    Grab and parse results appended since the last harvest, and start their
+    municipality lookups.
+    """
+
+    if self.config.query.parser == 'network':
+      results = parsing.parse_payloads(self._capture.collect(), self.query_lang)
+    elif self.config.query.parser == 'script':
+      results_raw = scraping.extract(webdriver, self._grabbed)
+      results = self._parse(
+        lambda batch: parsing.parse_extracted(batch, self.query_lang),
+        results_raw
+      )
+      self._grabbed = self._grabbed + len(results_raw)
+    else:
+      results_html = scraping.grab_results(webdriver, self._grabbed)
+      results = self._parse(
+        lambda batch: parsing.parse_html(
+          ''.join(batch), self.query_lang, parser=self.config.query.parser
+        ),
+        results_html
+      )
+      self._grabbed = self._grabbed + len(results_html)
+
+    new_results = 0
+    for result in results:
+      link = result.get(Keys.LOCATION_LINK)
+      if link is not None:
+        if link in self._links:
+          continue
+        self._links.add(link)
+
+      if not self._threaded:
+        #: Local lookups take microseconds; run them in place
+        self._lookups.append(
+          parsing._get_municipality_fields(result, self.resolver)
+        )
+      else:
+        self._lookups.append(self._executor.submit(
+          parsing._get_municipality_fields, result, self.resolver
+        ))
+      self._results.append(result)
+      new_results = new_results + 1
+
+    logger.debug(
+      f'Harvested {str(new_results)} new result(s) '
+      f'({str(len(self._lookups))} total)'
+    )
+    return new_results
+
+
+  def _parse(self, parse, batch: list):
+    #: Grabbed results are not grabbed again; parse them one by one if the
+    #: batch fails, so that an unreadable result does not lose the others
+    try:
+      return parse(batch)
+    except Exception as e:
+      logger.warning(
+        f'Could not parse {str(len(batch))} harvested result(s) at once, '
+        f'parsing one by one: {str(e)}'
+      )
+    
+    results = []
+    for item in batch:
+      try:
+        results.extend(parse([item]))
+      except Exception as e:
+        logger.warning(f'Skipping unreadable result: {str(e)}')
+        logger.debug(str(e), exc_info=e)
+    return results
+
+
+  def finish(self, deadline: float=None):
+    """
+    Wait for pending municipality lookups and return the harvested results
+    and the count of municipality errors, as `parsing.get_municipality_data()`.
+
+    Lookups still pending at `deadline`, a `perf_counter()` time, are left
+    out and counted as errors, to be completed by `query.enrich()`.
+    """
+
+    logger.info(
+      f'Getting municipality data'
+    )
+    results = []
+    errors = 0
+    timeouts = 0
+
+    for result, lookup in zip(self._results, self._lookups):
+      if self._threaded:
+        timeout = None
+        if deadline is not None:
+          timeout = max(0.0, deadline - perf_counter())
+        try:
+          lookup = lookup.result(timeout=timeout)
+        except TimeoutError:
+          results.append(result)
+          timeouts = timeouts + 1
+          continue
+      result, error = lookup
+
+      if error is not None:
+        logger.error(str(error), exc_info=error)
+        errors = errors + 1
+      results.append(result)
+
+    #: Lookups past the deadline are not waited for
+    self.close(wait=timeouts <= 0)
+
+    if timeouts > 0:
+      logger.warning(
+        f'Municipality lookups of {str(timeouts)} entry(s) exceeded the '
+        f'deadline; left to be completed'
+      )
+    if errors > 0:
+      logger.warning(
+        f'Could not pull municipality data of {str(errors)} entry(s)'
+      )
+
+    return results, errors + timeouts
+
+
+  def close(self, wait: bool=True):
+    if self._executor is not None:
+      self._executor.shutdown(wait=wait, cancel_futures=not wait)
+      self._executor = None
+
+
+  @property
+  def count(self):
+    return len(self._lookups)
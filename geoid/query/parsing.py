@@ -19,20 +19,50 @@
 # SOFTWARE.
 
 from bs4 import BeautifulSoup
+from lxml import etree
 
-from geoid.constants import Selectors
+from geoid.config import Config
+from geoid.constants import Keys, Selectors
 from . import processing
 
-import logging
+from concurrent.futures import ThreadPoolExecutor
+import asyncio, logging
 
 
 logger = logging.getLogger(__name__)
 
+#: Selectors.RESULT as XPath
+RESULT_XPATH = etree.XPath(
+  '//*[' + ' and '.join(
+    f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+    for name in Selectors.RESULT.split('.') if len(name) > 0
+  ) + ']'
+)
+
+
+def parse_html(grabbed_html: str, query_lang: str, *, parser: str='bs4'):
+  """
+  Parse the results box HTML into a list of places.
+
+  Args:
+      grabbed_html (str): Inner HTML of the results box.
+      query_lang (str): Language of the query, kept in location links.
+      parser (str): Parser backend, either `'bs4'` (BeautifulSoup) or the
+      faster `'lxml'` (lxml XPath). Both give the same places.
+  """
 
-def parse_html(grabbed_html: str, query_lang: str):
   logger.info(
     f'Processing results'
   )
+
+  parser = parser.lower().strip()
+  if parser == 'lxml':
+    return _parse_html_lxml(grabbed_html, query_lang)
+  elif parser != 'bs4':
+    raise ValueError(
+      f'Parser "{parser}" does not exist or is unsupported'
+    )
+
   results = []
   
   results_raw = BeautifulSoup(grabbed_html, 'lxml').select(Selectors.RESULT)
@@ -47,24 +77,210 @@ def parse_html(grabbed_html: str, query_lang: str):
   return results
 
 
-def get_municipality_data(results: list[dict]):
+def _parse_html_lxml(grabbed_html: str, query_lang: str):
+  results = []
+
+  root = etree.HTML(grabbed_html) if len(grabbed_html) > 0 else None
+  if root is None:
+    return results
+
+  for result_raw in RESULT_XPATH(root):
+    result = processing.get_entry_fields_lxml(
+      result_raw, query_lang=query_lang
+    )
+    results.append(result)
+  
+  return results
+
+
+def parse_extracted(extracted_results: list[list], query_lang: str):
+  """
+  Convert results extracted in the page by `scraping.extract()` into a list
+  of places, the same as given by `parse_html()`.
+  """
+
+  logger.info(
+    f'Processing extracted results'
+  )
+  results = []
+
+  for extracted_result in extracted_results:
+    result = processing.get_entry_fields_extracted(
+      extracted_result, query_lang=query_lang
+    )
+    results.append(result)
+  
+  return results
+
+
+def parse_payloads(payloads: list[str], query_lang: str):
+  """
+  Decode search payloads captured by `capture.NetworkCapture` or fetched by
+  `http` into a list of places, in the same form as given by `parse_html()`.
+  Payloads which cannot be decoded are skipped, and places repeated across
+  payloads are kept once.
+  """
+
+  logger.info(
+    f'Processing captured results'
+  )
+  results = []
+  links = set()
+
+  for payload_text in payloads:
+    try:
+      data = processing.payload.decode(payload_text)
+    except ValueError as e:
+      logger.debug(f'Skipping undecodable payload: {str(e)}')
+      continue
+
+    for result in parse_payload(data, query_lang):
+      if result[Keys.LOCATION_LINK] in links:
+        continue
+      links.add(result[Keys.LOCATION_LINK])
+      results.append(result)
+  
+  return results
+
+
+def parse_payload(data, query_lang: str):
+  """
+  Get the places of one search payload decoded by `payload.decode()`, in the
+  same form as given by `parse_html()`. Unreadable places are skipped.
+  """
+
+  results = []
+  for place in processing.payload.iter_places(data):
+    try:
+      results.append(processing.get_entry_fields_payload(
+        place, query_lang=query_lang
+      ))
+    except (TypeError, ValueError) as e:
+      logger.debug(f'Skipping unreadable place: {str(e)}')
+  return results
+
+
+def get_municipality_data(
+  results: list[dict],
+  use_config: Config=None,
+  *,
+  resolver=None
+):
   logger.info(
     f'Getting municipality data'
   )
+  config = use_config if use_config else Config()
   new_results = results.copy()
   errors = 0
 
-  for index, result in enumerate(results):
-    try:
-      new_results[index] = processing.get_municipality_fields(result)
-    except Exception as e:
-      logger.exception(e)
+  #: Results already holding municipality data, such as those harvested
+  #: while scrolling, are not looked up again
+  indices = _missing_municipality_indices(results)
+  if len(indices) <= 0:
+    return new_results, errors
+  pending = [results[index] for index in indices]
+
+  if resolver is not None and resolver.is_local:
+    #: Local lookups take microseconds; a thread pool only adds overhead
+    lookups = [
+      _get_municipality_fields(result, resolver) for result in pending
+    ]
+  else:
+    #: Lookups are I/O-bound; run them in a bounded thread pool. map() keeps
+    #: the original order of results.
+    concurrency = max(1, min(config.municipality.concurrency, len(pending)))
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+      lookups = list(executor.map(
+        lambda result: _get_municipality_fields(result, resolver), pending
+      ))
+
+  for index, (new_result, error) in zip(indices, lookups):
+    if error is not None:
+      logger.error(str(error), exc_info=error)
+      errors = errors + 1
+      continue
+    new_results[index] = new_result
+  
+  if errors > 0:
+    logger.warning(
+      f'Could not pull municipality data of {str(errors)} entry(s)'
+    )
+  
+  return new_results, errors
+
+
+async def get_municipality_data_async(
+  results: list[dict],
+  use_config: Config=None,
+  *,
+  resolver=None,
+  limit: asyncio.Semaphore=None
+):
+  """
+  Same as `get_municipality_data()`, running all lookups at once under the
+  event loop. At most `config.municipality.concurrency` lookups are in flight,
+  unless limited by a semaphore `limit` shared with other queries.
+  """
+
+  logger.info(
+    f'Getting municipality data'
+  )
+  config = use_config if use_config else Config()
+  new_results = results.copy()
+  errors = 0
+
+  indices = _missing_municipality_indices(results)
+  if len(indices) <= 0:
+    return new_results, errors
+  
+  if limit is None:
+    limit = asyncio.Semaphore(max(1, config.municipality.concurrency))
+
+  #: gather() keeps the original order of results
+  lookups = await asyncio.gather(*(
+    _get_municipality_fields_async(results[index], resolver, limit)
+    for index in indices
+  ))
+
+  for index, (new_result, error) in zip(indices, lookups):
+    if error is not None:
+      logger.error(str(error), exc_info=error)
       errors = errors + 1
       continue
+    new_results[index] = new_result
   
   if errors > 0:
     logger.warning(
       f'Could not pull municipality data of {str(errors)} entry(s)'
     )
   
-  return new_results, errors
\ No newline at end of file
+  return new_results, errors
+
+
+def _missing_municipality_indices(results: list[dict]) -> list[int]:
+  #: Successful lookups always fill the province ID
+  return [
+    index for index, result in enumerate(results)
+    if result.get(Keys.PROVINCE_ID) is None
+  ]
+
+
+def _get_municipality_fields(result: dict, resolver=None):
+  try:
+    return processing.get_municipality_fields(result, resolver), None
+  except Exception as e:
+    return result, e
+
+
+async def _get_municipality_fields_async(
+  result: dict,
+  resolver,
+  limit: asyncio.Semaphore
+):
+  try:
+    async with limit:
+      return await processing.get_municipality_fields_async(
+        result, resolver
+      ), None
+  except Exception as e:
+    return result, e
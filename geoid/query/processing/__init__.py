@@ -18,4 +18,7 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
-from .processing import *
\ No newline at end of file
+from .processing import *
+from .cache import MunicipalityCache
+from .geocoder import OfflineGeocoder
+from .resolver import MunicipalityResolver
\ No newline at end of file
@@ -0,0 +1,163 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from time import time
+import json, logging, sqlite3, threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class MunicipalityCache:
+  """
+  Persistent cache of municipality data responses, stored in SQLite.
+
+  Entries are keyed by latitude and longitude rounded to `precision` decimal
+  places, so that nearby coordinates of the same place share one entry. The
+  raw response is stored as JSON and expires after `ttl_seconds`; set
+  `ttl_seconds` to 0 to keep entries indefinitely.
+
+  With `validate` set, only responses for which `validate(response)` is true
+  are stored, and stored responses failing it are taken as missing.
+
+  The cache may be shared between threads.
+  """
+
+  def __init__(
+    self,
+    filename: str,
+    *,
+    precision: int=4,
+    ttl_seconds: float=0.0,
+    validate=None
+  ):
+    self.filename    = filename
+    self.precision   = precision
+    self.ttl_seconds = ttl_seconds
+    self.validate    = validate
+
+    self._hits   = 0
+    self._misses = 0
+    self._lock   = threading.Lock()
+
+    self._connection = sqlite3.connect(
+      filename, timeout=30.0, check_same_thread=False
+    )
+    with self._lock, self._connection:
+      self._connection.execute('PRAGMA journal_mode=WAL')
+      self._connection.execute(
+        'CREATE TABLE IF NOT EXISTS municipalities ('
+        '  latitude  TEXT NOT NULL,'
+        '  longitude TEXT NOT NULL,'
+        '  response  TEXT NOT NULL,'
+        '  timestamp REAL NOT NULL,'
+        '  PRIMARY KEY (latitude, longitude)'
+        ')'
+      )
+    
+    logger.info(
+      f'Opened municipality cache "{filename}"'
+    )
+
+
+  def get(self, latitude: float, longitude: float):
+    """
+    Get the cached response for a coordinate, or None if missing or expired.
+    """
+
+    key = self._key(latitude, longitude)
+    with self._lock:
+      row = self._connection.execute(
+        'SELECT response, timestamp FROM municipalities '
+        'WHERE latitude = ? AND longitude = ?',
+        key
+      ).fetchone()
+
+      response = None
+      if row is not None and not self._is_expired(row[1]):
+        response = json.loads(row[0])
+      #: Entries stored before validation may hold error responses
+      if response is not None and not self._is_valid(response):
+        response = None
+
+      if response is None:
+        self._misses += 1
+        return None
+      
+      self._hits += 1
+    return response
+
+
+  def put(self, latitude: float, longitude: float, response: dict):
+    """
+    Store the response for a coordinate. Responses failing `validate` are not
+    stored, so that they are pulled again instead of kept until expiry.
+    """
+
+    if not self._is_valid(response):
+      logger.debug(
+        f'Not caching invalid municipality response for '
+        f'{str(latitude)}, {str(longitude)}'
+      )
+      return False
+
+    key = self._key(latitude, longitude)
+    with self._lock, self._connection:
+      self._connection.execute(
+        'INSERT OR REPLACE INTO municipalities '
+        '(latitude, longitude, response, timestamp) VALUES (?, ?, ?, ?)',
+        (*key, json.dumps(response), time())
+      )
+    return True
+
+
+  def close(self):
+    with self._lock:
+      self._connection.close()
+    
+    logger.info(
+      f'Closed municipality cache "{self.filename}"'
+    )
+
+
+  def _key(self, latitude: float, longitude: float):
+    return (
+      f'{float(latitude):.{self.precision}f}',
+      f'{float(longitude):.{self.precision}f}'
+    )
+
+
+  def _is_valid(self, response) -> bool:
+    return self.validate is None or self.validate(response)
+
+
+  def _is_expired(self, timestamp: float):
+    if self.ttl_seconds <= 0:
+      return False
+    return time() - timestamp > self.ttl_seconds
+
+
+  @property
+  def hits(self):
+    return self._hits
+
+  @property
+  def misses(self):
+    return self._misses
@@ -25,31 +25,37 @@ import re
 from geoid.constants import Selectors
 
 
+SUBCODE_REGEX   = re.compile(r'[0-9]+')
+LATITUDE_REGEX  = re.compile(r'(?<=!3d)-?[0-9]+[.,].[0-9]+')
+LONGITUDE_REGEX = re.compile(r'(?<=!4d)-?[0-9]+[.,].[0-9]+')
+NON_DIGIT_REGEX = re.compile(r'[^0-9]')
+
+
 #: Municipality fields
 
 def get_province_id(response: dict) -> int:
-  subcodes = re.findall(r'[0-9]+', response['code'])
+  subcodes = SUBCODE_REGEX.findall(response['code'])
   return int(''.join(subcodes[0:1]))
 
 def get_province_name(response: dict) -> str:
   return response['province']
 
 def get_city_id(response: dict) -> str:
-  subcodes = re.findall(r'[0-9]+', response['code'])
+  subcodes = SUBCODE_REGEX.findall(response['code'])
   return int(''.join(subcodes[0:2]))
 
 def get_city_name(response: dict) -> str:
   return response['city']
 
 def get_district_id(response: dict) -> int:
-  subcodes = re.findall(r'[0-9]+', response['code'])
+  subcodes = SUBCODE_REGEX.findall(response['code'])
   return int(''.join(subcodes[0:3]))
 
 def get_district_name(response: dict) -> str:
   return response['district']
 
 def get_village_id(response: dict) -> int:
-  subcodes = re.findall(r'[0-9]+', response['code'])
+  subcodes = SUBCODE_REGEX.findall(response['code'])
   return int(''.join(subcodes))
 
 def get_village_name(response: dict) -> str:
@@ -81,61 +87,39 @@ def get_location_type(entry: Tag) -> str:
     
 def get_latitude(entry: Tag) -> float:
   field_selection = entry.select_one(Selectors.LATITUDE_FIELD)
-  field = field_selection['href']
-  field_regex = re.search(r'(?<=!3d)-?[0-9]+[.,].[0-9]+', field)
-  return float(field_regex.group(0))
+  return parse_latitude(field_selection['href'])
     
 def get_longitude(entry: Tag) -> float:
   field_selection = entry.select_one(Selectors.LONGITUDE_FIELD)
-  field = field_selection['href']
-  field_regex = re.search(r'(?<=!4d)-?[0-9]+[.,].[0-9]+', field)
-  return float(field_regex.group(0))
+  return parse_longitude(field_selection['href'])
 
 def get_rating(entry: Tag) -> float:
-  # Rating is of the form 4.8 or 4,8
-  # -> Account for decimal comma
   field_selection = entry.select_one(Selectors.RATING_FIELD)
 
   if field_selection is None:
     return 0.0
   else:
-    field = field_selection.string.replace(',', '.')
-    return float(field)
+    return parse_rating(field_selection.string)
 
 def get_reviews(entry: Tag) -> int:
-  # Review count is of the form (11,111) or (11.111)
-  # -> Ignore non-numbers
   field_selection = entry.select_one(Selectors.REVIEWS_FIELD)
 
   if field_selection is None:
     return 0
   else:
-    field = field_selection.string
-    field = re.sub('[^0-9]', '', field)
-    return int(field)
+    return parse_reviews(field_selection.string)
 
 def get_description(entry: Tag) -> str:
-  #: Description is of the form [" ", " ", " ", " "]
-  #: -> Join same-line blocks with whitespace
-  #: -> Join different lines with newline
   field_selections = entry.select(Selectors.DESCRIPTION_FIELD)
-
-  field_lines = []
-  for index, selection in enumerate(field_selections):
-    #: Skip the first field, as it is already processed as location type 
-    if index == 0:
-      continue
-    field_lines.append(' '.join(list(selection.stripped_strings)))
-  field = '\n'.join(field_lines)
-  return field
+  return parse_description(
+    [list(selection.stripped_strings) for selection in field_selections]
+  )
 
 def get_location_link(entry: Tag, query_lang: str) -> str:
-  #: The section after '?' grabbed from the fields can be dropped
-  #: However, keep the host query_lang query (from caller)
   field_selection = entry.select_one(Selectors.LOCATION_LINK_FIELD)
 
   if field_selection is not None:
-    field = field_selection['href'].rsplit('?')[0] + f'?hl={quote_plus(query_lang)}'
+    field = parse_location_link(field_selection['href'], query_lang)
   else:
     field = ''
   return field
@@ -149,4 +133,45 @@ def get_image_link(entry: Tag) -> str:
     field = field_selection['src'].rsplit('=')[0]
   else:
     field = ''
-  return field
\ No newline at end of file
+  return field
+
+
+#: Entry field values, shared by all parser backends
+
+def parse_latitude(href: str) -> float:
+  field_regex = LATITUDE_REGEX.search(href)
+  return float(field_regex.group(0))
+
+def parse_longitude(href: str) -> float:
+  field_regex = LONGITUDE_REGEX.search(href)
+  return float(field_regex.group(0))
+
+def parse_rating(string: str) -> float:
+  # Rating is of the form 4.8 or 4,8
+  # -> Account for decimal comma
+  field = string.replace(',', '.')
+  return float(field)
+
+def parse_reviews(string: str) -> int:
+  # Review count is of the form (11,111) or (11.111)
+  # -> Ignore non-numbers
+  field = NON_DIGIT_REGEX.sub('', string)
+  return int(field)
+
+def parse_description(lines: list[list[str]]) -> str:
+  #: Description is of the form [" ", " ", " ", " "]
+  #: -> Join same-line blocks with whitespace
+  #: -> Join different lines with newline
+  field_lines = []
+  for index, line in enumerate(lines):
+    #: Skip the first field, as it is already processed as location type 
+    if index == 0:
+      continue
+    field_lines.append(' '.join(line))
+  field = '\n'.join(field_lines)
+  return field
+
+def parse_location_link(href: str, query_lang: str) -> str:
+  #: The section after '?' grabbed from the fields can be dropped
+  #: However, keep the host query_lang query (from caller)
+  return href.rsplit('?')[0] + f'?hl={quote_plus(query_lang)}'
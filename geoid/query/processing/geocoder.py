@@ -0,0 +1,161 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from math import asin, cos, floor, radians, sin, sqrt
+import csv, logging
+
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE   = 111.195
+
+
+class OfflineGeocoder:
+  """
+  Reverse geocoder resolving coordinates from a local dataset of villages.
+
+  The dataset is a CSV file with one village per row and the columns `code`,
+  `province`, `city`, `district`, `village`, `postal`, `latitude` and
+  `longitude`, where `latitude` and `longitude` give the village centroid.
+  Centroids are stored in a grid index of `cell_degrees`-sized cells, and a
+  lookup returns the nearest village in the same shape as a kodeposku
+  response, as consumed by `fields.get_province_id` and others.
+  """
+
+  def __init__(
+    self,
+    filename: str,
+    *,
+    cell_degrees: float=0.05,
+    max_distance_km: float=10.0
+  ):
+    self.filename        = filename
+    self.cell_degrees    = cell_degrees
+    self.max_distance_km = max_distance_km
+
+    self._grid  = dict()
+    self._count = 0
+    self._load(filename)
+
+    logger.info(
+      f'Loaded {str(self._count)} village(s) from dataset "{filename}"'
+    )
+
+
+  def lookup(self, latitude: float, longitude: float) -> dict:
+    """
+    Get the municipality data of the village nearest to a coordinate.
+
+    Raises:
+        LookupError: No village is found within `max_distance_km`.
+    """
+
+    latitude, longitude = float(latitude), float(longitude)
+    row, col = self._cell(latitude, longitude)
+
+    #: Smallest distance covered by one ring of cells around the origin cell,
+    #: narrowed by longitude convergence away from the equator
+    ring_km = self.cell_degrees * KM_PER_DEGREE * max(
+      cos(radians(min(abs(latitude) + self.cell_degrees, 90.0))), 0.01
+    )
+    max_rings = int(self.max_distance_km / ring_km) + 1
+
+    best_entry    = None
+    best_distance = None
+    for ring in range(max_rings + 1):
+      #: Entries not yet visited are at least (ring - 1) * ring_km away
+      if best_distance is not None and best_distance <= (ring - 1) * ring_km:
+        break
+
+      for cell in self._ring(row, col, ring):
+        for entry in self._grid.get(cell, ()):
+          distance = _haversine(latitude, longitude, entry[0], entry[1])
+          if best_distance is None or distance < best_distance:
+            best_entry, best_distance = entry, distance
+
+    if best_entry is None or best_distance > self.max_distance_km:
+      raise LookupError(
+        f'No village found within {str(self.max_distance_km)} km of '
+        f'{str(latitude)}, {str(longitude)}'
+      )
+    
+    response = best_entry[2].copy()
+    response['distance'] = best_distance
+    return response
+
+
+  def _load(self, filename: str):
+    with open(filename, 'r', encoding='UTF-8', newline='') as csv_file:
+      for line in csv.DictReader(csv_file):
+        try:
+          latitude  = float(line['latitude'])
+          longitude = float(line['longitude'])
+        except (KeyError, TypeError, ValueError):
+          continue
+
+        postal = line.get('postal')
+        if isinstance(postal, str) and postal.strip().isdigit():
+          postal = int(postal)
+
+        response = {
+          'code'     : line.get('code'),
+          'province' : line.get('province'),
+          'city'     : line.get('city'),
+          'district' : line.get('district'),
+          'village'  : line.get('village'),
+          'postal'   : postal
+        }
+        cell = self._cell(latitude, longitude)
+        self._grid.setdefault(cell, []).append((latitude, longitude, response))
+        self._count += 1
+
+
+  def _cell(self, latitude: float, longitude: float):
+    return (
+      floor(latitude / self.cell_degrees),
+      floor(longitude / self.cell_degrees)
+    )
+
+
+  @staticmethod
+  def _ring(row: int, col: int, ring: int):
+    if ring == 0:
+      yield (row, col)
+      return
+    for offset in range(-ring, ring + 1):
+      yield (row - ring, col + offset)
+      yield (row + ring, col + offset)
+    for offset in range(-ring + 1, ring):
+      yield (row + offset, col - ring)
+      yield (row + offset, col + ring)
+
+
+  @property
+  def count(self):
+    return self._count
+
+
+def _haversine(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+  lat1, lon1, lat2, lon2 = map(radians, (lat1, lon1, lat2, lon2))
+  a = \
+    sin((lat2 - lat1) / 2) ** 2 + \
+    cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+  return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
@@ -0,0 +1,122 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from urllib.parse import quote
+import json
+
+
+#: Search results in GMaps payloads are served as JSON with an anti-hijacking
+#: prefix, and sometimes wrapped in another JSON object as {"c":0,"d":"..."}
+#: with a trailing comment.
+XSSI_PREFIX     = ")]}'"
+WRAPPER_SUFFIX  = '/*""*/'
+
+#: Location of the fields in each place entry. Payloads are undocumented and
+#: change without notice; every field is read with dig() and may be missing.
+ENTRY_PLACE     = (14,)
+PLACE_NAME      = (11,)
+PLACE_TYPES     = (13,)
+PLACE_LATITUDE  = (9, 2)
+PLACE_LONGITUDE = (9, 3)
+PLACE_RATING    = (4, 7)
+PLACE_REVIEWS   = (4, 8)
+PLACE_ADDRESS   = (39,)
+PLACE_FEATURE   = (10,)
+
+#: Locations of the list of place entries in a decoded payload
+ENTRIES_PATHS   = ((0, 1), (64,))
+
+
+def dig(data, *path, default=None):
+  """
+  Get `data[path[0]][path[1]]...`, or `default` if any index in `path` is
+  missing or of the wrong type.
+  """
+
+  for index in path:
+    try:
+      data = data[index]
+    except (IndexError, KeyError, TypeError):
+      return default
+    if data is None:
+      return default
+  return data
+
+
+def decode(text: str):
+  """
+  Decode a GMaps search payload, stripping its prefix and wrapper if any.
+  Raise `ValueError` if `text` is not a payload.
+  """
+
+  text = text.strip()
+  if text.endswith(WRAPPER_SUFFIX):
+    text = text[:-len(WRAPPER_SUFFIX)]
+
+  if text.startswith(XSSI_PREFIX):
+    text = text[len(XSSI_PREFIX):]
+  
+  data = json.loads(text)
+  if isinstance(data, dict):
+    if not isinstance(data.get('d'), str):
+      raise ValueError('Payload wrapper has no data')
+    return decode(data['d'])
+  return data
+
+
+def iter_places(data):
+  """
+  Iterate over the place arrays of a decoded payload, skipping entries that
+  are not places (ads, suggestions and metadata).
+  """
+
+  for path in ENTRIES_PATHS:
+    entries = dig(data, *path)
+    if not isinstance(entries, list):
+      continue
+
+    for entry in entries:
+      place = dig(entry, *ENTRY_PLACE)
+      if not isinstance(place, list):
+        continue
+      if dig(place, *PLACE_NAME) is None or dig(place, *PLACE_LATITUDE) is None:
+        continue
+      yield place
+    return
+
+
+def place_link(place: list) -> str:
+  """
+  Build the link of a place array, in the same form as result links in the
+  page (up to the '?').
+  """
+
+  name      = dig(place, *PLACE_NAME, default='')
+  latitude  = dig(place, *PLACE_LATITUDE)
+  longitude = dig(place, *PLACE_LONGITUDE)
+  feature   = dig(place, *PLACE_FEATURE)
+
+  data = f'!3d{latitude}!4d{longitude}'
+  if feature is not None:
+    data = f'!4m5!3m4!1s{feature}!8m2' + data
+
+  return (
+    f'https://www.google.com/maps/place/{quote(name, safe="")}/data={data}'
+  )
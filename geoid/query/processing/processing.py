@@ -20,11 +20,23 @@
 
 from bs4 import Tag
 from backoff import expo, on_exception
+from lxml import etree
 
-from geoid.constants import Links, Keys, Objects
-from . import fields
+from geoid.constants import Links, Keys, Objects, Selectors
+from . import fields, payload
 
-import requests
+import asyncio, requests
+
+
+def _classes(selector: str) -> frozenset:
+  return frozenset(name for name in selector.split('.') if len(name) > 0)
+
+#: Class names of field selectors, matched in one pass over each entry
+NAME_CLASSES        = _classes(Selectors.LOCATION_NAME_FIELD)
+TYPE_CLASSES        = _classes(Selectors.LOCATION_TYPE_FIELD.split('>')[0])
+RATING_CLASSES      = _classes(Selectors.RATING_FIELD)
+REVIEWS_CLASSES     = _classes(Selectors.REVIEWS_FIELD)
+DESCRIPTION_CLASSES = _classes(Selectors.DESCRIPTION_FIELD)
 
 
 def get_entry_fields(entry: Tag, query_lang='id') -> dict:
@@ -32,28 +44,291 @@ def get_entry_fields(entry: Tag, query_lang='id') -> dict:
   result_entry = Objects.BASE_PLACE_OBJECT.copy()
 
   #: 2. Fields get from HTML
+  #: Equivalent to the fields.get_* functions, but selects all fields in a
+  #: single traversal of the entry instead of one CSS selection per field
+  name_tag     = None
+  type_tag     = None
+  link_tag     = None
+  rating_tag   = None
+  reviews_tag  = None
+  description_tags = []
+
+  for tag in entry.descendants:
+    if not isinstance(tag, Tag):
+      continue
+
+    classes = tag.get('class')
+    if classes:
+      if name_tag is None and NAME_CLASSES.issubset(classes):
+        name_tag = tag
+      if rating_tag is None and RATING_CLASSES.issubset(classes):
+        rating_tag = tag
+      if reviews_tag is None and REVIEWS_CLASSES.issubset(classes):
+        reviews_tag = tag
+      if DESCRIPTION_CLASSES.issubset(classes):
+        description_tags.append(tag)
+
+    if link_tag is None and tag.name == 'a' and tag.has_attr('href'):
+      #: Selectors.LATITUDE_FIELD, LONGITUDE_FIELD, LOCATION_LINK_FIELD
+      link_tag = tag
+    if type_tag is None and tag.name == 'span' and _is_type_field(tag):
+      type_tag = tag
+
+  href = link_tag['href']
   result_entry.update({
-    Keys.LOCATION_NAME : fields.get_location_name(entry),
-    Keys.LOCATION_TYPE : fields.get_location_type(entry),
-    Keys.LATITUDE      : fields.get_latitude(entry) ,
-    Keys.LONGITUDE     : fields.get_longitude(entry),
-    Keys.RATING        : fields.get_rating(entry),
-    Keys.REVIEWS       : fields.get_reviews(entry),
-    Keys.DESCRIPTION   : fields.get_description(entry),
-    Keys.LOCATION_LINK : fields.get_location_link(entry, query_lang)
+    Keys.LOCATION_NAME : name_tag.string if name_tag is not None else '',
+    Keys.LOCATION_TYPE : type_tag.string if type_tag is not None else '',
+    Keys.LATITUDE      : fields.parse_latitude(href),
+    Keys.LONGITUDE     : fields.parse_longitude(href),
+    Keys.RATING        : \
+      fields.parse_rating(rating_tag.string) if rating_tag is not None else 0.0,
+    Keys.REVIEWS       : \
+      fields.parse_reviews(reviews_tag.string) if reviews_tag is not None else 0,
+    Keys.DESCRIPTION   : fields.parse_description(
+      [list(tag.stripped_strings) for tag in description_tags]
+    ),
+    Keys.LOCATION_LINK : fields.parse_location_link(href, query_lang)
   })
   
   return result_entry
+
+
+def _is_type_field(tag: Tag) -> bool:
+  #: Selectors.LOCATION_TYPE_FIELD: '.W4Efsd.W4Efsd>span>span'
+  parent = tag.parent
+  if parent is None or parent.name != 'span':
+    return False
+  grandparent = parent.parent
+  if grandparent is None:
+    return False
+  classes = grandparent.get('class')
+  return bool(classes) and TYPE_CLASSES.issubset(classes)
   
 
-def get_municipality_fields(result_entry: dict) -> dict:
+def get_entry_fields_lxml(entry: etree._Element, query_lang='id') -> dict:
+  """
+  Get the fields of a result entry parsed by lxml.
+
+  Gives the same result as `get_entry_fields()` of the same entry parsed by
+  BeautifulSoup, whose `.string` and `.stripped_strings` are emulated.
+  """
+
+  #: 1. Fields initialization
+  result_entry = Objects.BASE_PLACE_OBJECT.copy()
+
+  #: 2. Fields get from HTML, in a single traversal as in get_entry_fields()
+  name_tag     = None
+  type_tag     = None
+  link_tag     = None
+  rating_tag   = None
+  reviews_tag  = None
+  description_tags = []
+
+  for tag in entry.iterdescendants():
+    if not isinstance(tag.tag, str):
+      #: Comments and processing instructions
+      continue
+
+    classes = tag.get('class')
+    if classes:
+      classes = classes.split()
+      if name_tag is None and NAME_CLASSES.issubset(classes):
+        name_tag = tag
+      if rating_tag is None and RATING_CLASSES.issubset(classes):
+        rating_tag = tag
+      if reviews_tag is None and REVIEWS_CLASSES.issubset(classes):
+        reviews_tag = tag
+      if DESCRIPTION_CLASSES.issubset(classes):
+        description_tags.append(tag)
+
+    if link_tag is None and tag.tag == 'a' and 'href' in tag.attrib:
+      link_tag = tag
+    if type_tag is None and tag.tag == 'span' and _is_type_field_lxml(tag):
+      type_tag = tag
+
+  href = link_tag.get('href')
+  result_entry.update({
+    Keys.LOCATION_NAME : _string_lxml(name_tag) if name_tag is not None else '',
+    Keys.LOCATION_TYPE : _string_lxml(type_tag) if type_tag is not None else '',
+    Keys.LATITUDE      : fields.parse_latitude(href),
+    Keys.LONGITUDE     : fields.parse_longitude(href),
+    Keys.RATING        : \
+      fields.parse_rating(_string_lxml(rating_tag)) \
+      if rating_tag is not None else 0.0,
+    Keys.REVIEWS       : \
+      fields.parse_reviews(_string_lxml(reviews_tag)) \
+      if reviews_tag is not None else 0,
+    Keys.DESCRIPTION   : fields.parse_description(
+      [_stripped_strings_lxml(tag) for tag in description_tags]
+    ),
+    Keys.LOCATION_LINK : fields.parse_location_link(href, query_lang)
+  })
+  
+  return result_entry
+
+
+def _is_type_field_lxml(tag: etree._Element) -> bool:
+  parent = tag.getparent()
+  if parent is None or parent.tag != 'span':
+    return False
+  grandparent = parent.getparent()
+  if grandparent is None:
+    return False
+  classes = grandparent.get('class')
+  return bool(classes) and TYPE_CLASSES.issubset(classes.split())
+
+
+def _string_lxml(tag: etree._Element):
+  #: BeautifulSoup .string: the only string of a tag, looking through tags
+  #: with exactly one child, or None
+  children = len(tag)
+  if children == 0:
+    return tag.text
+  if children == 1 and not tag.text and not tag[0].tail:
+    child = tag[0]
+    if not isinstance(child.tag, str):
+      return child.text
+    return _string_lxml(child)
+  return None
+
+
+#: BeautifulSoup .stripped_strings leaves out strings of these tags
+STRIPPED_STRINGS_XPATH = etree.XPath(
+  './/text()[not(ancestor::script or ancestor::style or ancestor::template)]'
+)
+
+def _stripped_strings_lxml(tag: etree._Element) -> list[str]:
+  strings = []
+  for string in STRIPPED_STRINGS_XPATH(tag):
+    stripped = string.strip()
+    if len(stripped) > 0:
+      strings.append(str(stripped))
+  return strings
+
+
+def get_entry_fields_extracted(entry: list, query_lang='id') -> dict:
+  """
+  Get the fields of a result entry extracted in the page by
+  `Scripts.EXTRACT_RESULTS`.
+
+  Gives the same result as `get_entry_fields()` of the same entry.
+  """
+
+  name, type_, href, rating, reviews, description = entry
+
+  #: 1. Fields initialization
+  result_entry = Objects.BASE_PLACE_OBJECT.copy()
+
+  #: 2. Fields get from extracted values
+  result_entry.update({
+    Keys.LOCATION_NAME : name,
+    Keys.LOCATION_TYPE : type_,
+    Keys.LATITUDE      : fields.parse_latitude(href),
+    Keys.LONGITUDE     : fields.parse_longitude(href),
+    Keys.RATING        : \
+      fields.parse_rating(rating) if rating is not False else 0.0,
+    Keys.REVIEWS       : \
+      fields.parse_reviews(reviews) if reviews is not False else 0,
+    Keys.DESCRIPTION   : fields.parse_description([
+      [string.strip() for string in strings if len(string.strip()) > 0]
+      for strings in description
+    ]),
+    Keys.LOCATION_LINK : fields.parse_location_link(href, query_lang)
+  })
+
+  return result_entry
+
+
+def get_entry_fields_payload(place: list, query_lang='id') -> dict:
+  """
+  Get the fields of a place array decoded from a GMaps search payload; see
+  `payload.iter_places()`.
+
+  Result cards show more than payloads on a description, which is left empty.
+  The full address, which result cards leave out, is given as an extra
+  `address` field. It is not part of `Objects.BASE_PLACE_OBJECT`, and so not
+  of CSV output.
+  """
+
+  types   = payload.dig(place, *payload.PLACE_TYPES, default=[])
+  rating  = payload.dig(place, *payload.PLACE_RATING, default=0.0)
+  reviews = payload.dig(place, *payload.PLACE_REVIEWS, default=0)
+  address = payload.dig(place, *payload.PLACE_ADDRESS, default='')
+
+  #: 1. Fields initialization
+  result_entry = Objects.BASE_PLACE_OBJECT.copy()
+
+  #: 2. Fields get from payload values
+  result_entry.update({
+    Keys.LOCATION_NAME : payload.dig(place, *payload.PLACE_NAME),
+    Keys.LOCATION_TYPE : types[0] if isinstance(types, list) and types else '',
+    Keys.LATITUDE      : float(payload.dig(place, *payload.PLACE_LATITUDE)),
+    Keys.LONGITUDE     : float(payload.dig(place, *payload.PLACE_LONGITUDE)),
+    Keys.RATING        : float(rating),
+    Keys.REVIEWS       : int(reviews),
+    Keys.DESCRIPTION   : '',
+    Keys.LOCATION_LINK : \
+      fields.parse_location_link(payload.place_link(place), query_lang)
+  })
+
+  #: 3. Fields found in payloads only
+  result_entry[Keys.ADDRESS] = address if isinstance(address, str) else ''
+
+  return result_entry
+
+
+def get_municipality_fields(result_entry: dict, resolver=None) -> dict:
   latitude  = result_entry[Keys.LATITUDE]
   longitude = result_entry[Keys.LONGITUDE]
   if (latitude is None or longitude is None):
     raise ValueError('Latitude/longitude field is empty')
   
-  response = _get_municipality_data(latitude, longitude)
+  if resolver is not None:
+    response = resolver.get(latitude, longitude)
+  else:
+    response = _get_municipality_data(latitude, longitude)
   
+  return _update_municipality_fields(result_entry, response)
+
+
+async def get_municipality_fields_async(
+  result_entry: dict,
+  resolver=None
+) -> dict:
+  """
+  Same as `get_municipality_fields()`, pulling municipality data with
+  `MunicipalityResolver.get_async()`.
+  """
+
+  latitude  = result_entry[Keys.LATITUDE]
+  longitude = result_entry[Keys.LONGITUDE]
+  if (latitude is None or longitude is None):
+    raise ValueError('Latitude/longitude field is empty')
+  
+  if resolver is not None:
+    response = await resolver.get_async(latitude, longitude)
+  else:
+    response = await asyncio.to_thread(
+      _get_municipality_data, latitude, longitude
+    )
+  
+  return _update_municipality_fields(result_entry, response)
+
+
+def is_municipality_response(response) -> bool:
+  """
+  Whether a municipality data response holds every municipality field, as
+  opposed to an error or empty response.
+  """
+
+  try:
+    _update_municipality_fields({}, response)
+  except (KeyError, IndexError, TypeError, ValueError):
+    return False
+  return True
+
+
+def _update_municipality_fields(result_entry: dict, response: dict) -> dict:
   new_result_entry = result_entry.copy()
   new_result_entry.update({
     Keys.PROVINCE_ID   : fields.get_province_id(response),
@@ -71,13 +346,36 @@ def get_municipality_fields(result_entry: dict) -> dict:
 
 
 @on_exception(expo, requests.exceptions.RequestException, max_tries=5)
-def _get_municipality_data(latitude, longitude) -> dict:
-  request = requests.get(
-    Links.MUNICIPALITY_QUERY_TARGET.format(
-      latitude=latitude, longitude=longitude
-    ),
-    timeout=(2.5, 4.0)
+def _get_municipality_data(
+  latitude,
+  longitude,
+  session=None,
+  bucket=None
+) -> dict:
+  target = Links.MUNICIPALITY_QUERY_TARGET.format(
+    latitude=latitude, longitude=longitude
   )
+  #: Retries are rate-limited as well
+  if bucket is not None:
+    bucket.acquire()
+  if session is not None:
+    return session.get_json(target)
+
+  request = requests.get(target, timeout=(2.5, 4.0))
   request.raise_for_status()
   response = request.json()
-  return response
\ No newline at end of file
+  return response
+
+@on_exception(expo, requests.exceptions.RequestException, max_tries=5)
+async def _get_municipality_data_async(
+  latitude,
+  longitude,
+  session,
+  bucket=None
+) -> dict:
+  target = Links.MUNICIPALITY_QUERY_TARGET.format(
+    latitude=latitude, longitude=longitude
+  )
+  if bucket is not None:
+    await asyncio.sleep(bucket.reserve())
+  return await session.get_json(target)
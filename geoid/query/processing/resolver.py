@@ -0,0 +1,157 @@
+# Copyright (c) 2023 Mifuyu (mifuyutsuki@proton.me)
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio, logging
+
+from geoid.common import ratelimit
+from geoid.common.session import AsyncHttpSession, HttpSession
+from geoid.config import Config
+from .cache import MunicipalityCache
+from .geocoder import OfflineGeocoder
+from . import processing
+
+
+logger = logging.getLogger(__name__)
+
+
+class MunicipalityResolver:
+  """
+  Resolve coordinates to municipality data responses.
+
+  A resolver is shared by all queries of a `BigQuery` run, and across its
+  worker threads. Responses are pulled from kodeposku through one pooled
+  keep-alive session, or from the persistent cache when
+  `config.municipality.cache_filename` is set.
+
+  With `config.municipality.backend` set to `'offline'`, responses are instead
+  resolved locally from the dataset at `config.municipality.dataset_filename`.
+  """
+
+  def __init__(self, use_config: Config=None):
+    self.config   = use_config if use_config else Config()
+    self.cache    = None
+    self.geocoder = None
+    self.session  = None
+    self.bucket   = None
+
+    self.async_session = None
+
+    backend = self.config.municipality.backend.lower().strip()
+    if backend == 'offline':
+      dataset_filename = self.config.municipality.dataset_filename
+      if not dataset_filename:
+        raise ValueError(
+          'Offline municipality backend requires a dataset filename'
+        )
+      self.geocoder = OfflineGeocoder(
+        dataset_filename,
+        max_distance_km=self.config.municipality.max_distance_km
+      )
+      return
+    elif backend != 'kodeposku':
+      raise ValueError(
+        f'Municipality backend "{backend}" does not exist or is unsupported'
+      )
+
+    self.bucket  = ratelimit.get_bucket(
+      ratelimit.MUNICIPALITY_REQUESTS, self.config
+    )
+    self.session = HttpSession(
+      pool_size=max(
+        self.config.municipality.pool_size,
+        self.config.municipality.concurrency
+      ),
+      http2=self.config.municipality.http2
+    )
+
+    cache_filename = self.config.municipality.cache_filename
+    if cache_filename:
+      self.cache = MunicipalityCache(
+        cache_filename,
+        precision=self.config.municipality.cache_precision,
+        ttl_seconds=self.config.municipality.cache_ttl_seconds,
+        validate=processing.is_municipality_response
+      )
+
+
+  def get(self, latitude: float, longitude: float) -> dict:
+    if self.geocoder is not None:
+      return self.geocoder.lookup(latitude, longitude)
+
+    if self.cache is not None:
+      response = self.cache.get(latitude, longitude)
+      if response is not None:
+        return response
+
+    response = processing._get_municipality_data(
+      latitude, longitude, session=self.session, bucket=self.bucket
+    )
+
+    if self.cache is not None:
+      self.cache.put(latitude, longitude, response)
+    return response
+
+
+  async def get_async(self, latitude: float, longitude: float) -> dict:
+    """
+    Same as `get()`, for use under an asyncio event loop. Responses are pulled
+    through an `AsyncHttpSession`, opened on first use and closed by
+    `close_async()`.
+    """
+
+    if self.geocoder is not None:
+      return self.geocoder.lookup(latitude, longitude)
+
+    #: SQLite calls block; keep them off the event loop
+    if self.cache is not None:
+      response = await asyncio.to_thread(self.cache.get, latitude, longitude)
+      if response is not None:
+        return response
+
+    if self.async_session is None:
+      self.async_session = AsyncHttpSession(
+        pool_size=self.session.pool_size, timeout=self.session.timeout
+      )
+    response = await processing._get_municipality_data_async(
+      latitude, longitude, session=self.async_session, bucket=self.bucket
+    )
+
+    if self.cache is not None:
+      await asyncio.to_thread(self.cache.put, latitude, longitude, response)
+    return response
+
+
+  @property
+  def is_local(self):
+    return self.geocoder is not None
+
+
+  def close(self):
+    if self.session is not None:
+      self.session.close()
+    if self.cache is not None:
+      self.cache.close()
+
+
+  async def close_async(self):
+    if self.async_session is not None:
+      await self.async_session.close()
+      self.async_session = None
+    self.close()
@@ -20,10 +20,12 @@
 
 from selenium.webdriver.remote.webdriver import WebDriver
 
-from time import time
-import logging
+from time import perf_counter, time
+import asyncio, logging
 
 from . import scraping, parsing
+from .capture import NetworkCapture
+from .harvesting import Harvester
 from geoid.config import Config
 from geoid.constants import Status, Keys
 
@@ -34,7 +36,9 @@ logger = logging.getLogger(__name__)
 def get(
   query_object: dict,
   webdriver: WebDriver,
-  use_config:Config=None
+  use_config:Config=None,
+  *,
+  resolver=None
 ) -> dict:
   """
   Search GMaps for `query` and return results of places.
@@ -45,20 +49,53 @@ def get(
 
   Status of results are given by the value of `results.metadata.status`
   corresponding to values in `geoid.constants.Status`. Errors during querying
-  are signalled through the metadata variable's value.
+  are signalled through the metadata variable's value, except for CAPTCHAs,
+  which raise `scraping.CaptchaError`.
 
   Args:
       query (str): Search or query keyword.
       webdriver (WebDriver): Selenium web-client/webdriver object.
       use_config (Config): Config object containing advanced query and program
       settings.
+      resolver (MunicipalityResolver): Shared resolver of municipality data.
+      If not set, municipality data is pulled directly from kodeposku.
   
   Returns:
       Results object containing query information and results.
   """
   
+  new_query_object = scraping.run_steps(iter_scrape(
+    query_object, webdriver, use_config, resolver=resolver
+  ))
+  return enrich(new_query_object, use_config, resolver=resolver)
+
+
+def iter_scrape(
+  query_object: dict,
+  webdriver: WebDriver,
+  use_config: Config=None,
+  *,
+  resolver=None,
+  interleaved: bool=False
+):
+  """
+  Scraping and parsing stage of `get()`, as a generator yielding the number of
+  seconds to wait for the page instead of waiting; see
+  `scraping.iter_scroll()`.
+
+  Returns the query object with its final status, or with its results and
+  status `QUERY_COMPLETE_MUNICIPALITIES_MISSING` to be completed by
+  `enrich()`. With `interleaved` set, the page is loaded without blocking the
+  web client, so that queries in other windows can run in the meantime.
+  """
+
   config = use_config if use_config else Config()
 
+  #: Scrolling stops at the deadline, keeping partial results
+  deadline = None
+  if config.query.deadline_seconds > 0:
+    deadline = perf_counter() + config.query.deadline_seconds
+
   new_query_object = query_object.copy()
 
   #: 0 - Checking
@@ -78,41 +115,87 @@ def get(
   if query_status == Status.QUERY_COMPLETE:
     return new_query_object
 
+  if query_status == Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
+    #: Go straight for municipality get
+    return new_query_object
+
   query_lang = new_query_object[Keys.QUERY_LANG]
   if query_lang is None:
     query_lang = config.query.lang
   if len(query_lang) <= 0:
     query_lang = config.query.lang
 
-  if query_status == Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING:
-    #: Go straight for municipality get
-    results_list = new_query_object[Keys.QUERY_RESULTS]
-
-  else:
-    new_query_object.update({
-      Keys.QUERY_LANG      : query_lang,
-      Keys.QUERY_TIMESTAMP : int(time())
-    })
+  new_query_object.update({
+    Keys.QUERY_LANG      : query_lang,
+    Keys.QUERY_TIMESTAMP : int(time())
+  })
 
-  #: 2 - Scraping
-    try:
-      webdriver = scraping.get(query, webdriver, config, use_lang=query_lang)
-      webdriver = scraping.scroll(webdriver, config)
-    except Exception as e:
-      logger.exception(e)
-      return _update_status(new_query_object, Status.QUERY_ERRORED)
-    
-  #: 3 - Parsing
-    try:
-      results_html = scraping.grab(webdriver)
-      results_list = parsing.parse_html(results_html, query_lang)
-    except Exception as e:
-      logger.exception(e)
+  #: 2, 3 - Scraping and parsing
+  if config.query.incremental and config.query.engine != 'http':
+    #: 2, 3 and 4 overlap: results are harvested while scrolling
+    results_list, municip_errors = yield from _iter_incremental(
+      query, query_lang, webdriver, config, resolver, deadline, interleaved
+    )
+    if results_list is None:
       return _update_status(new_query_object, Status.QUERY_ERRORED)
+    return _output(new_query_object, results_list, municip_errors)
+
+  try:
+    if config.query.engine == 'http':
+      if config.query.incremental:
+        raise ValueError(
+          'Incremental harvesting is not supported with the http engine'
+        )
+      #: `webdriver` is a fetching.HttpSearch
+      results_list = webdriver.search(query, query_lang, deadline=deadline)
+    else:
+      results_list = yield from _iter_scrape(
+        query, query_lang, webdriver, config, deadline, interleaved
+      )
+  except scraping.CaptchaError:
+    #: Querying again on the same web client would also fail; left to the
+    #: caller
+    raise
+  except Exception as e:
+    logger.exception(e)
+    return _update_status(new_query_object, Status.QUERY_ERRORED)
+
+  new_query_object = _update_entries(new_query_object, results_list)
+  return _update_status(
+    new_query_object, Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+  )
+
+
+def enrich(
+  query_object: dict,
+  use_config: Config=None,
+  *,
+  resolver=None
+) -> dict:
+  """
+  Municipality data stage of `get()`, completing query objects scraped by
+  `iter_scrape()`. Query objects of other statuses are returned as is.
+
+  Only results still missing municipality data are looked up, so results
+  harvested with their municipality data are not looked up again.
+  """
+
+  config = use_config if use_config else Config()
+
+  new_query_object = query_object.copy()
+  if (
+    new_query_object.get(Keys.QUERY_STATUS) != \
+    Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+  ):
+    return new_query_object
   
+  results_list = new_query_object[Keys.QUERY_RESULTS]
+
   #: 4 - Municipality data
   try:
-    results_list, municip_errors = parsing.get_municipality_data(results_list)
+    results_list, municip_errors = parsing.get_municipality_data(
+      results_list, config, resolver=resolver
+    )
   except Exception as e:
     #: Note: Errors from acquiring individual municipality data are stored as
     #: error counts in municip_errors instead.
@@ -120,7 +203,139 @@ def get(
     return _update_status(new_query_object, Status.QUERY_ERRORED)
   
   #: 5 - Output
-  new_query_object = _update_entries(new_query_object, results_list)
+  return _output(new_query_object, results_list, municip_errors)
+
+
+async def enrich_async(
+  query_object: dict,
+  use_config: Config=None,
+  *,
+  resolver=None,
+  limit: asyncio.Semaphore=None
+) -> dict:
+  """
+  Same as `enrich()`, for use under an asyncio event loop; see
+  `parsing.get_municipality_data_async()`.
+  """
+
+  config = use_config if use_config else Config()
+
+  new_query_object = query_object.copy()
+  if (
+    new_query_object.get(Keys.QUERY_STATUS) != \
+    Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+  ):
+    return new_query_object
+  
+  results_list = new_query_object[Keys.QUERY_RESULTS]
+
+  #: 4 - Municipality data
+  try:
+    results_list, municip_errors = await parsing.get_municipality_data_async(
+      results_list, config, resolver=resolver, limit=limit
+    )
+  except Exception as e:
+    logger.exception(e)
+    return _update_status(new_query_object, Status.QUERY_ERRORED)
+  
+  #: 5 - Output
+  return _output(new_query_object, results_list, municip_errors)
+
+
+def _iter_get(
+  query: str,
+  query_lang: str,
+  webdriver: WebDriver,
+  config: Config,
+  interleaved: bool
+):
+  if interleaved:
+    return (yield from scraping.iter_get(
+      query, webdriver, config, use_lang=query_lang
+    ))
+  return scraping.get(query, webdriver, config, use_lang=query_lang)
+
+
+def _iter_scrape(
+  query: str,
+  query_lang: str,
+  webdriver: WebDriver,
+  config: Config,
+  deadline: float=None,
+  interleaved: bool=False
+):
+  #: 2 - Scraping
+  if config.query.parser == 'network':
+    capture = NetworkCapture(webdriver)
+    capture.reset()
+  webdriver = yield from _iter_get(
+    query, query_lang, webdriver, config, interleaved
+  )
+  webdriver = yield from scraping.iter_scroll(
+    webdriver, config, deadline=deadline
+  )
+
+  #: 3 - Parsing
+  if config.query.parser == 'network':
+    #: Wait for the requests of the last scroll to finish
+    return parsing.parse_payloads(
+      capture.collect(timeout=config.query.scroll_wait_seconds), query_lang
+    )
+  elif config.query.parser == 'script':
+    results_raw = scraping.extract(webdriver)
+    return parsing.parse_extracted(results_raw, query_lang)
+  else:
+    results_html = scraping.grab(webdriver)
+    return parsing.parse_html(
+      results_html, query_lang, parser=config.query.parser
+    )
+
+
+def _iter_incremental(
+  query: str,
+  query_lang: str,
+  webdriver: WebDriver,
+  config: Config,
+  resolver=None,
+  deadline: float=None,
+  interleaved: bool=False
+):
+  harvester = Harvester(query_lang, config, resolver=resolver)
+
+  try:
+    harvester.start(webdriver)
+    webdriver = yield from _iter_get(
+      query, query_lang, webdriver, config, interleaved
+    )
+    harvester.harvest(webdriver)
+  except scraping.CaptchaError:
+    harvester.close()
+    raise
+  except Exception as e:
+    logger.exception(e)
+    harvester.close()
+    return None, 0
+
+  #: Scrolling stops at the first error; keep the results harvested so far
+  yield from scraping.iter_scroll(
+    webdriver, config, on_scroll=harvester.harvest, deadline=deadline
+  )
+
+  try:
+    harvester.harvest(webdriver)
+  except Exception as e:
+    logger.warning(
+      f'Could not harvest after scrolling; '
+      f'keeping {str(harvester.count)} harvested result(s)'
+    )
+    logger.debug(str(e), exc_info=e)
+
+  #: Lookups still pending at the deadline are left to enrich()
+  return harvester.finish(deadline=deadline)
+
+
+def _output(query_object: dict, results_list: list[dict], municip_errors):
+  new_query_object = _update_entries(query_object, results_list)
   
   if municip_errors > 0:
     return _update_status(new_query_object, Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING)
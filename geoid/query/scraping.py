@@ -21,14 +21,19 @@
 from selenium.common.exceptions import *
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys as InputKeys
+from selenium.webdriver.support.expected_conditions import staleness_of
 from selenium.webdriver.support.wait import WebDriverWait
 
 from urllib.parse import quote_plus
-from time import sleep
+from time import perf_counter, sleep
+from weakref import WeakKeyDictionary
 import logging
 
+from geoid.common import ratelimit
+from geoid.common.metrics import Histogram
 from geoid.config import Config
-from geoid.constants import Selectors, Links
+from geoid.constants import Selectors, Links, Scripts
 
 
 logger = logging.getLogger(__name__)
@@ -38,6 +43,20 @@ SCROLL_SUCCESS = 0
 SCROLL_FAILURE = 1
 SCROLL_END     = 2
 
+#: Latencies shared by all queries of the process, reported by BigQuery
+PAGE_LATENCY      = Histogram('page load')
+WARM_PAGE_LATENCY = Histogram('page load (warm)')
+SCROLL_LATENCY    = Histogram('scroll')
+
+#: Language of the GMaps page loaded in each webdriver, for warm navigation
+_loaded_langs = WeakKeyDictionary()
+
+
+class CaptchaError(RuntimeError):
+  """
+  Raised when GMaps serves a CAPTCHA instead of search results.
+  """
+
 
 def get(
   query: str,
@@ -52,6 +71,21 @@ def get(
   logger.info(
     f'Starting query: "{query}"'
   )
+  ratelimit.acquire(ratelimit.PAGE_LOADS, config)
+
+  #: Submit the query in the loaded page if warm navigation is set, instead
+  #: of reloading the whole page. Fall back to loading the page on failure
+  if config.query.warm_navigation and _loaded_langs.get(webdriver) == lang:
+    try:
+      return _get_warm(query, webdriver, config)
+    except WebDriverException as e:
+      logger.warning(
+        f'Could not search in loaded page ({type(e).__name__}); '
+        f'reloading page'
+      )
+  _loaded_langs.pop(webdriver, None)
+
+  time_start = perf_counter()
   webdriver.get(
     Links.GMAPS_QUERY_TARGET.format(
       query=quote_plus(query),
@@ -59,13 +93,25 @@ def get(
     )
   )
 
-  #: Pause if initial pause is set
+  #: Wait for the results box or CAPTCHA box if initial pause is set, up to
+  #: the initial pause
   if config.query.initial_pause_seconds > 0:
-    logger.info(
-      f'Pausing for {str(config.query.initial_pause_seconds)} second(s) '
-      f'per configuration'
-    )
-    sleep(config.query.initial_pause_seconds)
+    try:
+      WebDriverWait(
+        webdriver,
+        config.query.initial_pause_seconds,
+        poll_frequency=config.query.scroll_poll_seconds
+      ) \
+      .until(
+        lambda d:
+          len(d.find_elements(By.CSS_SELECTOR, Selectors.RESULTS_BOX)) > 0 or
+          len(d.find_elements(By.CSS_SELECTOR, Selectors.RECAPTCHA)) > 0
+      )
+    except TimeoutException:
+      logger.debug(
+        f'Paused for {str(config.query.initial_pause_seconds)} second(s) '
+        f'per configuration'
+      )
 
   #: Detect CAPTCHA box
   if len(webdriver.find_elements(
@@ -74,7 +120,7 @@ def get(
     logger.error(
       'Failed to load page (CAPTCHA)'
     )
-    raise RuntimeError('Failed to load page: CAPTCHA')
+    raise CaptchaError('Failed to load page: CAPTCHA')
 
   #: Ensure page is sufficiently loaded
   try:
@@ -103,13 +149,182 @@ def get(
     )
     raise
 
+  PAGE_LATENCY.observe(perf_counter() - time_start)
+  _loaded_langs[webdriver] = lang
   return webdriver
 
 
-def scroll(
+def iter_get(
+  query: str,
+  webdriver: WebDriver,
+  config: Config,
+  *,
+  use_lang: str=None
+):
+  """
+  Generator version of `get()`, yielding the number of seconds to wait for the
+  page to load instead of waiting, as `iter_scroll()`.
+
+  The page is navigated to without blocking on its load. As there is no load
+  event to wait for, a page without a results box (such as a single place)
+  is only detected once `config.query.loading_timeout_seconds` runs out.
+  """
+
+  lang = use_lang if use_lang else config.query.lang
+
+  logger.info(
+    f'Starting query: "{query}"'
+  )
+  wait_seconds = ratelimit.reserve(ratelimit.PAGE_LOADS, config)
+  if wait_seconds > 0:
+    yield wait_seconds
+
+  time_start = perf_counter()
+  webdriver.execute_script(
+    Scripts.NAVIGATE,
+    Links.GMAPS_QUERY_TARGET.format(
+      query=quote_plus(query),
+      query_lang=quote_plus(lang)
+    )
+  )
+
+  while True:
+    page_state = webdriver.execute_script(
+      Scripts.PAGE_STATE,
+      Selectors.RESULTS_BOX,
+      Selectors.RECAPTCHA,
+      Selectors.SEARCHBOX
+    )
+    if page_state in ('results', 'captcha'):
+      break
+
+    time_remaining = \
+      config.query.loading_timeout_seconds - (perf_counter() - time_start)
+    if time_remaining <= 0:
+      break
+    yield min(config.query.scroll_poll_seconds, time_remaining)
+
+  if page_state == 'captcha':
+    logger.error(
+      'Failed to load page (CAPTCHA)'
+    )
+    raise CaptchaError('Failed to load page: CAPTCHA')
+  elif page_state == 'loaded':
+    logger.error(
+      'Could not find results box; '
+      'query may have outputted a location instead of search results'
+    )
+    raise NoSuchElementException(
+      f'Could not find results box "{Selectors.RESULTS_BOX}"'
+    )
+  elif page_state != 'results':
+    logger.error(
+      'Failed to load page (timed out)'
+    )
+    raise TimeoutException('Failed to load page')
+
+  PAGE_LATENCY.observe(perf_counter() - time_start)
+  return webdriver
+
+
+def _get_warm(
+  query: str,
   webdriver: WebDriver,
   config: Config
 ):
+  time_start = perf_counter()
+
+  #: Elements of the previous query, replaced once the new results load
+  old_elements = [
+    *webdriver.find_elements(By.CSS_SELECTOR, Selectors.RESULTS_BOX)[:1],
+    *webdriver.find_elements(By.CSS_SELECTOR, Selectors.GENERAL_RESULT)[:1]
+  ]
+
+  searchbox = webdriver.find_element(
+    By.CSS_SELECTOR, Selectors.SEARCHBOX_INPUT
+  )
+  searchbox.clear()
+  searchbox.send_keys(query + InputKeys.ENTER)
+
+  wait = WebDriverWait(
+    webdriver,
+    config.query.loading_timeout_seconds,
+    poll_frequency=config.query.scroll_poll_seconds
+  )
+  if len(old_elements) > 0:
+    wait.until(
+      lambda d: any(staleness_of(element)(d) for element in old_elements)
+    )
+  wait.until(
+    lambda d:
+      len(d.find_elements(By.CSS_SELECTOR, Selectors.RESULTS_BOX)) > 0 or
+      len(d.find_elements(By.CSS_SELECTOR, Selectors.RECAPTCHA)) > 0
+  )
+
+  #: Detect CAPTCHA box
+  if len(webdriver.find_elements(
+    By.CSS_SELECTOR, Selectors.RECAPTCHA
+  )) > 0:
+    logger.error(
+      'Failed to load page (CAPTCHA)'
+    )
+    raise CaptchaError('Failed to load page: CAPTCHA')
+
+  WARM_PAGE_LATENCY.observe(perf_counter() - time_start)
+  return webdriver
+
+
+def run_steps(steps):
+  """
+  Run a generator of steps such as `iter_scroll()` to the end, sleeping for
+  the number of seconds yielded by each step. Return the value returned by
+  the generator.
+  """
+
+  while True:
+    try:
+      wait_seconds = next(steps)
+    except StopIteration as stop:
+      return stop.value
+    sleep(wait_seconds)
+
+
+def scroll(
+  webdriver: WebDriver,
+  config: Config,
+  *,
+  on_scroll=None,
+  deadline: float=None
+):
+  """
+  Scroll down the results box up to `config.query.depth` times.
+
+  If set, `on_scroll(webdriver)` is called after each successful scroll, for
+  example to harvest the newly loaded results. Exceptions raised by it end
+  the scroll like any other scrolling error.
+
+  If set, scrolling stops once `time.perf_counter()` reaches `deadline`,
+  keeping the results loaded so far.
+  """
+
+  return run_steps(iter_scroll(
+    webdriver, config, on_scroll=on_scroll, deadline=deadline
+  ))
+
+
+def iter_scroll(
+  webdriver: WebDriver,
+  config: Config,
+  *,
+  on_scroll=None,
+  deadline: float=None
+):
+  """
+  Generator version of `scroll()`, yielding the number of seconds to wait for
+  results to load instead of waiting. The caller may use the web client in the
+  meantime, as long as the window of this query is selected when resumed.
+  """
+
   logger.info(
     f'Scrolling query'
   )
@@ -124,12 +339,21 @@ def scroll(
     ) and \
     retries_remaining > 0
   ):
+    if deadline is not None and perf_counter() >= deadline:
+      logger.warning('Scroll stopped (query deadline reached)')
+      break
+
     #: Detect end-of-scroll and other exceptions
     try:
-      scroll_status = _scroll_one(webdriver, config)
+      scroll_status = yield from _iter_scroll_one(webdriver, config)
+      if scroll_status == SCROLL_SUCCESS and on_scroll is not None:
+        on_scroll(webdriver)
     except Exception:
       break
 
+    if scroll_status == SCROLL_END:
+      break
+
     if (
       scroll_status == SCROLL_SUCCESS and
       config.query.depth == INFINITE_SCROLL
@@ -157,10 +381,24 @@ def scroll(
   return webdriver
 
 
-def _scroll_one(
+def _iter_scroll_one(
   webdriver: WebDriver,
   config: Config
 ):
+  if config.query.scroll_mode not in ('webdriver', 'script'):
+    raise ValueError(
+      f'Scroll mode "{config.query.scroll_mode}" does not exist or is '
+      f'unsupported'
+    )
+  
+  wait_seconds = ratelimit.reserve(ratelimit.SCROLLS, config)
+  if wait_seconds > 0:
+    yield wait_seconds
+
+  if config.query.scroll_mode == 'script':
+    #: Waits in the page; one blocking call
+    return _scroll_one_script(webdriver, config)
+
   results_count_before = _count_results(webdriver)
 
   #: Produces NoSuchElementException on reaching end-of-list.
@@ -177,18 +415,92 @@ def _scroll_one(
   webdriver.execute_script(
     "arguments[0].scrollIntoView(true);", last_result_element
   )
-  sleep(config.query.scroll_wait_seconds)
+  time_start = perf_counter()
 
+  #: Return as soon as more results load or the end of the list is reached,
+  #: up to the scroll wait
+  while (
+    _count_results(webdriver) <= results_count_before and
+    not _is_list_ended(webdriver)
+  ):
+    time_remaining = \
+      config.query.scroll_wait_seconds - (perf_counter() - time_start)
+    if time_remaining <= 0:
+      break
+    yield min(config.query.scroll_poll_seconds, time_remaining)
+
+  time_elapsed = perf_counter() - time_start
   results_count_after = _count_results(webdriver)
+  end_reached = _is_list_ended(webdriver)
+
+  return _scroll_status(
+    results_count_before, results_count_after, end_reached, time_elapsed
+  )
+
+
+def _scroll_one_script(
+  webdriver: WebDriver,
+  config: Config
+):
+  #: Scroll and wait in one round trip; see Scripts.SCROLL_STEP
+  time_start = perf_counter()
+  step = webdriver.execute_async_script(
+    Scripts.SCROLL_STEP,
+    Selectors.RESULTS_BOX,
+    Selectors.GENERAL_RESULT,
+    Selectors.RESULTS_BOTTOM,
+    int(config.query.scroll_wait_seconds * 1000),
+    int(config.query.scroll_poll_seconds * 1000)
+  )
+  time_elapsed = perf_counter() - time_start
+
+  if step is None:
+    raise NoSuchElementException(
+      f'Could not find results in "{Selectors.RESULTS_BOX}"'
+    )
+
+  #: Same as the end-of-list NoSuchElementException of webdriver mode
+  if not step['bottom_found']:
+    raise NoSuchElementException(
+      f'Could not find results bottom "{Selectors.RESULTS_BOTTOM}"'
+    )
+
+  return _scroll_status(
+    step['before'], step['after'], step['end_reached'], time_elapsed
+  )
+
+
+def _scroll_status(
+  results_count_before: int,
+  results_count_after: int,
+  end_reached: bool,
+  time_elapsed: float
+):
+  SCROLL_LATENCY.observe(time_elapsed)
 
   if results_count_after > results_count_before:
     return_status = SCROLL_SUCCESS
+  elif end_reached:
+    return_status = SCROLL_END
   else:
     return_status = SCROLL_FAILURE
-    
+
+  logger.debug(
+    f'Scrolled {str(results_count_before)} -> {str(results_count_after)} '
+    f'result(s) in {time_elapsed:.2f}s'
+  )
   return return_status
 
 
+def _is_list_ended(webdriver: WebDriver):
+  #: The loading spinner at the bottom of the list is removed once no more
+  #: results can load. Selectors.RESULTS_END wraps the spinner, and is present
+  #: while more results load
+  return len(
+    webdriver.find_elements(By.CSS_SELECTOR, Selectors.RESULTS_BOTTOM)
+  ) <= 0
+
+
 def _count_results(webdriver: WebDriver):
   return len(
     webdriver.find_elements(
@@ -200,4 +512,52 @@ def _count_results(webdriver: WebDriver):
 def grab(webdriver: WebDriver):
   return webdriver.find_element(
     By.CSS_SELECTOR, Selectors.RESULTS_BOX
-  ).get_attribute('innerHTML')
\ No newline at end of file
+  ).get_attribute('innerHTML')
+
+
+def grab_results(webdriver: WebDriver, start: int=0) -> list[str]:
+  """
+  Grab the HTML of each result in the page, from the result at `start`.
+
+  Parse the joined output with `parsing.parse_html()`.
+  """
+
+  grabbed = webdriver.execute_script(
+    Scripts.GRAB_RESULTS,
+    Selectors.RESULTS_BOX,
+    Selectors.RESULT,
+    start
+  )
+  if grabbed is None:
+    raise NoSuchElementException(
+      f'Could not find results box "{Selectors.RESULTS_BOX}"'
+    )
+  return grabbed
+
+
+def extract(webdriver: WebDriver, start: int=0):
+  """
+  Extract the raw fields of all results in the page with one script call,
+  from the result at `start`.
+
+  Unlike `grab()`, only the values read by the parser are transferred from the
+  web client. Convert the output with `parsing.parse_extracted()`.
+  """
+
+  extracted = webdriver.execute_script(
+    Scripts.EXTRACT_RESULTS,
+    Selectors.RESULTS_BOX,
+    Selectors.RESULT,
+    Selectors.LOCATION_NAME_FIELD,
+    Selectors.LOCATION_TYPE_FIELD,
+    Selectors.LOCATION_LINK_FIELD,
+    Selectors.RATING_FIELD,
+    Selectors.REVIEWS_FIELD,
+    Selectors.DESCRIPTION_FIELD,
+    start
+  )
+  if extracted is None:
+    raise NoSuchElementException(
+      f'Could not find results box "{Selectors.RESULTS_BOX}"'
+    )
+  return extracted
\ No newline at end of file
@@ -0,0 +1,5 @@
+import os, sys
+
+
+#: Test helpers such as stubserver are imported as top-level modules
+sys.path.insert(0, os.path.dirname(__file__))
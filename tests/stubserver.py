@@ -0,0 +1,62 @@
+"""
+Local stand-in for the GMaps search endpoint, serving recorded responses.
+
+Each fixture directory holds one response per page, named `page-<offset>.txt`
+after the `!8i<offset>` parameter of the request. Pages without a recorded
+response are served as 404.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os, re, threading
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class StubServer:
+  def __init__(self, directory: str):
+    self.directory = directory
+    self.requests  = []
+
+    server = self
+    class Handler(BaseHTTPRequestHandler):
+      def do_GET(self):
+        server.requests.append(self.path)
+        offset = re.search(r'!8i(\d+)', self.path)
+        filename = os.path.join(
+          server.directory,
+          f'page-{offset.group(1) if offset else "0"}.txt'
+        )
+        if not os.path.isfile(filename):
+          self.send_error(404)
+          return
+        with open(filename, 'rb') as fixture_file:
+          body = fixture_file.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+      
+      def log_message(self, *args):
+        pass
+    
+    self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    self._thread = threading.Thread(
+      target=self._server.serve_forever, daemon=True
+    )
+
+
+  @property
+  def base_url(self):
+    return f'http://127.0.0.1:{str(self._server.server_port)}'
+
+
+  def __enter__(self):
+    self._thread.start()
+    return self
+
+
+  def __exit__(self, *args):
+    self._server.shutdown()
+    self._server.server_close()
@@ -0,0 +1,49 @@
+import asyncio
+from unittest import mock
+
+from geoid.bigquery import AsyncBigQuery, query
+from geoid.config import Config
+from geoid.constants import Keys, Status
+from geoid.query.scraping import CaptchaError
+
+
+class LocalResolver:
+  is_local = True
+  cache    = None
+  session  = None
+
+
+def test_breaker_open_ends_iteration():
+  def scrape_one(data_object, webdriver, config, *, resolver=None):
+    raise CaptchaError('Failed to load page: CAPTCHA')
+
+  config = Config()
+  config.fileio.autosave_every          = 0
+  config.query.captcha_open_after       = 2
+  config.query.captcha_cooldown_seconds = 0.01
+
+  querier = AsyncBigQuery(config)
+  querier.resolver = LocalResolver()
+  querier.data = [
+    {
+      Keys.QUERY_KEYWORD : f'keyword {str(index)}',
+      Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+      Keys.QUERY_LANG    : 'id'
+    }
+    for index in range(4)
+  ]
+  querier._count = len(querier.data)
+  querier.initialize_workers([object()])
+
+  async def consume():
+    return [item async for item in querier]
+
+  with mock.patch.object(query, 'scrape_one', scrape_one):
+    items = asyncio.run(asyncio.wait_for(consume(), 10))
+
+  assert items == []
+  assert querier.breaker.is_open
+  assert all(
+    data_object[Keys.QUERY_STATUS] == Status.QUERY_INCOMPLETE
+    for data_object in querier.data
+  )
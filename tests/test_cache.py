@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from unittest import mock
+
+from geoid.config import Config
+from geoid.query.processing import processing
+from geoid.query.processing.cache import MunicipalityCache
+from geoid.query.processing.resolver import MunicipalityResolver
+
+
+RESPONSE = {
+  'code'     : '31.71.06.1001',
+  'province' : 'DKI Jakarta',
+  'city'     : 'Kota Jakarta Pusat',
+  'district' : 'Menteng',
+  'village'  : 'Menteng',
+  'postal'   : '10310',
+}
+
+
+def _cache(filename: str, validate=processing.is_municipality_response):
+  return MunicipalityCache(filename, ttl_seconds=30 * 86400, validate=validate)
+
+
+def test_caches_valid_response(tmp_path):
+  cache = _cache(str(tmp_path / 'cache.sqlite'))
+  try:
+    assert cache.put(-6.1958, 106.8303, RESPONSE)
+    assert cache.get(-6.1958, 106.8303) == RESPONSE
+    assert cache.hits == 1
+  finally:
+    cache.close()
+
+
+def test_skips_error_and_empty_responses(tmp_path):
+  cache = _cache(str(tmp_path / 'cache.sqlite'))
+  try:
+    for response in (
+      {}, {'status': False, 'message': 'Data tidak ditemukan'}, [], None,
+      {**RESPONSE, 'code': ''},
+    ):
+      assert not cache.put(-6.1958, 106.8303, response)
+      assert cache.get(-6.1958, 106.8303) is None
+    assert cache.hits == 0
+  finally:
+    cache.close()
+
+
+def test_ignores_stored_error_responses(tmp_path):
+  filename = str(tmp_path / 'cache.sqlite')
+  unchecked = _cache(filename, validate=None)
+  try:
+    assert unchecked.put(-6.1958, 106.8303, {'message': 'Internal error'})
+  finally:
+    unchecked.close()
+
+  cache = _cache(filename)
+  try:
+    assert cache.get(-6.1958, 106.8303) is None
+    assert cache.misses == 1
+  finally:
+    cache.close()
+
+
+def test_resolver_async_cache_off_event_loop(tmp_path):
+  config = Config()
+  config.municipality.cache_filename = str(tmp_path / 'cache.sqlite')
+  resolver = MunicipalityResolver(config)
+  threads = []
+
+  get, put = resolver.cache.get, resolver.cache.put
+  def record(function):
+    def recorded(*args):
+      threads.append(threading.current_thread())
+      return function(*args)
+    return recorded
+
+  async def fetch(latitude, longitude, session, bucket=None):
+    return RESPONSE
+
+  async def lookup():
+    loop_thread = threading.current_thread()
+    first  = await resolver.get_async(-6.1958, 106.8303)
+    second = await resolver.get_async(-6.1958, 106.8303)
+    await resolver.close_async()
+    return loop_thread, first, second
+
+  with mock.patch.object(resolver.cache, 'get', record(get)), \
+       mock.patch.object(resolver.cache, 'put', record(put)), \
+       mock.patch.object(processing, '_get_municipality_data_async', fetch):
+    loop_thread, first, second = asyncio.run(lookup())
+
+  assert first == second == RESPONSE
+  #: get, put, then get as a hit
+  assert len(threads) == 3
+  assert all(thread is not loop_thread for thread in threads)
@@ -0,0 +1,73 @@
+import asyncio
+
+from geoid.constants import Keys, Objects, Status
+from geoid.query import query
+
+
+RESPONSE = {
+  'code'     : '31.71.06.1001',
+  'province' : 'DKI Jakarta',
+  'city'     : 'Kota Jakarta Pusat',
+  'district' : 'Menteng',
+  'village'  : 'Menteng',
+  'postal'   : '10310',
+}
+
+
+class _CountingResolver:
+  is_local = True
+
+  def __init__(self):
+    self.lookups = []
+
+  def get(self, latitude, longitude):
+    self.lookups.append((latitude, longitude))
+    return RESPONSE
+
+  async def get_async(self, latitude, longitude):
+    return self.get(latitude, longitude)
+
+
+def _place(index: int, enriched: bool):
+  place = Objects.BASE_PLACE_OBJECT.copy()
+  place.update({
+    Keys.LOCATION_NAME : f'Place {index}',
+    Keys.LATITUDE      : -6.19 + index / 1000,
+    Keys.LONGITUDE     : 106.83,
+  })
+  if enriched:
+    place.update({Keys.PROVINCE_ID : 31, Keys.PROVINCE_NAME : 'DKI Jakarta'})
+  return place
+
+
+def _harvested():
+  #: Harvested while scrolling, with a single lookup error
+  query_object = Objects.BASE_QUERY_OBJECT.copy()
+  query_object.update({
+    Keys.QUERY_KEYWORD       : 'kopi menteng',
+    Keys.QUERY_STATUS        : Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING,
+    Keys.QUERY_RESULTS_COUNT : 3,
+    Keys.QUERY_RESULTS       : [
+      _place(0, True), _place(1, False), _place(2, True)
+    ],
+  })
+  return query_object
+
+
+def test_enrich_only_looks_up_missing():
+  resolver = _CountingResolver()
+  result = query.enrich(_harvested(), resolver=resolver)
+
+  assert resolver.lookups == [(-6.189, 106.83)]
+  assert result[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE
+  assert [place[Keys.PROVINCE_ID] for place in result[Keys.QUERY_RESULTS]] \
+    == [31, 31, 31]
+  assert result[Keys.QUERY_RESULTS][1][Keys.POSTAL_CODE] == '10310'
+
+
+def test_enrich_async_only_looks_up_missing():
+  resolver = _CountingResolver()
+  result = asyncio.run(query.enrich_async(_harvested(), resolver=resolver))
+
+  assert resolver.lookups == [(-6.189, 106.83)]
+  assert result[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE
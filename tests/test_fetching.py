@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from geoid.config import Config
+from geoid.constants import Keys, Status
+from geoid.query import query
+from geoid.query.fetching import HttpSearch
+from geoid.query.scraping import CaptchaError
+
+from stubserver import FIXTURES_DIR, StubServer
+
+
+def _search(scenario: str, depth: int):
+  with StubServer(os.path.join(FIXTURES_DIR, 'search', scenario)) as server:
+    config = Config()
+    config.query.engine        = 'http'
+    config.query.http_base_url = server.base_url
+    config.query.depth         = depth
+
+    client = HttpSearch(config)
+    try:
+      return client.search('kopi menteng', 'id'), server.requests
+    finally:
+      client.quit()
+
+
+@pytest.mark.parametrize(
+  'depth, pages, count', [(1, 1, 20), (2, 2, 40), (0, 4, 45)]
+)
+def test_search_pages(depth, pages, count):
+  results, requests = _search('results', depth)
+
+  assert len(requests) == pages
+  assert all('tbm=map' in request for request in requests)
+  assert len(results) == count
+  assert len({result[Keys.LOCATION_LINK] for result in results}) == count
+  assert results[0][Keys.LOCATION_NAME] == 'Kopi Kenangan Sabang'
+  assert results[0][Keys.LATITUDE] < 0 < results[0][Keys.LONGITUDE]
+
+
+def test_search_captcha_page():
+  with pytest.raises(CaptchaError):
+    _search('captcha', 1)
+
+
+def test_search_consent_page():
+  with pytest.raises(ValueError):
+    _search('consent', 1)
+
+
+def test_query_consent_page_is_errored():
+  with StubServer(os.path.join(FIXTURES_DIR, 'search', 'consent')) as server:
+    config = Config()
+    config.query.engine        = 'http'
+    config.query.http_base_url = server.base_url
+
+    client = HttpSearch(config)
+    try:
+      query_object = query.get(
+        {
+          Keys.QUERY_KEYWORD : 'kopi menteng',
+          Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+          Keys.QUERY_LANG    : 'id'
+        },
+        client, config
+      )
+    finally:
+      client.quit()
+
+  assert query_object[Keys.QUERY_STATUS] == Status.QUERY_ERRORED
+
+
+def test_incremental_with_http_engine_is_errored():
+  with StubServer(os.path.join(FIXTURES_DIR, 'search', 'results')) as server:
+    config = Config()
+    config.query.engine        = 'http'
+    config.query.http_base_url = server.base_url
+    config.query.incremental   = True
+
+    client = HttpSearch(config)
+    try:
+      query_object = query.get(
+        {
+          Keys.QUERY_KEYWORD : 'kopi menteng',
+          Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+          Keys.QUERY_LANG    : 'id'
+        },
+        client, config
+      )
+    finally:
+      client.quit()
+
+  assert query_object[Keys.QUERY_STATUS] == Status.QUERY_ERRORED
+  assert server.requests == []
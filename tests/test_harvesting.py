@@ -0,0 +1,66 @@
+import os
+from unittest import mock
+
+from bs4 import BeautifulSoup
+import pytest
+
+from geoid.config import Config
+from geoid.constants import Keys, Selectors
+from geoid.query import scraping
+from geoid.query.harvesting import Harvester
+
+from stubserver import FIXTURES_DIR
+
+
+class _LocalResolver:
+  is_local = True
+
+  def get(self, latitude, longitude):
+    raise LookupError('No village nearby')
+
+
+def _cards():
+  filename = os.path.join(FIXTURES_DIR, 'html', 'results.html')
+  with open(filename, encoding='utf-8') as file:
+    soup = BeautifulSoup(file.read(), 'lxml')
+  return [str(card) for card in soup.select(Selectors.RESULT)]
+
+
+def _harvester(parser: str='bs4'):
+  config = Config()
+  config.query.parser = parser
+  return Harvester('id', config, resolver=_LocalResolver())
+
+
+@pytest.mark.parametrize('parser', ['bs4', 'lxml'])
+def test_unreadable_card_is_skipped(parser):
+  cards = _cards()
+  #: No link to read coordinates from
+  broken = BeautifulSoup(cards[1], 'lxml')
+  broken.select_one('a').decompose()
+  batch = [cards[0], str(broken.select_one(Selectors.RESULT)), *cards[2:]]
+
+  harvester = _harvester(parser)
+  with mock.patch.object(scraping, 'grab_results', return_value=batch) \
+    as grab_results:
+    assert harvester.harvest(None) == len(cards) - 1
+    grab_results.return_value = []
+    assert harvester.harvest(None) == 0
+
+  #: The batch is not grabbed again
+  assert [call.args[1] for call in grab_results.call_args_list] == \
+    [0, len(cards)]
+  results, _ = harvester.finish()
+  assert len(results) == len(cards) - 1
+  assert results[0][Keys.LOCATION_NAME] == 'Kopi Kenangan Sabang'
+
+
+def test_unreadable_extracted_result_is_skipped():
+  harvester = _harvester('script')
+  with mock.patch.object(scraping, 'extract', return_value=[None]) \
+    as extract:
+    assert harvester.harvest(None) == 0
+    extract.return_value = []
+    assert harvester.harvest(None) == 0
+
+  assert [call.args[1] for call in extract.call_args_list] == [0, 1]
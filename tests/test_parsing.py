@@ -0,0 +1,35 @@
+import json
+import os
+
+import pytest
+
+from geoid.query import parsing
+
+from stubserver import FIXTURES_DIR
+
+
+def _read(filename: str):
+  with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as file:
+    return file.read()
+
+
+def _serialize(results: list[dict]):
+  return json.dumps(results, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+@pytest.mark.parametrize(
+  'filename', ['html/results.html', 'payload/results.html']
+)
+def test_lxml_matches_bs4(filename):
+  grabbed_html = _read(filename)
+
+  from_bs4  = parsing.parse_html(grabbed_html, 'id', parser='bs4')
+  from_lxml = parsing.parse_html(grabbed_html, 'id', parser='lxml')
+
+  assert len(from_bs4) > 0
+  assert _serialize(from_lxml) == _serialize(from_bs4)
+
+
+def test_lxml_matches_bs4_on_empty():
+  assert parsing.parse_html('', 'id', parser='lxml') == \
+    parsing.parse_html('', 'id', parser='bs4') == []
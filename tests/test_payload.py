@@ -0,0 +1,163 @@
+import json
+import os
+import re
+
+import pytest
+
+from geoid.constants import Keys, Objects
+from geoid.query import parsing
+from geoid.query.capture import NetworkCapture
+
+from stubserver import FIXTURES_DIR
+
+
+PAYLOAD_DIR = os.path.join(FIXTURES_DIR, 'payload')
+SEARCH_URL  = 'https://www.google.com/search?tbm=map&q=kopi+menteng'
+
+#: Fields both paths read from the same place
+SHARED_KEYS = (
+  Keys.LOCATION_NAME, Keys.LOCATION_TYPE, Keys.LATITUDE, Keys.LONGITUDE,
+  Keys.RATING, Keys.REVIEWS,
+)
+
+
+def _read(filename: str):
+  with open(os.path.join(PAYLOAD_DIR, filename), encoding='utf-8') as file:
+    return file.read()
+
+
+def _feature_id(link: str):
+  return re.search(r'!1s([^!]+)', link).group(1)
+
+
+def test_payload_matches_html():
+  #: Consistency of both decoders on the same places. search.txt is built to
+  #: the payload layout, not captured; see test_captured_payloads() for
+  #: captures
+  from_html    = parsing.parse_html(_read('results.html'), 'id')
+  from_payload = parsing.parse_payloads([_read('search.txt')], 'id')
+
+  assert len(from_html) == len(from_payload) == 5
+  for html_result, payload_result in zip(from_html, from_payload):
+    for key in SHARED_KEYS:
+      assert html_result[key] == payload_result[key], key
+    assert (
+      _feature_id(html_result[Keys.LOCATION_LINK]) ==
+      _feature_id(payload_result[Keys.LOCATION_LINK])
+    )
+
+
+def test_address_only_in_payloads():
+  #: The address is not part of the output schema of other parsers
+  from_html = parsing.parse_html(_read('results.html'), 'id')
+
+  assert Keys.ADDRESS not in Objects.BASE_PLACE_OBJECT
+  assert all(Keys.ADDRESS not in result for result in from_html)
+
+
+CAPTURED_DIR = os.path.join(PAYLOAD_DIR, 'captured')
+
+
+def _captured_filenames():
+  if not os.path.isdir(CAPTURED_DIR):
+    return []
+  return sorted(
+    filename for filename in os.listdir(CAPTURED_DIR)
+    if filename.endswith('.txt')
+  )
+
+
+@pytest.mark.skipif(
+  len(_captured_filenames()) <= 0,
+  reason=f'no captured search payloads in {CAPTURED_DIR}'
+)
+@pytest.mark.parametrize('filename', _captured_filenames())
+def test_captured_payloads(filename):
+  #: Bodies of real /search?tbm=map responses, saved from a capture
+  results = parsing.parse_payloads(
+    [_read(os.path.join('captured', filename))], 'id'
+  )
+
+  assert len(results) > 0
+  for result in results:
+    assert result[Keys.LOCATION_NAME]
+    assert -90 <= result[Keys.LATITUDE] <= 90
+    assert -180 <= result[Keys.LONGITUDE] <= 180
+    assert _feature_id(result[Keys.LOCATION_LINK])
+
+
+def test_payload_address_field():
+  results = parsing.parse_payloads([_read('search.txt')], 'id')
+
+  assert results[0][Keys.ADDRESS].startswith('Jl. H. Agus Salim No.35, ')
+  assert all(result[Keys.DESCRIPTION] == '' for result in results)
+  assert all('Jakarta' in result[Keys.ADDRESS] for result in results)
+
+
+class _MockDriver:
+  """
+  Web client replaying performance log entries, one batch per read.
+  """
+
+  def __init__(self, batches: list[list[tuple]]):
+    self.batches = list(batches)
+    self.fetched = []
+
+  def get_log(self, log_type: str):
+    if len(self.batches) == 0:
+      return []
+    return [
+      {'message': json.dumps(
+        {'message': {'method': method, 'params': params}}
+      )}
+      for method, params in self.batches.pop(0)
+    ]
+
+  def execute_script(self, script: str):
+    return []
+
+  def execute_cdp_cmd(self, command: str, params: dict):
+    self.fetched.append(params['requestId'])
+    return {'body': f'body-{params["requestId"]}'}
+
+
+def _received(request_id: str, url: str=SEARCH_URL):
+  return 'Network.responseReceived', {
+    'requestId': request_id, 'response': {'url': url}
+  }
+
+
+def _finished(request_id: str):
+  return 'Network.loadingFinished', {'requestId': request_id}
+
+
+def test_capture_waits_for_loading_finished():
+  driver = _MockDriver([
+    [
+      _received('1'), _received('2'),
+      _received('3', 'https://www.google.com/maps/vt'),
+      _finished('1'),
+    ],
+    [],
+    [_finished('2')],
+  ])
+  capture = NetworkCapture(driver)
+
+  assert capture.collect() == ['body-1']
+  assert driver.fetched == ['1']
+
+  assert capture.collect() == []
+  assert capture.collect() == ['body-2']
+  assert driver.fetched == ['1', '2']
+
+
+def test_capture_timeout_polls_unfinished():
+  driver = _MockDriver([
+    [_received('1')],
+    [],
+    [_finished('1')],
+  ])
+  capture = NetworkCapture(driver)
+
+  assert capture.collect(timeout=5.0, poll=0.0) == ['body-1']
+  assert len(driver.batches) == 0
@@ -0,0 +1,112 @@
+import os
+from time import sleep
+from unittest import mock
+
+from geoid.bigquery import BigQuery, query
+from geoid.config import Config
+from geoid.constants import Keys, Status
+
+
+class LocalResolver:
+  is_local = True
+  cache    = None
+  session  = None
+
+
+def _scrape_one(data_object, webdriver, config, *, resolver=None):
+  assert webdriver is not None
+  new_object = data_object.copy()
+  new_object[Keys.QUERY_STATUS] = Status.QUERY_COMPLETE
+  return new_object, Status.QUERY_COMPLETE
+
+
+def _run(webclient_factory):
+  config = Config()
+  config.fileio.autosave_every       = 0
+  config.webclient.recycle_queries   = 1
+  config.webclient.restart_attempts  = 2
+
+  querier = BigQuery(config)
+  querier.resolver = LocalResolver()
+  querier.data = [
+    {
+      Keys.QUERY_KEYWORD : f'keyword {str(index)}',
+      Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+      Keys.QUERY_LANG    : 'id'
+    }
+    for index in range(4)
+  ]
+  querier._count = len(querier.data)
+  querier.initialize_workers(
+    [object()], webclient_factory=webclient_factory
+  )
+
+  with mock.patch.object(query, 'scrape_one', _scrape_one):
+    querier.get_all_workers()
+  return querier
+
+
+def test_failed_restarts_stop_worker_without_burning_queries():
+  def webclient_factory(index, **kwargs):
+    raise FileNotFoundError('chromedriver')
+
+  querier = _run(webclient_factory)
+
+  assert querier.workers[0].stopped
+  assert [
+    data_object[Keys.QUERY_STATUS] for data_object in querier.data
+  ] == [Status.QUERY_COMPLETE] + [Status.QUERY_INCOMPLETE] * 3
+
+
+def test_restart_is_retried_before_next_query():
+  attempts = []
+  def webclient_factory(index, **kwargs):
+    attempts.append(index)
+    if len(attempts) == 1:
+      raise OSError('Could not start browser')
+    return object()
+
+  querier = _run(webclient_factory)
+
+  assert not querier.workers[0].stopped
+  assert all(
+    data_object[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE
+    for data_object in querier.data
+  )
+
+
+def test_stopped_workers_keep_autosave(tmp_path, caplog):
+  def scrape_one(data_object, webdriver, config, *, resolver=None):
+    #: Hung past the deadline
+    sleep(1.0)
+    return data_object, Status.QUERY_COMPLETE
+
+  config = Config()
+  config.fileio.autosave_every          = 1
+  config.query.deadline_seconds         = 0.1
+  config.query.watchdog_grace_seconds   = 0.1
+
+  querier = BigQuery(config)
+  querier.resolver = LocalResolver()
+  querier.autosave_filename = str(tmp_path / 'output.json.autosave')
+  querier.data = [
+    {
+      Keys.QUERY_KEYWORD : f'keyword {str(index)}',
+      Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+      Keys.QUERY_LANG    : 'id'
+    }
+    for index in range(3)
+  ]
+  querier._count = len(querier.data)
+  querier.initialize_workers([object()])
+
+  with mock.patch.object(query, 'scrape_one', scrape_one):
+    querier.get_all_workers()
+  querier.autosave()
+  querier.remove_autosave_if_set()
+
+  assert querier.workers[0].stopped
+  assert querier.unprocessed == 2
+  assert not querier.is_finished
+  assert os.path.exists(querier.autosave_filename)
+  assert 'Query stopped with 2 query object(s) not run' in caplog.text
@@ -0,0 +1,97 @@
+import json
+from unittest import mock
+
+from geoid.bigquery import BigQuery, query
+from geoid.common import io
+from geoid.config import Config
+from geoid.constants import Keys, Status
+
+
+class LocalResolver:
+  is_local = True
+  cache    = None
+  session  = None
+
+
+def _query_object(index, status=Status.QUERY_INCOMPLETE):
+  return {
+    Keys.QUERY_KEYWORD : f'keyword {str(index)}',
+    Keys.QUERY_STATUS  : status,
+    Keys.QUERY_LANG    : 'id'
+  }
+
+
+def test_stream_resume_skips_journaled_queries(tmp_path):
+  source_filename  = str(tmp_path / 'source.ndjson')
+  journal_filename = str(tmp_path / 'output.json.autosave')
+  with open(source_filename, 'w', encoding='UTF-8') as source_file:
+    for index in range(3):
+      source_file.write(json.dumps(_query_object(index)) + '\n')
+  for index in range(2):
+    io.append_journal(
+      journal_filename, index, _query_object(index, Status.QUERY_COMPLETE)
+    )
+
+  scraped = []
+  def scrape_one(data_object, webdriver, config, *, resolver=None):
+    if data_object[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE:
+      return data_object, Status.QUERY_COMPLETE
+    scraped.append(data_object[Keys.QUERY_KEYWORD])
+    new_object = data_object.copy()
+    new_object[Keys.QUERY_STATUS] = Status.QUERY_COMPLETE
+    return new_object, Status.QUERY_COMPLETE
+
+  config = Config()
+  config.fileio.stream = True
+  querier = BigQuery(config)
+  querier.autosave_filename = journal_filename
+  querier.resolver = LocalResolver()
+  querier.import_data(source_filename, lazy=True)
+  assert querier.resume_autosave() == 2
+
+  querier.initialize_workers([object()])
+  with mock.patch.object(query, 'scrape_one', scrape_one):
+    completed = list(querier.iter_all())
+
+  assert scraped == ['keyword 2']
+  assert [index for index, _, _ in completed] == [0, 1, 2]
+  #: The journal is appended to, not replaced
+  journal = io.read_journal(journal_filename)
+  assert sorted(journal) == [0, 1, 2]
+  with open(journal_filename, encoding='UTF-8') as journal_file:
+    assert len(journal_file.readlines()) >= 3
+
+
+def test_resume_compacts_journal(tmp_path):
+  source_filename  = str(tmp_path / 'source.json')
+  journal_filename = str(tmp_path / 'output.json.autosave')
+  with open(source_filename, 'w', encoding='UTF-8') as source_file:
+    json.dump([_query_object(index) for index in range(3)], source_file)
+  io.append_journal(
+    journal_filename, 0, _query_object(0, Status.QUERY_ERRORED)
+  )
+  io.append_journal(
+    journal_filename, 0, _query_object(0, Status.QUERY_COMPLETE)
+  )
+  io.append_journal(
+    journal_filename, 1, _query_object(1, Status.QUERY_COMPLETE)
+  )
+  with open(journal_filename, 'a', encoding='UTF-8') as journal_file:
+    #: Interrupted write
+    journal_file.write('{"index": 2, "query_keyw')
+
+  config = Config()
+  config.fileio.autosave_mode = 'journal'
+  querier = BigQuery(config)
+  querier.autosave_filename = journal_filename
+  querier.import_data(source_filename)
+  assert querier.resume_autosave() == 2
+
+  assert [data_object[Keys.QUERY_STATUS] for data_object in querier.data] == [
+    Status.QUERY_COMPLETE, Status.QUERY_COMPLETE, Status.QUERY_INCOMPLETE
+  ]
+  with open(journal_filename, encoding='UTF-8') as journal_file:
+    lines = journal_file.readlines()
+  assert [json.loads(line)['index'] for line in lines] == [0, 1]
+  assert json.loads(lines[0])['object'][Keys.QUERY_STATUS] == \
+    Status.QUERY_COMPLETE
@@ -0,0 +1,136 @@
+import os
+
+from bs4 import BeautifulSoup
+import pytest
+
+from geoid.config import Config
+from geoid.constants import Selectors
+from geoid.query import scraping
+
+from stubserver import FIXTURES_DIR
+
+
+#: Marks the end of the list in place of the loading spinner
+END_OF_LIST_HTML = (
+  '<div class="m6QErb tLjsW eKbjU "><div class="PbZDve ">'
+  '<p class="fontBodyMedium"><span><span class="HlvSq">Anda telah mencapai akhir daftar.</span></span>'
+  '</p></div></div>'
+)
+
+
+class _PageDriver:
+  """
+  Web client serving a saved results page, where results and the end of the
+  list are loaded by `on_scroll(soup)` once scrolled.
+  """
+
+  def __init__(self, html: str, on_scroll=None):
+    self.soup = BeautifulSoup(html, 'lxml')
+    self.on_scroll = on_scroll
+    self.scrolls = 0
+
+  def find_elements(self, by, selector: str):
+    return self.soup.select(selector)
+
+  def find_element(self, by, selector: str):
+    elements = self.find_elements(by, selector)
+    if len(elements) <= 0:
+      raise scraping.NoSuchElementException(selector)
+    return elements[0]
+
+  def execute_script(self, script: str, *args):
+    self.scrolls += 1
+    if self.on_scroll is not None:
+      self.on_scroll(self.soup)
+
+
+def _config(depth: int):
+  config = Config()
+  config.query.depth               = depth
+  config.query.scroll_mode         = 'webdriver'
+  config.query.scroll_wait_seconds = 0.05
+  config.query.scroll_poll_seconds = 0.01
+  config.query.scroll_retries      = 2
+  return config
+
+
+def _read(filename: str):
+  with open(os.path.join(FIXTURES_DIR, filename), encoding='utf-8') as file:
+    return file.read()
+
+
+def _scroll_one(driver, config):
+  steps = scraping._iter_scroll_one(driver, config)
+  try:
+    while True:
+      next(steps)
+  except StopIteration as stop:
+    return stop.value
+
+
+def _append_results(soup):
+  #: Copies of the first cards, as loaded by a scroll
+  feed = soup.select_one('[role="feed"]')
+  bottom = feed.select_one(Selectors.RESULTS_END)
+  for card in soup.select(Selectors.RESULT)[:3]:
+    bottom.insert_before(BeautifulSoup(str(card.parent), 'lxml').div)
+
+
+def _end_list(soup):
+  soup.select_one(Selectors.RESULTS_END).replace_with(
+    BeautifulSoup(END_OF_LIST_HTML, 'lxml').div
+  )
+
+
+@pytest.mark.parametrize(
+  'filename', ['html/results.html', 'payload/results.html']
+)
+def test_spinner_is_not_end_of_list(filename):
+  #: The fixtures hold the spinner inside Selectors.RESULTS_END
+  driver = _PageDriver(_read(filename))
+  assert len(driver.find_elements(None, Selectors.RESULTS_END)) > 0
+  assert len(driver.find_elements(None, Selectors.RESULTS_BOTTOM)) > 0
+
+  #: Nothing loaded within the scroll wait; retried, not ended
+  assert _scroll_one(driver, _config(3)) == scraping.SCROLL_FAILURE
+
+
+def test_more_results_is_success():
+  driver = _PageDriver(_read('html/results.html'), _append_results)
+  assert _scroll_one(driver, _config(3)) == scraping.SCROLL_SUCCESS
+
+
+def test_spinner_removed_is_end_of_list():
+  driver = _PageDriver(_read('html/results.html'), _end_list)
+  assert _scroll_one(driver, _config(3)) == scraping.SCROLL_END
+
+
+def test_scroll_reaches_depth_while_results_load():
+  driver = _PageDriver(_read('html/results.html'), _append_results)
+  scraping.scroll(driver, _config(4))
+
+  assert driver.scrolls == 3
+  assert len(driver.find_elements(None, Selectors.RESULT)) == 7 + 3 * 3
+
+
+class _ScriptDriver:
+  def __init__(self, step: dict):
+    self.step = step
+    self.args = None
+
+  def execute_async_script(self, script: str, *args):
+    self.args = args
+    return self.step
+
+
+def test_script_step_ends_on_spinner_removed():
+  config = _config(3)
+  config.query.scroll_mode = 'script'
+  driver = _ScriptDriver(
+    {'before': 7, 'after': 7, 'end_reached': False, 'bottom_found': True}
+  )
+
+  assert _scroll_one(driver, config) == scraping.SCROLL_FAILURE
+  #: The end of the list is checked against the spinner itself
+  assert Selectors.RESULTS_BOTTOM in driver.args
+  assert Selectors.RESULTS_END not in driver.args
@@ -0,0 +1,57 @@
+from geoid.bigquery.tabs import TabScheduler
+from geoid.bigquery.worker import Worker
+from geoid.common import webclient
+from geoid.config import Config
+
+
+class _SwitchTo:
+  def __init__(self, driver):
+    self.driver = driver
+
+  def new_window(self, type_hint: str):
+    handle = f'tab-{str(len(self.driver.window_handles) + 1)}'
+    self.driver.window_handles.append(handle)
+    self.driver.current_window_handle = handle
+
+  def window(self, handle: str):
+    self.driver.current_window_handle = handle
+
+
+class _MockChrome:
+  def __init__(self):
+    self.window_handles = ['tab-1']
+    self.current_window_handle = 'tab-1'
+    self.switch_to = _SwitchTo(self)
+    self.commands = []
+
+  def execute_cdp_cmd(self, command: str, params: dict):
+    self.commands.append((self.current_window_handle, command, params))
+    return {}
+
+
+def _open_tabs(lean: bool):
+  config = Config()
+  config.webclient.lean = lean
+  driver = _MockChrome()
+  scheduler = TabScheduler(Worker(driver, config), config, tabs=3)
+  return driver, scheduler._open_tabs(driver)
+
+
+def test_lean_blocking_applies_to_new_tabs():
+  driver, handles = _open_tabs(lean=True)
+
+  assert handles == ['tab-1', 'tab-2', 'tab-3']
+  assert driver.current_window_handle == 'tab-1'
+  blocked = [
+    handle for handle, command, params in driver.commands
+    if command == 'Network.setBlockedURLs' and
+    params['urls'] == webclient.LEAN_BLOCKED_URLS
+  ]
+  assert blocked == ['tab-2', 'tab-3']
+
+
+def test_no_blocking_without_lean():
+  driver, handles = _open_tabs(lean=False)
+
+  assert len(handles) == 3
+  assert driver.commands == []
@@ -0,0 +1,108 @@
+from time import sleep
+from unittest import mock
+
+from geoid.bigquery import query
+from geoid.bigquery.worker import Worker
+from geoid.config import Config
+from geoid.constants import Keys, Status
+
+
+def _config():
+  config = Config()
+  config.query.deadline_seconds       = 0.1
+  config.query.watchdog_grace_seconds = 0.1
+  return config
+
+
+def _query_object():
+  return {
+    Keys.QUERY_KEYWORD : 'kopi menteng',
+    Keys.QUERY_STATUS  : Status.QUERY_INCOMPLETE,
+    Keys.QUERY_LANG    : 'id'
+  }
+
+
+def _scrape_one(scrape_seconds: float):
+  def scrape_one(data_object, webdriver, config, *, resolver=None):
+    sleep(scrape_seconds)
+    new_object = data_object.copy()
+    new_object[Keys.QUERY_STATUS] = Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+    return new_object, Status.QUERY_COMPLETE_MUNICIPALITIES_MISSING
+  return scrape_one
+
+
+def _enrich_one(scraped_object, config, *, resolver=None):
+  #: Slower than the deadline and grace combined
+  sleep(0.4)
+  new_object = scraped_object.copy()
+  new_object[Keys.QUERY_STATUS] = Status.QUERY_COMPLETE
+  return new_object, Status.QUERY_COMPLETE
+
+
+def test_deadline_excludes_enrichment():
+  webdriver = object()
+  worker = Worker(webdriver, _config())
+
+  with mock.patch.object(query, 'scrape_one', _scrape_one(0.0)), \
+       mock.patch.object(query, 'enrich_one', _enrich_one):
+    new_object, query_status = worker.get(_query_object())
+
+  assert query_status == Status.QUERY_COMPLETE
+  assert new_object[Keys.QUERY_STATUS] == Status.QUERY_COMPLETE
+  assert worker.timeouts == 0
+  assert worker.webdriver is webdriver
+  assert not worker.stopped
+
+
+def test_hung_scrape_stops_worker_without_factory():
+  worker = Worker(object(), _config())
+
+  with mock.patch.object(query, 'scrape_one', _scrape_one(1.0)), \
+       mock.patch.object(query, 'enrich_one', _enrich_one):
+    new_object, query_status = worker.get(_query_object())
+
+  assert query_status == Status.QUERY_ERRORED
+  assert new_object[Keys.QUERY_STATUS] == Status.QUERY_ERRORED
+  assert worker.timeouts == 1
+  assert worker.webdriver is None
+  assert worker.stopped
+
+
+def test_hung_scrape_restarts_with_factory():
+  restarted = object()
+  worker = Worker(object(), _config(), webclient_factory=lambda: restarted)
+
+  with mock.patch.object(query, 'scrape_one', _scrape_one(1.0)):
+    _, query_status = worker.get(_query_object())
+  assert query_status == Status.QUERY_ERRORED
+  assert not worker.stopped
+
+  worker.maintain()
+  assert worker.webdriver is restarted
+  assert worker.restarts == 1
+
+
+def test_get_one_scrapes_then_enriches():
+  calls = []
+  def scrape_one(data_object, webdriver, config, *, resolver=None):
+    calls.append('scrape')
+    return _scrape_one(0.0)(data_object, webdriver, config, resolver=resolver)
+  def enrich_one(scraped_object, config, *, resolver=None):
+    calls.append('enrich')
+    return _enrich_one(scraped_object, config, resolver=resolver)
+
+  with mock.patch.object(query, 'scrape_one', scrape_one), \
+       mock.patch.object(query, 'enrich_one', enrich_one):
+    _, query_status = query.get_one(_query_object(), object(), Config())
+
+  assert calls == ['scrape', 'enrich']
+  assert query_status == Status.QUERY_COMPLETE
+
+
+def test_get_one_skips_complete():
+  data_object = _query_object()
+  data_object[Keys.QUERY_STATUS] = Status.QUERY_COMPLETE
+
+  new_object, query_status = query.get_one(data_object, None, Config())
+  assert query_status == Status.QUERY_COMPLETE
+  assert new_object == data_object